@@ -17,6 +17,7 @@ In the sidebar to the left of this text:
 - 🪪 **Who I Am** – Background and skills, and a quote I made up.
 - 🚗 **Used Car Market Explorer** – Sweet interactive visualizations about used car sales.
 - 📈 **Car Market Dashboard** – A highly interactive dashboard with KPIs and takeaways for buyers and sellers.
+- 💰 **Price Estimator** – Type in your car and get a realistic selling price from similar sales.
 - ⌛ **Upcoming Works** – Notes on ideas and projects I’m planning next.
         """
     )
@@ -36,3 +37,11 @@ st.markdown(
 Thanks for taking a look 👋
     """
 )
+
+# start loading the car data in the background while the visitor reads this;
+# the loaders are imported on the warm-up thread, so this page stays light
+from utils.cache_manager import start_warming
+from utils.config import CACHE_WARM
+
+if CACHE_WARM:
+    start_warming("utils.data_cache:warm_jobs")
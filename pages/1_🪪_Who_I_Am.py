@@ -3,6 +3,11 @@
 import streamlit as st
  
 st.title("About me")
+
+from utils.images import show_image
+from utils.profiling import PageTimer
+
+timer = PageTimer("Who I Am")
  
 NAME = "Anthony Vidales"
 PROGRAM = "Computer Scientist"
@@ -37,13 +42,16 @@ SKILLS = [
 
 
 
-photo_src = ('assets/headshot.jpg')
+# a photo from assets/; scripts/build_assets.py makes its smaller copies
+photo_src = "headshot.jpg"
  
 # -------------------- LAYOUT --------------------
 col1, col2 = st.columns([1, 2], vertical_alignment="center")
  
 with col1:
-    st.image(photo_src, caption=NAME, use_container_width=True)
+    # a third of the centered layout, or the full width once columns stack
+    with timer.section("headshot"):
+        show_image(photo_src, caption=NAME, sizes="(max-width: 640px) 100vw, 240px")
     st.markdown(
     """
         ✉️ [Email](aspam314@protonmail.com)  
@@ -71,4 +79,4 @@ for title, desc in SKILLS:
     st.markdown(f'#### {title}')
     st.write(desc)
 
- 
+timer.render()
@@ -1,10 +1,5 @@
 
-import pandas as pd
-import numpy as np
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
-import plotly.io as pio
 
 ##################################################################### 
 # Page config
@@ -15,10 +10,12 @@ st.set_page_config(
     layout="wide",
 )
 
-pio.templates.default = "plotly_white"
-
 st.title("Used Car EDA Gallery")
 
+from utils.profiling import PageTimer
+
+timer = PageTimer("Explorer")
+
 st.markdown(
     """
 This page showcases four exploratory data visualizations built from a used car
@@ -27,36 +24,51 @@ guide on how to read it. Below them are observations from the plots.
 """
 )
 
+# heavy imports go after the intro so the page paints before they load
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.io as pio
+
+from utils import car_stats
+from utils.artifacts import latest_build
+from utils.car_data import TRIM_LABELS
+from utils.data_cache import car_table, load_clean_data, start_warming
+
+pio.templates.default = "plotly_white"
+
 ##################################################################### 
 # Data Cleaning
 ##################################################################### 
-@st.cache_data
-def load_clean_data(path: str = "./data/car_prices.csv") -> pd.DataFrame:
-    df = pd.read_csv(path)
-    df.columns = [c.strip() for c in df.columns]
-
-    # need UTC so that pandas datetime funcs work
-    df["saledate"] = pd.to_datetime(df["saledate"], errors="coerce", utc=True)
-
-    # engineered features
-    df["sale_year"] = df["saledate"].dt.year
-    df["car_age"] = df["sale_year"] - df["year"]
+start_warming()
 
-    # get rid of ages that don't make sense
-    df = df[(df["car_age"] >= 0) & (df["car_age"] <= 60)]
 
-    # take out outliers using 5th–95th percentiles
-    outliers = ["odometer", "mmr", "sellingprice", "car_age"]
-    for col in outliers:
-        low, high = df[col].quantile([0.05, 0.95])
-        df = df[(df[col] >= low) & (df[col] <= high)]
+def precomputed(name: str):
+    # read the table from the artifact build when there is one
+    table = build.table(name) if build is not None else None
+    return car_table(name, trim) if table is None else table
 
-    df_clean = df.copy()
-    return df_clean
 
+trim = st.sidebar.selectbox(
+    "Outlier trimming",
+    options=list(TRIM_LABELS),
+    format_func=TRIM_LABELS.get,
+    key="explorer_trim",
+    help="Where the 5th–95th percentile cut-offs come from. Per make keeps "
+    "cheap and luxury brands from being cut off by the overall range.",
+)
 
-df_clean = load_clean_data()
-st.markdown(f"**Rows after cleaning & outlier removal:** {len(df_clean):,}")
+# artifact builds are trimmed over the whole dataset
+build = latest_build() if trim == "global" else None
+if build is None:
+    with timer.section("load_clean_data") as sec:
+        df_clean = load_clean_data(trim=trim)
+        sec.output(df_clean)
+    n_clean = len(df_clean)
+else:
+    n_clean = build.manifest["rows_clean"]
+
+st.markdown(f"**Rows after cleaning & outlier removal:** {n_clean:,}")
 st.markdown('---')
 ##################################################################### 
 # 1) Bar chart – Avg selling price vs MMR by make
@@ -81,28 +93,9 @@ st.markdown(
 """
 )
 
-# keep rows with valid MMR
-df_m = df_clean[df_clean["mmr"] > 0].copy()
-
-# price difference vs MMR
-df_m["price_diff"] = df_m["sellingprice"] - df_m["mmr"]
-
-# aggregate by make
-make_stats = (
-    df_m.groupby("make")
-    .agg(
-        avg_diff=("price_diff", "mean"),
-        med_diff=("price_diff", "median"),
-        n=("price_diff", "size"),
-    )
-    .reset_index()
-)
-
-# leave out the super unpopular ones
-make_stats = make_stats[make_stats["n"] >= 300]
-
-# sort from most underpriced to most overpriced
-make_stats = make_stats.sort_values("avg_diff")
+with timer.section("make_vs_mmr", rows_in=n_clean) as sec:
+    make_stats = precomputed("make_vs_mmr")
+    sec.output(make_stats)
 
 # size the gaps of the bars better (like notebook)
 n_makes_bar = len(make_stats)
@@ -140,7 +133,8 @@ bar_fig.update_layout(
     yaxis=dict(autorange="reversed"),
 )
 
-st.plotly_chart(bar_fig, use_container_width=True)
+with timer.section("chart: make vs MMR"):
+    st.plotly_chart(bar_fig, use_container_width=True)
 
 st.markdown("**Observations & insights:**")
 st.markdown(
@@ -176,18 +170,9 @@ st.markdown(
 """
 )
 
-state_data = df_clean.copy()
-state_data["state_upper"] = state_data["state"].astype(str).str.upper().str.strip()
-
-state_summary = (
-    state_data.groupby("state_upper")
-    .agg(
-        avg_price=("sellingprice", "mean"),
-        n_sales=("sellingprice", "size"),
-        avg_age=("car_age", "mean"),
-    )
-    .reset_index()
-)
+with timer.section("state_summary", rows_in=n_clean) as sec:
+    state_summary = precomputed("state_summary")
+    sec.output(state_summary)
 
 map_fig = px.choropleth(
     state_summary,
@@ -215,7 +200,8 @@ map_fig.update_traces(
 
 map_fig.update_layout(coloraxis_colorbar_title="Avg price")
 
-st.plotly_chart(map_fig, use_container_width=True)
+with timer.section("chart: state map"):
+    st.plotly_chart(map_fig, use_container_width=True)
 
 st.markdown("**Observations & insights:**")
 st.markdown(
@@ -251,43 +237,16 @@ st.markdown(
 """
 )
 
-pio.templates.default = "plotly_white"
-
-top_makes_for_lines = (
-    df_clean["make"]
-    .value_counts()
-    .head(20)
-    .index
-)
+import plotly.graph_objects as go
 
-# define odometer bins
-min_odo = df_clean["odometer"].min()
-max_odo = df_clean["odometer"].max()
-odo_bins = np.linspace(min_odo, max_odo, 11)
-odo_midpoints = (odo_bins[:-1] + odo_bins[1:]) / 2
+with timer.section("odometer_medians", rows_in=n_clean) as sec:
+    odo_stats = precomputed("odometer_medians")
+    sec.output(odo_stats)
 
 line_fig = go.Figure()
 trace_names = []
 
-for make in top_makes_for_lines:
-    tmp = df_clean[df_clean["make"] == make].copy()
-
-    tmp["odo_bin"] = pd.cut(
-        tmp["odometer"],
-        bins=odo_bins,
-        labels=odo_midpoints,
-        include_lowest=True,
-    )
-
-    grouped = (
-        tmp.groupby("odo_bin")["sellingprice"]
-        .median()
-        .reset_index()
-        .dropna()
-    )
-
-    grouped["odo_bin"] = grouped["odo_bin"].astype(float)
-
+for make, grouped in odo_stats.groupby("make", sort=False):
     line_fig.add_trace(
         go.Scatter(
             x=grouped["odo_bin"],
@@ -352,7 +311,8 @@ line_fig.update_layout(
     colorway=px.colors.qualitative.Safe,
 )
 
-st.plotly_chart(line_fig, use_container_width=True)
+with timer.section("chart: odometer lines"):
+    st.plotly_chart(line_fig, use_container_width=True)
 
 st.markdown("**Observations & insights:**")
 st.markdown(
@@ -389,45 +349,11 @@ st.markdown(
 """
 )
 
-df_hm = df_clean.copy()
-
-# Define age bands
-age_bins = [0, 3, 5, 7, 100]
-age_labels = ["<3 yrs", "3–5 yrs", "5–7 yrs", "7+ yrs"]
-
-df_hm["age_band"] = pd.cut(
-    df_hm["car_age"],
-    bins=age_bins,
-    labels=age_labels,
-    right=False,
-    include_lowest=True,
-)
-
-# Focus on top N makes by volume
-TOP_MAKES = 15
-top_makes_for_heat = (
-    df_hm["make"]
-    .value_counts()
-    .head(TOP_MAKES)
-    .index
-)
-
-df_hm = df_hm[df_hm["make"].isin(top_makes_for_heat)]
-
-# Count cars by (make, age_band)
-agg = (
-    df_hm.groupby(["make", "age_band"])
-    .size()
-    .reset_index(name="count")
-)
-
-# Compute within-make share
-totals = agg.groupby("make")["count"].sum().reset_index(name="total")
-agg = agg.merge(totals, on="make")
-agg["share"] = agg["count"] / agg["total"]
-
-# Pivot to matrix form: rows = makes, cols = age bands, values = share
-heat_data = agg.pivot(index="make", columns="age_band", values="share")
+# Focus on the top 15 makes by volume
+with timer.section("age_band_shares", rows_in=n_clean) as sec:
+    agg = precomputed("age_band_shares")
+    heat_data = car_stats.age_band_matrix(agg)
+    sec.output(agg)
 
 heatmap_fig = px.imshow(
     heat_data,
@@ -480,7 +406,8 @@ heatmap_fig.update_traces(
 
 heatmap_fig.update_xaxes(side="top")
 
-st.plotly_chart(heatmap_fig, use_container_width=True)
+with timer.section("chart: age heatmap"):
+    st.plotly_chart(heatmap_fig, use_container_width=True)
 
 st.markdown("**Observations & insights:**")
 st.markdown(
@@ -491,3 +418,4 @@ st.markdown(
 """
 )
 
+timer.render()
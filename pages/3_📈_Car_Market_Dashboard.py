@@ -1,55 +1,95 @@
 
 import datetime as dt
+import time
+from functools import partial
 
-import pandas as pd
-import plotly.express as px
 import streamlit as st
 
 st.set_page_config(page_title="Car Price Dashboard", layout="wide")
+st.title("Used Car Sales Dashboard 🚗")
+
+from utils.profiling import PageTimer
+
+timer = PageTimer("Dashboard")
+
+# heavy imports go after the title so the page paints before they load
+from utils import car_stats
+from utils.artifacts import latest_build, read_table
+from utils.backends import DuckDBBackend, PandasBackend, SalesFilters
+from utils.car_data import TRIM_LABELS
+from utils.config import DATA_BACKEND, EXPORT_MAX_BYTES, KPI_BUDGET
+from utils.data_cache import (
+    attach_clean_frame,
+    duckdb_connection,
+    load_daily_rollup,
+    load_dashboard_data,
+    load_export_estimate,
+    load_filtered_rollup,
+    load_kpi_sample,
+    load_model_stats,
+    start_warming,
+)
+from utils.export import EXPORT_FORMATS, export_file, format_bytes
+from utils.kpi_estimates import estimate_kpis, exact_cost
+from utils.prefetch import prefetch_view
+
+# how many of the view's best-selling makes to prefetch for the drill-down
+PREFETCH_MAKES = 3
 
 
 #####################################################################
 # Data Cleaning
 #####################################################################
-@st.cache_data
-def load_clean_data(path: str = "./data/car_prices.csv") -> pd.DataFrame:
-    df = pd.read_csv(path)
-    df.columns = [c.strip() for c in df.columns]
-
-    # need UTC so that pandas datetime funcs work
-    df["saledate"] = pd.to_datetime(df["saledate"], errors="coerce", utc=True)
-
-    # engineered features
-    df["sale_year"] = df["saledate"].dt.year
-    df["car_age"] = df["sale_year"] - df["year"]
-
-    # get rid of ages that don't make sense
-    df = df[(df["car_age"] >= 0) & (df["car_age"] <= 60)]
-
-    # take out outliers using 5th–95th percentiles
-    outliers = ["odometer", "mmr", "sellingprice", "car_age"]
-    for col in outliers:
-        low, high = df[col].quantile([0.05, 0.95])
-        df = df[(df[col] >= low) & (df[col] <= high)]
-
-    df_clean = df.copy()
-    return df_clean
+start_warming()
+
+trim = st.sidebar.selectbox(
+    "Outlier trimming",
+    options=list(TRIM_LABELS),
+    format_func=TRIM_LABELS.get,
+    key="dashboard_trim",
+    help="Where the 5th–95th percentile cut-offs come from. Per make keeps "
+    "cheap and luxury brands from being cut off by the overall range.",
+)
 
+# artifact builds are trimmed over the whole dataset
+build = latest_build() if trim == "global" else None
+price_cube = None if build is None else build.table("make_body_price_cube")
+
+if DATA_BACKEND == "duckdb":
+    # duckdb reads the artifact parquet itself, so nothing big is loaded here
+    clean_path = None if build is None else build.file("clean")
+    clean_path = None if clean_path is None else str(clean_path)
+    with timer.section("connect duckdb"):
+        backend = DuckDBBackend(duckdb_connection(clean_path, trim))
+    refreshed_at = duckdb_connection.refreshed_at(clean_path, trim)
+elif build is not None:
+    # the artifact build already has the dashboard's extra columns; its
+    # memory-mapped copy is shared with the other server processes
+    shared_path = build.file("clean_columns")
+    with timer.section("load artifacts") as sec:
+        if shared_path is not None:
+            df_clean = attach_clean_frame(str(shared_path))
+            refreshed_at = attach_clean_frame.refreshed_at(str(shared_path))
+        else:
+            df_clean = build.table("clean")
+            refreshed_at = read_table.refreshed_at(str(build.file("clean")))
+        sec.output(df_clean)
+    backend = PandasBackend(df_clean)
+else:
+    with timer.section("load_dashboard_data") as sec:
+        df_clean = load_dashboard_data(trim)
+        sec.output(df_clean)
+    backend = PandasBackend(df_clean)
+    refreshed_at = load_dashboard_data.refreshed_at(trim)
 
-df_clean = load_clean_data()
 
-# extra engineered columns for the dashboard
-df_clean = df_clean.copy()
-df_clean["price_diff"] = df_clean["sellingprice"] - df_clean["mmr"]
-df_clean["body_clean"] = df_clean["body"].astype(str).str.strip().str.title()
-df_clean["sale_year"] = df_clean["sale_year"].astype("Int64")
+# names the data behind the backend, for caching results computed from it
+source = (backend.name, trim, None if build is None else build.version, refreshed_at)
 
 
 #####################################################################
 # Header + data source / refresh info
 #####################################################################
-st.title("Used Car Sales Dashboard 🚗")
-
 header_left,  header_right = st.columns([2, 2])
 
 with header_left:
@@ -73,9 +113,10 @@ with st.expander("How to use this page 🧭", expanded=False):
     )
 
 with header_right:
-    st.markdown(
-        f"⏱️ **Last refreshed:** {dt.datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')}"
-    )
+    # when the data on screen was loaded, not when this rerun happened
+    if refreshed_at is not None:
+        refreshed = dt.datetime.fromtimestamp(refreshed_at, dt.timezone.utc)
+        st.markdown(f"⏱️ **Last refreshed:** {refreshed.strftime('%Y-%m-%d %H:%M UTC')}")
 
 
 #####################################################################
@@ -83,53 +124,47 @@ with header_right:
 #####################################################################
 st.sidebar.header("Filters")
 
-# make filter (top 15 by count to keep it reasonable)
-top_makes = (
-    df_clean["make"]
-    .value_counts()
-    .head(25)
-    .index.tolist()
-)
+with timer.section("filter options"):
+    options = backend.options()
+
+# make filter (top 25 by count to keep it reasonable)
+top_makes = options["top_makes"]
 selected_makes = st.sidebar.multiselect(
     "Select Make(s)",
     options=top_makes,
     default=top_makes,
+    key="dashboard_makes",
 )
 
 # body filter
-body_options = sorted(df_clean["body_clean"].dropna().unique().tolist())
+body_options = options["bodies"]
 selected_bodies = st.sidebar.multiselect(
     "Select Body style",
     options=body_options,
     default=body_options,
+    key="dashboard_bodies",
 )
 
 # selling price range slider
-price_min = int(df_clean["sellingprice"].min())
-price_max = int(df_clean["sellingprice"].max())
+price_min = options["price_min"]
+price_max = options["price_max"]
 price_range = st.sidebar.slider(
     "Selling price range ($)",
     min_value=price_min,
     max_value=price_max,
     value=(price_min, price_max),
     step=500,
+    key="dashboard_price",
 )
 
 
 #####################################################################
 # Apply filters
 #####################################################################
-df_filtered = df_clean.copy()
+filters = SalesFilters.of(selected_makes, selected_bodies, price_range)
 
-if selected_makes:
-    df_filtered = df_filtered[df_filtered["make"].isin(selected_makes)]
-
-if selected_bodies:
-    df_filtered = df_filtered[df_filtered["body_clean"].isin(selected_bodies)]
-
-df_filtered = df_filtered[
-    df_filtered["sellingprice"].between(price_range[0], price_range[1])
-]
+with timer.section(f"filters ({backend.name})"):
+    n_filtered = backend.count(filters)
 
 
 #####################################################################
@@ -137,29 +172,111 @@ df_filtered = df_filtered[
 #####################################################################
 st.subheader("Key Metrics")
 
+estimate_first = False
+
 # if filter is to scrict
-if df_filtered.empty:
+if n_filtered == 0:
     st.warning("No data matches the current filters.")
 else:
-    total_sales = int(df_filtered.shape[0])
-    avg_diff = df_filtered["price_diff"].mean()
-    median_diff = df_filtered["price_diff"].median()
-    median_odometer = df_filtered["odometer"].median()
-    median_age = df_filtered["car_age"].median()
+    kpi1, kpi2, kpi3, kpi4 = (col.empty() for col in st.columns(4))
+    # the count is exact already; it's the medians that read every row
+    kpi1.metric("Total sales", f"{n_filtered:,}")
+
+    def exact_kpis() -> dict:
+        started = time.perf_counter()
+        with timer.section("kpis"):
+            kpis = backend.kpis(filters)
+        exact_cost.record(backend.name, n_filtered, time.perf_counter() - started)
+        return kpis
+
+    def show_kpis(kpis: dict) -> None:
+        # formats are hard
+        kpi2.metric("Avg vs MMR", f"{kpis['avg_diff']:+,.0f} $")
+        kpi3.metric("Median vs MMR", f"{kpis['median_diff']:+,.0f} $")
+        kpi4.metric(
+            "Typical car",
+            f"{kpis['median_age']:.1f} yrs / {kpis['median_odometer']:,.0f} mi",
+        )
 
-    kpi1, kpi2, kpi3, kpi4 = st.columns(4)
+    def show_kpi_estimates(estimate: dict) -> None:
+        avg, median, age, odometer = (
+            estimate[k] for k in ("avg_diff", "median_diff", "median_age", "median_odometer")
+        )
+        with kpi2.container():
+            st.metric("Avg vs MMR", f"≈ {avg[0]:+,.0f} $")
+            st.caption(f"95%: {avg[1]:+,.0f} to {avg[2]:+,.0f} $")
+        with kpi3.container():
+            st.metric("Median vs MMR", f"≈ {median[0]:+,.0f} $")
+            st.caption(f"95%: {median[1]:+,.0f} to {median[2]:+,.0f} $")
+        with kpi4.container():
+            st.metric("Typical car", f"≈ {age[0]:.1f} yrs / {odometer[0]:,.0f} mi")
+            st.caption(
+                f"95%: {age[1]:.1f}–{age[2]:.1f} yrs / "
+                f"{odometer[1]:,.0f}–{odometer[2]:,.0f} mi"
+            )
 
-    # formats are hard
-    kpi1.metric("Total sales", f"{total_sales:,}")
-    kpi2.metric("Avg vs MMR", f"{avg_diff:+,.0f} $")
-    kpi3.metric("Median vs MMR", f"{median_diff:+,.0f} $")
-    kpi4.metric("Typical car", f"{median_age:.1f} yrs / {median_odometer:,.0f} mi")
+    # too slow for the budget: show estimates from the sample now and
+    # swap in the exact numbers at the end of the run, after the charts
+    estimate_first = exact_cost.predict(backend.name, n_filtered) > KPI_BUDGET
+    if estimate_first:
+        with timer.section("kpi estimates"):
+            kpi_sample = None if build is None else build.table("kpi_sample")
+            if kpi_sample is None:
+                kpi_sample = load_kpi_sample(source, backend)
+            kpi_estimate = estimate_kpis(
+                kpi_sample, selected_makes, selected_bodies, price_range
+            )
+        # nothing sampled matches a very narrow filter; that's quick exactly
+        estimate_first = kpi_estimate["sample_rows"] > 0
+
+    if estimate_first:
+        show_kpi_estimates(kpi_estimate)
+        estimate_note = st.empty()
+        estimate_note.caption(
+            f"≈ estimated from {kpi_estimate['sample_rows']:,} sampled sales; "
+            "exact numbers replace them once every sale is counted."
+        )
+    else:
+        show_kpis(exact_kpis())
+
+    # the file is only written when the button is clicked, chunk by chunk
+    # from the filter, into a temp file on disk; Streamlit then holds it in
+    # memory until it's downloaded, hence the size cap
+    with st.expander("Download these sales ⬇️", expanded=False):
+        export_format = st.radio(
+            "Format", options=list(EXPORT_FORMATS), horizontal=True
+        )
+        extension, mime = EXPORT_FORMATS[export_format]
+
+        with timer.section("export size estimate"):
+            estimated = load_export_estimate(
+                source, filters, export_format, n_filtered, backend
+            )
+        st.markdown(
+            f"**{n_filtered:,}** rows, about **{format_bytes(estimated or 0)}** "
+            f"as {export_format}."
+        )
+        if estimated is not None and estimated > EXPORT_MAX_BYTES:
+            st.warning(
+                f"Downloads are capped at {format_bytes(EXPORT_MAX_BYTES)}. "
+                "Narrow the filters in the sidebar to download these sales."
+            )
+        else:
+            st.download_button(
+                f"Download {export_format}",
+                data=lambda: export_file(backend.export_chunks(filters), export_format),
+                file_name=f"car_sales_filtered.{extension}",
+                mime=mime,
+                on_click="ignore",
+                use_container_width=True,
+            )
 
 
 #####################################################################
 # Visuals in two columns
 #####################################################################
-if not df_filtered.empty:
+if n_filtered:
+    import plotly.express as px
 
     left_col, right_col = st.columns((2, 1), gap="medium")
 
@@ -169,7 +286,17 @@ if not df_filtered.empty:
     with left_col:
         st.subheader("Price Levels by Make & Model")
 
-        available_makes = sorted(df_filtered["make"].unique())
+        # the makes people open most, computed in the background while they
+        # look at the overview; a new filter cancels what hasn't run yet
+        def drilldown_jobs():
+            worker = backend.for_thread()
+            for make in backend.top_makes(filters, PREFETCH_MAKES):
+                yield make, partial(load_model_stats, source, filters, make, worker)
+
+        with timer.section("prefetch drill-down"):
+            prefetch_view("dashboard_prefetch", (source, filters), drilldown_jobs)
+
+        available_makes = backend.makes(filters)
         drill_options = ["All makes"] + available_makes
 
         # removed help=... so no '?' tooltip
@@ -177,21 +304,19 @@ if not df_filtered.empty:
             "Choose a brand to explore",
             options=drill_options,
             index=0,
+            key="dashboard_make_view",
         )
 
         if selected_make_view == "All makes":
-            make_stats = (
-                df_filtered.groupby("make", as_index=False)
-                .agg(
-                    avg_price=("sellingprice", "mean"),
-                    avg_diff=("price_diff", "mean"),
-                    n=("sellingprice", "size"),
-                )
-                .sort_values("avg_price", ascending=False)
-            )
-
-            # keep reasonably common makes
-            make_stats = make_stats[make_stats["n"] >= 100].head(15)
+            with timer.section("make_price_stats") as sec:
+                # the cube is exact as long as the upper price handle is at the top
+                if price_cube is not None and price_range[1] == price_max:
+                    make_stats = car_stats.make_price_stats_from_cube(
+                        price_cube, selected_makes, selected_bodies, price_range[0]
+                    )
+                else:
+                    make_stats = backend.make_price_stats(filters)
+                sec.output(make_stats)
 
             fig_left = px.bar(
                 make_stats,
@@ -215,22 +340,9 @@ if not df_filtered.empty:
             fig_left.update_layout(yaxis=dict(autorange="reversed"))
 
         else:
-            df_make = df_filtered[df_filtered["make"] == selected_make_view]
-
-            model_stats = (
-                df_make.groupby("model", as_index=False)
-                .agg(
-                    avg_price=("sellingprice", "mean"),
-                    avg_diff=("price_diff", "mean"),
-                    n=("sellingprice", "size"),
-                )
-            )
-
-            # keep reasonably common models
-            model_stats = (
-                model_stats[model_stats["n"] >= 30]
-                .sort_values("avg_price", ascending=False)
-            )
+            with timer.section("model_price_stats") as sec:
+                model_stats = load_model_stats(source, filters, selected_make_view, backend)
+                sec.output(model_stats)
 
             fig_left = px.bar(
                 model_stats,
@@ -253,7 +365,8 @@ if not df_filtered.empty:
             )
             fig_left.update_layout(yaxis=dict(autorange="reversed"))
 
-        st.plotly_chart(fig_left, use_container_width=True)
+        with timer.section("chart: price levels"):
+            st.plotly_chart(fig_left, use_container_width=True)
 
     #################################################################
     # RIGHT
@@ -261,17 +374,9 @@ if not df_filtered.empty:
     with right_col:
         st.subheader("Price Compared to MMR by Body Style")
 
-        body_stats = (
-            df_filtered.groupby("body_clean", as_index=False)
-            .agg(
-                avg_diff=("price_diff", "mean"),
-                median_diff=("price_diff", "median"),
-                n=("price_diff", "size"),
-            )
-        )
-
-        # keep common body styles
-        body_stats = body_stats[body_stats["n"] >= 500].sort_values("avg_diff")
+        with timer.section("body_vs_mmr") as sec:
+            body_stats = backend.body_vs_mmr(filters)
+            sec.output(body_stats)
 
         if not body_stats.empty:
             fig_right = px.bar(
@@ -294,50 +399,94 @@ if not df_filtered.empty:
             fig_right.add_vline(x=0, line_dash="dash", line_color="black")
             fig_right.update_layout(yaxis=dict(autorange="reversed"))
 
-            st.plotly_chart(fig_right, use_container_width=True)
-
+            with timer.section("chart: body vs MMR"):
+                st.plotly_chart(fig_right, use_container_width=True)
 
 
 #####################################################################
-# Narrative section – buyers vs sellers (simpler language)
+# Sales over time – from daily rollups, never the raw rows
 #####################################################################
-st.subheader("What This View Means 🧭")
+if n_filtered:
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
 
-if df_filtered.empty:
-    st.info("Adjust the filters to see insight bullets here.")
-else:
-    avg_diff = df_filtered["price_diff"].mean()
-    median_diff = df_filtered["price_diff"].median()
+    st.subheader("Sales Over Time 📅")
 
-    # by-make stats (used mainly for the buyer side)
-    make_diff = (
-        df_filtered.groupby("make", as_index=False)
-        .agg(avg_diff=("price_diff", "mean"), n=("price_diff", "size"))
+    grain = st.radio(
+        "Group sales by",
+        options=list(car_stats.TIME_GRAINS),
+        index=1,
+        horizontal=True,
     )
-    make_diff = make_diff[make_diff["n"] >= 100]
-
-    if not make_diff.empty:
-        cheapest_row = make_diff.sort_values("avg_diff").iloc[0]
-        cheapest_make = cheapest_row["make"]
-        cheapest_make_diff = cheapest_row["avg_diff"]
-    else:
-        cheapest_make = "some makes"
-        cheapest_make_diff = median_diff
 
-    # by-body stats (used mainly for the seller side and to tie to the body chart)
-    body_diff = (
-        df_filtered.groupby("body_clean", as_index=False)
-        .agg(avg_diff=("price_diff", "mean"), n=("price_diff", "size"))
+    with timer.section("daily rollup") as sec:
+        # the rollup is exact as long as the upper price handle is at the top;
+        # below it the handle can split a bucket, so roll up the matching rows
+        if price_range[1] == price_max:
+            rollup = None if build is None else build.table("daily_rollup")
+            if rollup is None:
+                rollup = load_daily_rollup(source, backend)
+            rollup_filters = (selected_makes, selected_bodies, price_range)
+        else:
+            rollup = load_filtered_rollup(source, filters, backend)
+            rollup_filters = (None, None, (price_min, price_max))
+        sec.output(rollup)
+
+    with timer.section("sales_over_time", rows_in=rollup) as sec:
+        over_time = car_stats.sales_over_time(rollup, *rollup_filters, price_max, grain)
+        sec.output(over_time)
+
+    fig_time = make_subplots(
+        rows=3,
+        cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.06,
+        subplot_titles=("Sales", "Median selling price ($)", "Average vs MMR ($)"),
+    )
+    fig_time.add_trace(
+        go.Bar(x=over_time["period"], y=over_time["n"], name="Sales"),
+        row=1, col=1,
+    )
+    fig_time.add_trace(
+        go.Scatter(
+            x=over_time["period"], y=over_time["median_price"],
+            mode="lines+markers", name="Median price",
+        ),
+        row=2, col=1,
+    )
+    fig_time.add_trace(
+        go.Scatter(
+            x=over_time["period"], y=over_time["avg_diff"],
+            mode="lines+markers", name="Avg vs MMR",
+        ),
+        row=3, col=1,
+    )
+    fig_time.add_hline(y=0, line_dash="dash", line_color="black", row=3, col=1)
+    fig_time.update_layout(height=650, showlegend=False, margin=dict(t=40))
+
+    with timer.section("chart: sales over time"):
+        st.plotly_chart(fig_time, use_container_width=True)
+    st.caption(
+        "Follows the filters on the left. Medians are estimated from "
+        "$500 price bands, so they can be off by up to half a band."
     )
-    body_diff = body_diff[body_diff["n"] >= 500]
 
-    if not body_diff.empty:
-        strongest_body_row = body_diff.sort_values("avg_diff").iloc[-1]
-        strongest_body = strongest_body_row["body_clean"]
-        strongest_body_diff = strongest_body_row["avg_diff"]
-    else:
-        strongest_body = "some body styles"
-        strongest_body_diff = median_diff
+
+#####################################################################
+# Narrative section – buyers vs sellers (simpler language)
+#####################################################################
+st.subheader("What This View Means 🧭")
+
+if n_filtered == 0:
+    st.info("Adjust the filters to see insight bullets here.")
+else:
+    with timer.section("narrative_stats"):
+        story = backend.narrative_stats(filters)
+    avg_diff = story["avg_diff"]
+    cheapest_make = story["cheapest_make"]
+    cheapest_make_diff = story["cheapest_make_diff"]
+    strongest_body = story["strongest_body"]
+    strongest_body_diff = story["strongest_body_diff"]
 
     buyers_col, sellers_col = st.columns(2)
 
@@ -362,3 +511,12 @@ else:
             """
         )
 
+
+#####################################################################
+# Exact KPIs, in place of the estimates shown up top
+#####################################################################
+if estimate_first:
+    show_kpis(exact_kpis())
+    estimate_note.empty()
+
+timer.render()
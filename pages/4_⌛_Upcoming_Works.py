@@ -1,7 +1,4 @@
-import pandas as pd
 import streamlit as st
-import plotly.express as px
-from pathlib import Path
 
 st.set_page_config(page_title="Future Work", page_icon="⌛", layout="centered")
 st.title('Under Construction🚧')
@@ -12,8 +9,8 @@ st.markdown(
         For starters:  
         * Expand this set to include more technical information about the vehicles in it, like horse power and torque.  
         * Add these features in the plots.
-        * Train k-means model to cluster them by likeness and average the price of the cluster.  
-        * Add a functionality to the page to that the user can input there car and it will return a realisic selling price via the k-means clusters.  
+        * ~~Train k-means model to cluster them by likeness and average the price of the cluster.~~ Done!  
+        * ~~Add a functionality to the page to that the user can input there car and it will return a realisic selling price via the k-means clusters.~~ Done, check out **💰 Price Estimator**.  
         """
         )
 st.markdown('---')
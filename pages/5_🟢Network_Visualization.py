@@ -1,7 +1,4 @@
-import networkx as nx
-import matplotlib.pyplot as plt
 import streamlit as st
-from networkx.algorithms.community import greedy_modularity_communities
 
 # Page Config ###########################################
 st.set_page_config(
@@ -18,110 +15,180 @@ st.markdown(
         )
 st.markdown("---")
 
+from utils.profiling import PageTimer
+
+timer = PageTimer("Network")
+
+# heavy imports go after the intro so the page paints before they load
+import pandas as pd
+
+from utils.artifacts import latest_build
+from utils.friends import FRIENDSHIPS
+from utils.graph_metrics import (
+    centrality_table,
+    leaders,
+    page_of,
+    top_k,
+)
+from utils.data_cache import start_warming
+from utils.graph_render import extend_layout, network_figure, spring_positions
+from utils.incremental_graph import IncrementalGraph
 
 
 # Data ##################################################
 
-data = [
-        ('Alice', 'Bob'),
-        ('Alice','Charlie'),
-        ('Bob','Charlie'),
-        ('Charlie','Diana'),
-        ('Diana','Eve'),
-        ('Bob','Diana'),
-        ('Frank','Eve'),
-        ('Eve','Ian'),
-        ('Diana','Ian'),
-        ('Ian','Grace'),
-        ('Grace','Hannah'),
-        ('Hannah','Jack'),
-        ('Grace','Jack'),
-        ('Charlie','Frank'),
-        ('Alice','Eve'),
-        ('Bob','Jack'),
-        ]
-
-g = nx.Graph()
-g.add_edges_from(data)
-pos = nx.spring_layout(g)  # Force-directed layout
-nx.draw(g, pos, with_labels=True, node_color='lightgreen', edge_color='gray')
-
-st.pyplot(plt.show())
-
-person = ''
-value = 0
-# ID who is the most connected ##############################
-st.markdown('---')
-conn = nx.degree_centrality(g)
-for node, score in conn.items():
-    st.write(f'Person: {node}: Degree Score: {score}')
-st.markdown('The people with the highest degree centrality are:')
-st.write('Bob, Charlie, Diana, Eve')
+data = FRIENDSHIPS
+start_warming()
+
+# Use the prebuilt layout and metrics when they were built for this data
+build = latest_build()
+prebuilt = build.json('network') if build else None
+if prebuilt is not None and sorted(map(sorted, prebuilt['edges'])) != sorted(map(sorted, data)):
+    prebuilt = None
+
+# Edits made on this page live in the session, metrics update as they go
+if 'network' not in st.session_state:
+    st.session_state['network'] = IncrementalGraph(
+            data, precomputed=prebuilt['metrics'] if prebuilt else None
+            )
+network = st.session_state['network']
+
+with st.expander('Edit the network ✏️', expanded=False):
+    st.markdown(
+            """
+            Add or remove a friendship. Degree, connected components and
+            communities update right away; the heavier centralities are
+            recomputed in the background and show as **stale** until then.
+            """
+            )
+    left, right = st.columns(2)
+    person_a = left.text_input('Person', value='Alice').strip()
+    person_b = right.text_input('Friend', value='Jack').strip()
+
+    add_col, remove_col, refresh_col = st.columns(3)
+    if add_col.button('Add friendship', use_container_width=True, key='network_add'):
+        if not person_a or not person_b or not network.add_edge(person_a, person_b):
+            st.warning(f'Could not add {person_a} – {person_b}.')
+    if remove_col.button('Remove friendship', use_container_width=True):
+        if not network.remove_edge(person_a, person_b):
+            st.warning(f'{person_a} and {person_b} are not friends.')
+    if refresh_col.button('Recompute everything now', use_container_width=True):
+        network.refresh_now()
+
+    auto_refresh = st.toggle('Recompute heavy metrics in the background', value=True)
+    if auto_refresh:
+        network.schedule_refresh()
+
+    st.dataframe(
+            pd.DataFrame(network.status()),
+            hide_index=True,
+            use_container_width=True,
+            )
+    components = network.components()
+    st.markdown(
+            f'**{len(components)}** connected component(s), largest has '
+            f'**{len(components[0]) if components else 0}** people.'
+            )
+
+
+@st.fragment(run_every=1)
+def wait_for_refresh():
+    # rerun the page once the background recompute lands
+    if not network.refreshing:
+        st.rerun()
+    st.caption('⏳ Recomputing centralities in the background…')
+
+
+if network.refreshing:
+    wait_for_refresh()
+
+g = network.graph
+with timer.section('layout', rows_in=g.number_of_nodes()):
+    base_pos = prebuilt['layout'] if prebuilt else spring_positions(tuple(data))
+    pos = extend_layout(g, base_pos)
+
+# Centrality scores, also used to size/colour the nodes #####
+with timer.section('centralities', rows_in=g.number_of_nodes()):
+    centralities = {
+            'Degree': network.degree_centrality(),
+            'Betweenness': network.metric('Betweenness'),
+            'Closeness': network.metric('Closeness'),
+            'Eigenvector': network.metric('Eigenvector'),
+            }
+
+size_by = st.selectbox(
+    'Size and color people by', options=list(centralities), key='network_size_by'
+)
+with timer.section('chart: network'):
+    st.plotly_chart(
+            network_figure(g, pos, values=centralities[size_by], metric_name=size_by),
+            use_container_width=True,
+            )
 
-# Betweenness Centrality #####################################
-st.markdown('---')
-between= nx.betweenness_centrality(g, weight='weight')
-for node, score in between.items():
-    st.write(f'Person: {node}: Betweenness Score: {score}')
-    if score > value:
-        value = score
-        person = node
-st.markdown('The person that is the most connected with others is:')
-st.write(person)
-
-# Closeness Centrality ######################################
+
+# Leaderboards: top k people per centrality ##################
 st.markdown('---')
-person = ''
-value = 0
-close = nx.closeness_centrality(g)
-for node, score in close.items():
-    st.write(f'Person: {node}: Clooseness to others: {score}')
-    if score > value:
-        value = score
-        person = node
-st.markdown('The person that is the most close to others is:')
-st.write(person)
+st.subheader('Who stands out')
+
+k = st.slider(
+    'How many people per leaderboard', min_value=1, max_value=10, value=5, key='network_top_k'
+)
+
+blurbs = {
+        'Degree': 'The people with the highest degree centrality are:',
+        'Betweenness': 'The person that is the most connected with others is:',
+        'Closeness': 'The person that is the most close to others is:',
+        'Eigenvector': 'The person that has the most infulance on others is:',
+        }
+
+for col, (metric, scores) in zip(st.columns(len(centralities)), centralities.items()):
+    ranked = top_k(scores, k)
+    with col:
+        st.markdown(f'**{metric} Centrality**')
+        st.dataframe(
+                pd.DataFrame(ranked, columns=['Person', 'Score']),
+                hide_index=True,
+                use_container_width=True,
+                )
+        st.markdown(blurbs[metric])
+        st.write(', '.join(str(n) for n in leaders(ranked)))
 
 # Community Detection ########################################
 st.markdown('---')
-communites = greedy_modularity_communities(g)
-for i, community in enumerate(communites, 1):
-    st.write(f'Community {i}: {list(community)}')
-st.markdown('These are the communities of this friend gorup graph:')
+node_to_comm = network.communities()
+n_communities = len(set(node_to_comm.values()))
+st.markdown(f'This friend gorup graph splits into **{n_communities}** communities:')
 
 # Assign a unique color to each community
-palette = ["tab:blue", "tab:orange", "tab:green", "tab:red", "tab:purple"]
-node_to_comm = {}
+palette = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd"]
+community_colors = {n: palette[(c - 1) % len(palette)] for n, c in node_to_comm.items()}
+
+# Draw graph again with community colors
+with timer.section('chart: communities'):
+    st.plotly_chart(
+        network_figure(
+            g, pos, colors=community_colors, title="Friend Communities w/no weights"
+        ),
+        use_container_width=True,
+    )
+
+# All scores in one table #####################################
+st.markdown('---')
+st.subheader('Every score, one table')
 
-for c_index, comm in enumerate(communites):
-    for node in comm:
-        node_to_comm[node] = c_index
+with timer.section('centrality_table', rows_in=g.number_of_nodes()) as sec:
+    table = centrality_table(centralities, communities=node_to_comm)
+    sec.output(table)
 
-# Build list of colors for drawing
-community_colors = [palette[node_to_comm[n]] for n in g.nodes()]
+size_col, page_col = st.columns(2)
+page_size = size_col.selectbox('Rows per page', options=[25, 50, 100, 250], index=1)
+n_pages = max(1, -(-len(table) // page_size))
+page = page_col.number_input(f'Page (of {n_pages})', min_value=1, max_value=n_pages, value=1)
 
-# Draw graph again with community colors
-plt.figure(figsize=(8,6))
-nx.draw(
-    g, pos, with_labels=True, node_size=3000,
-    node_color=community_colors, edge_color="gray",
-    font_size=10, font_weight="bold", arrows=True
-)
-weights = nx.get_edge_attributes(g, 'weight')
-nx.draw_networkx_edge_labels(g, pos, edge_labels=weights)
-plt.title("Friend Communities w/no weights")
-st.pyplot(plt.show())
-
-person = ''
-value = 0
-
-eigenvector_centrality = nx.eigenvector_centrality(g, max_iter=1000)
-st.markdown("Eigenvector Centrality:")
-for node, score in eigenvector_centrality.items():
-    st.markdown(f"{node}: {score}")
-    if score > value:
-        value = score
-        person = node
-st.markdown('The person that has the most infulance on others is:')
-st.write(person)
+st.dataframe(
+        page_of(table, page, page_size),
+        hide_index=True,
+        use_container_width=True,
+        )
 
+timer.render()
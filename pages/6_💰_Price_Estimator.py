@@ -0,0 +1,120 @@
+import datetime as dt
+
+import streamlit as st
+
+#####################################################################
+# Page config
+#####################################################################
+st.set_page_config(
+    page_title="What's My Car Worth?",
+    page_icon="💰",
+    layout="centered",
+)
+
+st.title("What's My Car Worth? 💰")
+st.markdown(
+    """
+Tell me about your car and I'll find the group of similar cars in the used
+car sales data (a k-means cluster) and show what they actually sold for.
+Leave out anything you don't know.
+"""
+)
+
+from utils.profiling import PageTimer
+
+timer = PageTimer("Estimator")
+
+from utils.artifacts import latest_build
+from utils.data_cache import load_price_model, start_warming
+
+
+#####################################################################
+# Model
+#####################################################################
+start_warming()
+
+build = latest_build()
+model_path = None if build is None else build.file("price_model")
+
+if model_path is None:
+    st.info(
+        "The price model hasn't been trained yet. Run "
+        "`python scripts/build_artifacts.py` and reload this page."
+    )
+    st.stop()
+
+with timer.section("load model"):
+    model = load_price_model(str(model_path))
+
+# next year's models are already on sale; builds from before the model kept
+# its years fall back to the calendar
+first_year, last_year = model.years or (1980, dt.date.today().year)
+max_year = last_year + 1
+
+
+#####################################################################
+# Your car
+#####################################################################
+UNKNOWN = "I don't know"
+
+with st.form("car"):
+    left, right = st.columns(2)
+    make = left.selectbox("Make", options=model.vocab["make"])
+    body = right.selectbox("Body style", options=[UNKNOWN] + model.vocab["body_clean"])
+    years = list(range(max_year, min(first_year, 1980) - 1, -1))
+    year = left.selectbox(
+        "Model year", options=[UNKNOWN] + years,
+        index=1 + years.index(min(2012, max_year)),
+    )
+    odometer = right.number_input(
+        "Miles on it", min_value=0, value=None, step=1_000, placeholder=UNKNOWN,
+        help="Leave it empty if you don't know.",
+    )
+
+    condition = left.number_input(
+        "Condition (optional)", min_value=0.0, value=None, step=1.0,
+        help="The auction condition score, same scale as the dataset.",
+    )
+    mmr = right.number_input(
+        "MMR value in $ (optional)", min_value=0, value=None, step=500,
+        help="Manheim Market Report value, if you've looked it up.",
+    )
+    submitted = st.form_submit_button("Estimate", use_container_width=True)
+
+# the last car submitted, so the estimate stays put across reruns
+if submitted:
+    st.session_state["estimator_car"] = {
+        "make": make,
+        "body_clean": None if body == UNKNOWN else body,
+        "year": None if year == UNKNOWN else year,
+        "odometer": odometer,
+        "condition": condition,
+        "mmr": mmr,
+    }
+car = st.session_state.get("estimator_car")
+
+if car is None:
+    st.info("Fill in what you know about your car and press **Estimate**.")
+    st.stop()
+
+with timer.section("estimate"):
+    estimate = model.estimate(car)
+
+
+#####################################################################
+# Estimate
+#####################################################################
+st.subheader("Estimated selling price")
+
+kpi1, kpi2, kpi3 = st.columns(3)
+kpi1.metric("Typical price", f"{estimate.median:,.0f} $")
+kpi2.metric("Middle half sold for", f"{estimate.low:,.0f} – {estimate.high:,.0f} $")
+kpi3.metric("Similar sales", f"{estimate.n:,}")
+
+st.caption(
+    f"Based on the {estimate.n:,} sales in the closest cluster "
+    f"(#{estimate.cluster}, average {estimate.mean:,.0f} $). The range is the "
+    "25th to 75th percentile of what those cars sold for."
+)
+
+timer.render()
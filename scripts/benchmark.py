@@ -0,0 +1,190 @@
+"""Time the data path behind the Explorer and Dashboard pages.
+
+Runs ingest, cleaning, the dashboard filters and every chart aggregation on a
+synthetic dataset (generated on first use, see ``make_synthetic_data.py``)
+and writes the timings and peak traced memory of each stage as JSON.
+
+    python scripts/benchmark.py --rows 100k
+    python scripts/benchmark.py --rows 1m --repeat 5 --out bench_1m.json
+    python scripts/benchmark.py --data data/car_prices.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+import warnings
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from scripts.make_synthetic_data import default_path, generate, parse_rows  # noqa: E402
+from utils import car_stats  # noqa: E402
+from utils.car_data import (  # noqa: E402
+    TRIM_GROUPS,
+    add_dashboard_columns,
+    clean_car_prices,
+    prepare_car_prices,
+    read_car_prices,
+    trim_outliers,
+)
+
+# pandas falls back to dateutil for the saledate strings and says so each time
+warnings.filterwarnings("ignore", message="Could not infer format")
+
+
+def measure(fn, repeat: int, memory: bool) -> tuple[object, dict]:
+    """Run ``fn`` ``repeat`` times (plus once traced, for the memory peak)."""
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+
+    stats = {
+        "seconds_min": round(min(times), 6),
+        "seconds_median": round(statistics.median(times), 6),
+        "peak_mb": None,
+    }
+    if memory:
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        stats["peak_mb"] = round(peak / 2**20, 2)
+    return result, stats
+
+
+def n_rows(result) -> int | None:
+    if isinstance(result, pd.DataFrame):
+        return len(result)
+    if isinstance(result, tuple) and isinstance(result[0], pd.DataFrame):
+        return len(result[0])
+    return None
+
+
+def run(data: Path, repeat: int, memory: bool) -> list[dict]:
+    results = []
+
+    def stage(name: str, group: str, fn, rows_in: int | None = None):
+        out, stats = measure(fn, repeat, memory)
+        results.append(
+            {"stage": name, "group": group, "rows_in": rows_in, "rows_out": n_rows(out)}
+            | stats
+        )
+        print(f"  {group:<10} {name:<22} {stats['seconds_min'] * 1000:>10.1f} ms", file=sys.stderr)
+        return out
+
+    raw = stage("ingest", "load", lambda: read_car_prices(str(data)))
+    df_clean = stage("clean", "load", lambda: clean_car_prices(raw.copy()), len(raw))
+    rows = len(df_clean)
+
+    # outlier trimming alone, global vs per group
+    prepared = prepare_car_prices(raw.copy())
+    for trim in TRIM_GROUPS:
+        stage(f"trim_{trim}", "load", lambda: trim_outliers(prepared, trim), len(prepared))
+
+    try:
+        from utils.car_data_polars import clean_car_prices_polars
+    except ImportError:
+        pass
+    else:
+        # read + clean in one lazy query; its memory lives outside Python, so
+        # tracemalloc only sees the final pandas frame
+        stage("clean_polars", "load", lambda: clean_car_prices_polars(str(data)))
+
+    # Explorer charts
+    stage("make_vs_mmr", "explorer", lambda: car_stats.make_vs_mmr(df_clean), rows)
+    stage("state_summary", "explorer", lambda: car_stats.state_summary(df_clean), rows)
+    stage("odometer_medians", "explorer", lambda: car_stats.odometer_medians(df_clean), rows)
+    stage("age_band_shares", "explorer", lambda: car_stats.age_band_shares(df_clean), rows)
+
+    # Dashboard: default view (every top make/body, full price range) and a
+    # narrow one, like a user who has been clicking around
+    df_dash = stage("dashboard_columns", "dashboard", lambda: add_dashboard_columns(df_clean), rows)
+    top_makes = df_dash["make"].value_counts().head(25).index.tolist()
+    bodies = sorted(df_dash["body_clean"].dropna().unique().tolist())
+    full_range = (df_dash["sellingprice"].min(), df_dash["sellingprice"].max())
+    narrow_range = tuple(np.percentile(df_dash["sellingprice"], [25, 75]))
+
+    views = {
+        "default": (top_makes, bodies, full_range),
+        "narrow": (top_makes[:3], bodies[:5], narrow_range),
+    }
+    for view, (makes, body_sel, price_range) in views.items():
+        df_filtered = stage(
+            f"filter_{view}", "dashboard",
+            lambda: car_stats.filter_sales(df_dash, makes, body_sel, price_range),
+            rows,
+        )
+        n = len(df_filtered)
+        stage(f"kpis_{view}", "dashboard", lambda: car_stats.sales_kpis(df_filtered), n)
+        stage(f"make_stats_{view}", "dashboard", lambda: car_stats.make_price_stats(df_filtered), n)
+        if n:
+            make = df_filtered["make"].value_counts().index[0]
+            stage(
+                f"model_stats_{view}", "dashboard",
+                lambda: car_stats.model_price_stats(df_filtered, make), n,
+            )
+        stage(f"body_stats_{view}", "dashboard", lambda: car_stats.body_vs_mmr(df_filtered), n)
+        stage(f"narrative_{view}", "dashboard", lambda: car_stats.narrative_stats(df_filtered), n)
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="100k",
+                        help="synthetic row count (100k, 1m, 10m or a number)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data", type=Path,
+                        help="benchmark this CSV instead of synthetic data")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the traced run used for memory peaks")
+    parser.add_argument("--out", type=Path, help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    data = args.data
+    if data is None:
+        data = default_path(args.rows.lower(), args.seed)
+        if not data.exists():
+            print(f"generating {data}", file=sys.stderr)
+            generate(parse_rows(args.rows), data, args.seed)
+
+    stages = run(data, args.repeat, memory=not args.no_memory)
+    report = {
+        "meta": {
+            "data": str(data),
+            "synthetic": args.data is None,
+            "seed": args.seed if args.data is None else None,
+            "repeat": args.repeat,
+            "timestamp": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+        },
+        "stages": stages,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        args.out.write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
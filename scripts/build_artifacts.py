@@ -0,0 +1,195 @@
+"""Precompute everything the pages need, ahead of time.
+
+Reads the sales CSV once, cleans it and writes the cleaned columnar data (as
+Parquet and as memory-mappable column files) and every chart table the
+Explorer and Dashboard draw from (with the sample the Dashboard estimates
+KPIs from), plus the Network page's layout and metrics and the price
+estimator's k-means index, to a new directory under ``artifacts/``.
+``artifacts/LATEST`` is switched to it only once the build is complete, so
+a running app never sees half a build. Older builds are removed after the
+switch, except the one before, which running servers may still have open.
+
+    python scripts/build_artifacts.py
+    python scripts/build_artifacts.py --data data/synthetic/car_prices_1m_seed0.csv
+    python scripts/build_artifacts.py --engine polars
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import networkx as nx  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from utils import car_stats  # noqa: E402
+from utils.artifacts import (  # noqa: E402
+    LATEST_FILE,
+    MANIFEST_FILE,
+    SCHEMA_VERSION,
+    file_hash,
+)
+from utils.car_data import (  # noqa: E402
+    DATA_PATH,
+    add_dashboard_columns,
+    clean_car_prices,
+    read_car_prices,
+)
+from utils.config import ARTIFACT_ROOT, CLEAN_ENGINE  # noqa: E402
+from utils.friends import FRIENDSHIPS  # noqa: E402
+from utils.graph_render import spring_layout  # noqa: E402
+from utils.incremental_graph import full_metrics  # noqa: E402
+from utils.kpi_estimates import stratified_sample  # noqa: E402
+from utils.price_model import parquet_batches, train  # noqa: E402
+from utils.shared_columns import write_columns  # noqa: E402
+
+warnings.filterwarnings("ignore", message="Could not infer format")
+
+# builds kept after a switch: the new one and the one before it, whose
+# files servers that haven't reloaded yet may still read or have mapped
+KEEP_BUILDS = 2
+
+
+def car_tables(df: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """Every table the car pages read, keyed by artifact name."""
+    age_bands, _ = car_stats.age_band_shares(df)
+    return {
+        "clean": df,
+        "make_vs_mmr": car_stats.make_vs_mmr(df),
+        "state_summary": car_stats.state_summary(df),
+        "odometer_medians": car_stats.odometer_medians(df),
+        "age_band_shares": age_bands,
+        "make_body_price_cube": car_stats.make_body_price_cube(df),
+        "daily_rollup": car_stats.daily_rollup(df),
+        "kpi_sample": stratified_sample(df),
+    }
+
+
+def network_artifact() -> dict:
+    return {
+        "edges": [list(e) for e in FRIENDSHIPS],
+        "layout": spring_layout(FRIENDSHIPS),
+        "metrics": full_metrics(nx.Graph(FRIENDSHIPS)),
+    }
+
+
+def clean(data: Path, engine: str) -> tuple[int, pd.DataFrame]:
+    """Raw row count and the cleaned frame, with the chosen engine."""
+    if engine == "polars":
+        from utils.car_data_polars import clean_car_prices_polars, count_rows
+
+        return count_rows(str(data)), clean_car_prices_polars(str(data))
+    raw = read_car_prices(str(data))
+    return len(raw), clean_car_prices(raw)
+
+
+def build(
+    data: Path, root: Path, engine: str = "pandas", price_clusters: int = 400
+) -> Path:
+    started = time.perf_counter()
+    source_hash = file_hash(data)
+    # what went into the build, then unique, so a rebuild never touches a
+    # directory a server may be reading
+    stamp = dt.datetime.now(dt.timezone.utc).strftime("%Y%m%dT%H%M%S")
+    key = f"v{SCHEMA_VERSION}-{source_hash[:12]}-{engine}-k{price_clusters}"
+
+    rows_raw, df = clean(data, engine)
+    df = add_dashboard_columns(df)
+
+    root.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=".build-", dir=root))
+    version = f"{key}-{stamp}-{staging.name[-6:]}"
+    files = {}
+    try:
+        for name, table in car_tables(df).items():
+            files[name] = f"{name}.parquet"
+            table.to_parquet(staging / files[name], index=False)
+            print(f"  {name:<22} {len(table):>10,} rows", file=sys.stderr)
+
+        # the same rows as memory-mapped columns, shared by every server process
+        files["clean_columns"] = "clean_columns"
+        write_columns(df.reset_index(drop=True), staging / files["clean_columns"])
+
+        # trained from the parquet just written, one batch at a time
+        files["price_model"] = "price_model.npz"
+        model = train(parquet_batches(staging / files["clean"]), k=price_clusters)
+        model.save(staging / files["price_model"])
+        print(f"  {'price_model':<22} {len(model.centroids):>10,} clusters", file=sys.stderr)
+
+        files["network"] = "network.json"
+        (staging / files["network"]).write_text(json.dumps(network_artifact()))
+
+        manifest = {
+            "schema_version": SCHEMA_VERSION,
+            "version": version,
+            "built_at": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+            "build_seconds": round(time.perf_counter() - started, 2),
+            "source": str(data),
+            "source_sha256": source_hash,
+            "clean_engine": engine,
+            "price_clusters": price_clusters,
+            "rows_raw": rows_raw,
+            "rows_clean": len(df),
+            "price_range": [float(df["sellingprice"].min()), float(df["sellingprice"].max())],
+            "files": files,
+        }
+        (staging / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2))
+
+        target = root / version
+        os.rename(staging, target)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    # switch LATEST last, atomically
+    pointer = root / f".{LATEST_FILE}.tmp"
+    pointer.write_text(version + "\n")
+    os.replace(pointer, root / LATEST_FILE)
+
+    remove_old_builds(root, keep=KEEP_BUILDS)
+    return target
+
+
+def remove_old_builds(root: Path, keep: int = KEEP_BUILDS) -> list[Path]:
+    """Delete all but the ``keep`` newest builds; never the one ``LATEST`` names."""
+    latest = (root / LATEST_FILE).read_text().strip()
+    builds = sorted(
+        (p for p in root.iterdir() if (p / MANIFEST_FILE).exists()),
+        key=lambda p: (p / MANIFEST_FILE).stat().st_mtime,
+        reverse=True,
+    )
+    removed = []
+    for path in builds[keep:]:
+        if path.name != latest:
+            shutil.rmtree(path, ignore_errors=True)
+            removed.append(path)
+    return removed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", type=Path, default=Path(DATA_PATH))
+    parser.add_argument("--out", type=Path, default=ARTIFACT_ROOT,
+                        help="artifact root (default: %(default)s)")
+    parser.add_argument("--engine", choices=["pandas", "polars"], default=CLEAN_ENGINE,
+                        help="cleaning engine (default: %(default)s)")
+    parser.add_argument("--price-clusters", type=int, default=400,
+                        help="k for the price estimator (default: %(default)s)")
+    args = parser.parse_args()
+
+    print(build(args.data, args.out, args.engine, args.price_clusters))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Build the responsive copies of the site's photos.
+
+Resizes every photo in ``assets/`` to a few widths and saves each as AVIF,
+WebP and JPEG under ``static/``, with ``static/images.json`` listing them
+for ``utils.images``. The manifest is written last, so a running app never
+points at files that aren't there yet. Run it again whenever a photo
+changes; until then the page falls back to resizing the photo itself.
+
+    python scripts/build_assets.py
+    python scripts/build_assets.py --widths 320 640
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.images import (  # noqa: E402
+    ASSET_DIR,
+    FORMATS,
+    MANIFEST_FILE,
+    STATIC_DIR,
+    WIDTHS,
+    build_variants,
+)
+
+PHOTO_SUFFIXES = {".jpg", ".jpeg", ".png"}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--widths", type=int, nargs="+", default=list(WIDTHS),
+                        help="widths in pixels (default: %(default)s)")
+    args = parser.parse_args()
+
+    STATIC_DIR.mkdir(exist_ok=True)
+
+    manifest = {}
+    for source in sorted(ASSET_DIR.iterdir()):
+        if source.suffix.lower() not in PHOTO_SUFFIXES:
+            continue
+        entry = build_variants(source, STATIC_DIR, args.widths)
+        manifest[source.name] = entry
+
+        print(f"{source.name}: {source.stat().st_size / 1024:,.0f} KB, "
+              f"{entry['width']}x{entry['height']}", file=sys.stderr)
+        for fmt in FORMATS:
+            sizes = "  ".join(
+                f"{v['width']}w {v['bytes'] / 1024:5.1f} KB" for v in entry["variants"][fmt]
+            )
+            print(f"  {fmt:<5} {sizes}", file=sys.stderr)
+
+    pointer = STATIC_DIR / f".{MANIFEST_FILE}.tmp"
+    pointer.write_text(json.dumps(manifest, indent=2))
+    os.replace(pointer, STATIC_DIR / MANIFEST_FILE)
+    print(STATIC_DIR / MANIFEST_FILE)
+
+
+if __name__ == "__main__":
+    main()
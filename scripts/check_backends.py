@@ -0,0 +1,138 @@
+"""Check that the pandas and DuckDB dashboard backends agree.
+
+Runs every Dashboard query through both backends for a handful of filter
+combinations and compares the results (floats to a relative 1e-9). Reads the
+latest artifact build, or cleans ``--data`` when given. With a build that
+has memory-mapped columns, pandas over those ("shared") is checked too.
+
+    python scripts/check_backends.py
+    python scripts/check_backends.py --data data/synthetic/car_prices_100k_seed0.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import sys
+import time
+import warnings
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import pandas as pd  # noqa: E402
+
+from utils.artifacts import latest_build  # noqa: E402
+from utils.backends import (  # noqa: E402
+    DuckDBBackend,
+    PandasBackend,
+    SalesFilters,
+    connect_duckdb,
+)
+from utils.car_data import (  # noqa: E402
+    add_dashboard_columns,
+    clean_car_prices,
+    read_car_prices,
+)
+from utils.shared_columns import attach_columns  # noqa: E402
+
+warnings.filterwarnings("ignore", message="Could not infer format")
+
+QUERIES = ("count", "makes", "kpis", "make_price_stats", "body_vs_mmr", "narrative_stats")
+
+
+def scenarios(options: dict) -> dict[str, SalesFilters]:
+    low, high = options["price_min"], options["price_max"]
+    makes, bodies = options["top_makes"], options["bodies"]
+    return {
+        "default": SalesFilters.of(makes, bodies, (low, high)),
+        "no make/body filter": SalesFilters.of([], [], (low, high)),
+        "three makes, sedans": SalesFilters.of(makes[:3], ["Sedan"], (low, high)),
+        "mid price band": SalesFilters.of(makes, bodies, (5_000, 20_000)),
+        "nothing matches": SalesFilters.of(makes[:1], bodies, (high + 1, high + 2)),
+    }
+
+
+def same(a, b) -> bool:
+    if isinstance(a, pd.DataFrame):
+        a = a.reset_index(drop=True)
+        b = b.reset_index(drop=True)
+        if list(a.columns) != list(b.columns) or len(a) != len(b):
+            return False
+        return all(same(a[c].tolist(), b[c].tolist()) for c in a.columns)
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(same(a[k], b[k]) for k in a)
+    if isinstance(a, list):
+        return len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        if math.isnan(a) and math.isnan(b):
+            return True
+        return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+    return a == b
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", type=Path, help="clean this CSV instead of reading artifacts")
+    args = parser.parse_args()
+
+    build = None if args.data else latest_build()
+    if build is not None:
+        df = pd.read_parquet(build.file("clean"))
+        con = connect_duckdb(str(build.file("clean")))
+        print(f"artifact build {build.version}: {len(df):,} rows")
+    else:
+        data = args.data or Path("data/car_prices.csv")
+        df = add_dashboard_columns(clean_car_prices(read_car_prices(str(data))))
+        con = connect_duckdb(df)
+        print(f"{data}: {len(df):,} rows")
+
+    backends = {"pandas": PandasBackend(df), "duckdb": DuckDBBackend(con)}
+    if build is not None and build.file("clean_columns") is not None:
+        backends["shared"] = PandasBackend(attach_columns(build.file("clean_columns")))
+    reference = backends["pandas"]
+
+    def agree(results: list) -> bool:
+        return all(same(results[0], other) for other in results[1:])
+
+    options = reference.options()
+    failures = 0 if agree([b.options() for b in backends.values()]) else 1
+    print(f"{'options':<22} {'ok' if not failures else 'MISMATCH'}")
+
+    rollups = [
+        backend.daily_rollup()
+        .sort_values(["day", "make", "body_clean", "price_bucket"], na_position="last")
+        .reset_index(drop=True)
+        for backend in backends.values()
+    ]
+    rollup_ok = agree(rollups)
+    failures += not rollup_ok
+    print(f"{'daily_rollup':<22} {'ok' if rollup_ok else 'MISMATCH'}")
+
+    for label, filters in scenarios(options).items():
+        queries = [(q, ()) for q in QUERIES] + [("top_makes", (5,))]
+        makes = backends["duckdb"].makes(filters)
+        if makes:
+            queries.append(("model_price_stats", (makes[0],)))
+
+        for query, extra in queries:
+            timings = []
+            results = []
+            for backend in backends.values():
+                start = time.perf_counter()
+                results.append(getattr(backend, query)(filters, *extra))
+                timings.append(time.perf_counter() - start)
+            ok = agree(results)
+            failures += not ok
+            times = "   ".join(
+                f"{name} {seconds * 1000:7.1f} ms" for name, seconds in zip(backends, timings)
+            )
+            print(f"{label:<22} {query:<18} {'ok' if ok else 'MISMATCH':<9}{times}")
+
+    if failures:
+        sys.exit(f"{failures} mismatching queries")
+
+
+if __name__ == "__main__":
+    main()
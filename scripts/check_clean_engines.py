@@ -0,0 +1,53 @@
+"""Check that the pandas and Polars cleaning engines give the same frame.
+
+Cleans one CSV with both engines and compares the result row for row
+(index, values and dtypes) on the columns the Polars engine keeps.
+
+    python scripts/check_clean_engines.py
+    python scripts/check_clean_engines.py --data data/synthetic/car_prices_1m_seed0.csv
+    python scripts/check_clean_engines.py --trim make_body
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import warnings
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import pandas as pd  # noqa: E402
+
+from utils.car_data import DATA_PATH, TRIM_GROUPS, load_clean_car_prices  # noqa: E402
+
+warnings.filterwarnings("ignore", message="Could not infer format")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", type=Path, default=Path(DATA_PATH))
+    parser.add_argument("--trim", choices=list(TRIM_GROUPS), default="global")
+    args = parser.parse_args()
+
+    frames = {}
+    for engine in ("pandas", "polars"):
+        start = time.perf_counter()
+        frames[engine] = load_clean_car_prices(str(args.data), engine, args.trim)
+        print(
+            f"{engine:<7} {time.perf_counter() - start:8.2f} s  "
+            f"{len(frames[engine]):>10,} rows",
+        )
+
+    expected, got = frames["pandas"], frames["polars"]
+    try:
+        pd.testing.assert_frame_equal(expected[got.columns], got)
+    except AssertionError as e:
+        sys.exit(f"engines disagree:\n{e}")
+    print(f"match on {len(got.columns)} columns: {', '.join(got.columns)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Report what each page costs to import on a cold start.
+
+Every page is parsed for its import statements, which are then replayed in a
+fresh interpreter with ``python -X importtime``. Streamlit itself is imported
+first and left out of the totals, since the server has always loaded it before
+a page runs.
+
+    python scripts/import_report.py            # table for every page
+    python scripts/import_report.py --json     # same numbers as JSON
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PRELOADED = "streamlit"
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def page_files() -> list[Path]:
+    return [ROOT / "Home.py"] + sorted((ROOT / "pages").glob("*.py"))
+
+
+def page_imports(path: Path, top_level_only: bool = False) -> list[str]:
+    """Modules a page imports, in source order.
+
+    With ``top_level_only`` only the imports at the head of the page, run
+    before its first other statement, are returned.
+    """
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    if top_level_only:
+        nodes = []
+        for node in tree.body:
+            if not isinstance(node, (ast.Import, ast.ImportFrom)):
+                break
+            nodes.append(node)
+    else:
+        nodes = ast.walk(tree)
+
+    modules = []
+    for node in nodes:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def import_cost(modules: list[str]) -> dict[str, float]:
+    """Cold import time in ms per top-level package, after streamlit."""
+    code = "\n".join([f"import {PRELOADED}"] + [f"import {m}" for m in modules])
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        env={**os.environ, "PYTHONPATH": str(ROOT)},
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    roots = {m.split(".")[0] for m in modules} - {PRELOADED}
+    cost: dict[str, float] = {}
+    for line in proc.stderr.splitlines():
+        match = LINE.match(line)
+        if not match or match.group(3):  # skip nested imports
+            continue
+        root = match.group(4).split(".")[0]
+        if root in roots:
+            cost[root] = cost.get(root, 0.0) + int(match.group(2)) / 1000
+    return dict(sorted(cost.items(), key=lambda kv: kv[1], reverse=True))
+
+
+def report() -> list[dict]:
+    rows = []
+    for path in page_files():
+        first_paint = import_cost(page_imports(path, top_level_only=True))
+        total = import_cost(page_imports(path))
+        rows.append(
+            {
+                "page": path.name,
+                "before_first_element_ms": round(sum(first_paint.values()), 1),
+                "total_ms": round(sum(total.values()), 1),
+                "modules_ms": {m: round(ms, 1) for m, ms in total.items()},
+            }
+        )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--json", action="store_true", help="print JSON")
+    args = parser.parse_args()
+
+    rows = report()
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    print(f"{'page':<40} {'first paint':>12} {'total':>10}  heaviest modules")
+    for row in rows:
+        heaviest = ", ".join(
+            f"{m} {ms:.0f}ms" for m, ms in list(row["modules_ms"].items())[:3]
+        )
+        print(
+            f"{row['page']:<40} {row['before_first_element_ms']:>10.0f}ms "
+            f"{row['total_ms']:>8.0f}ms  {heaviest}"
+        )
+
+
+if __name__ == "__main__":
+    main()
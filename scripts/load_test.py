@@ -0,0 +1,313 @@
+"""Simulate concurrent viewers and measure how rerun latency holds up.
+
+Each simulated session is its own ``AppTest`` (Streamlit's headless testing
+API) running in its own thread, the way the server runs one script thread
+per browser tab, so sessions share the process and its caches. Every
+session walks a scripted set of interactions across the pages (sidebar
+filters and the drill-down on the Dashboard, metric/leaderboard widgets and
+an edit on the Network page) and every rerun is timed.
+
+Reported per configuration: p50/p95/p99 rerun latency (overall and per
+page), reruns per second over the whole run, errors and peak process RSS.
+Errors come in two kinds: exceptions the app itself raised during a rerun,
+and harness errors, where the script couldn't drive the page (a widget it
+looks for is missing, a rerun timed out).
+Each configuration runs in a fresh subprocess with its own environment, so
+caches and memory peaks don't leak between them:
+
+    python scripts/load_test.py --sessions 8
+    python scripts/load_test.py --sessions 16 --pages dashboard \\
+        --config pandas:PORTFOLIO_DATA_BACKEND=pandas \\
+        --config duckdb:PORTFOLIO_DATA_BACKEND=duckdb --out load.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import threading
+import time
+import warnings
+from collections.abc import Callable
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PAGES = {
+    "explorer": "pages/2_🚗_Used_Car_Market_Explorer.py",
+    "dashboard": "pages/3_📈_Car_Market_Dashboard.py",
+    "network": "pages/5_🟢Network_Visualization.py",
+}
+
+PERCENTILES = (50, 95, 99)
+
+
+#####################################################################
+# Scripted interactions
+#####################################################################
+# every step looks its widgets up by key in the tree of the run before it;
+# a handle from an older run points at a widget id that may be gone by now
+def widget(at, kind: str, key: str):
+    return getattr(at, kind)(key=key)
+
+
+def dashboard_steps() -> list[tuple[str, Callable]]:
+    def narrow_price(at):
+        slider = widget(at, "slider", "dashboard_price")
+        low, high = slider.min, slider.max
+        step = (high - low) // 4 // 500 * 500
+        slider.set_value((low + step, high - step))
+
+    def drill_down(at):
+        box = widget(at, "selectbox", "dashboard_make_view")
+        if len(box.options) > 1:
+            box.set_value(box.options[1])
+
+    def fewer_makes(at):
+        makes = widget(at, "multiselect", "dashboard_makes")
+        makes.set_value(makes.options[:3])
+
+    def all_makes_view(at):
+        widget(at, "selectbox", "dashboard_make_view").set_value("All makes")
+
+    def reset_filters(at):
+        makes = widget(at, "multiselect", "dashboard_makes")
+        makes.set_value(makes.options)
+        slider = widget(at, "slider", "dashboard_price")
+        slider.set_value((slider.min, slider.max))
+
+    return [
+        ("narrow price", narrow_price),
+        ("drill down", drill_down),
+        ("fewer makes", fewer_makes),
+        ("all makes view", all_makes_view),
+        ("reset filters", reset_filters),
+    ]
+
+
+def explorer_steps() -> list[tuple[str, Callable]]:
+    # the Explorer's only controls are client-side plotly menus, so a viewer
+    # costs the server plain reruns
+    return [("rerun", lambda at: None)]
+
+
+def network_steps() -> list[tuple[str, Callable]]:
+    def size_by(at):
+        box = widget(at, "selectbox", "network_size_by")
+        box.set_value(box.options[(box.options.index(box.value) + 1) % len(box.options)])
+
+    def leaderboard(at):
+        widget(at, "slider", "network_top_k").set_value(8)
+
+    def add_friend(at):
+        widget(at, "button", "network_add").click()
+
+    return [("size by", size_by), ("leaderboard", leaderboard), ("add friendship", add_friend)]
+
+
+STEPS = {
+    "explorer": explorer_steps,
+    "dashboard": dashboard_steps,
+    "network": network_steps,
+}
+
+
+#####################################################################
+# Worker: runs one configuration inside this process
+#####################################################################
+def percentiles(values: list[float]) -> dict[str, float | None]:
+    import numpy as np
+
+    if not values:
+        return {f"p{p}_ms": None for p in PERCENTILES}
+    found = np.percentile(values, PERCENTILES)
+    return {f"p{p}_ms": round(float(v) * 1000, 2) for p, v in zip(PERCENTILES, found)}
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+def run_session(
+    session: int, pages: list[str], rounds: int, timeout: float, samples: list, errors: list
+) -> None:
+    from streamlit.testing.v1 import AppTest
+
+    # stagger the page order so sessions don't all hit the same page at once
+    order = pages[session % len(pages):] + pages[:session % len(pages)]
+    for page in order:
+        at = AppTest.from_file(str(ROOT / PAGES[page]), default_timeout=timeout)
+        steps = [("open", lambda at: None)] + STEPS[page]() * rounds
+        for name, action in steps:
+            where = {"session": session, "page": page, "step": name}
+            try:
+                action(at)
+                start = time.perf_counter()
+                at.run()
+                elapsed = time.perf_counter() - start
+            except Exception as e:  # noqa: BLE001 - report, keep the others going
+                errors.append(where | {"kind": "harness", "error": repr(e)})
+                break
+            if at.exception:
+                errors.append(where | {"kind": "app", "error": at.exception[0].message})
+                break
+            samples.append({"page": page, "step": name, "seconds": elapsed})
+
+
+def worker(sessions: int, pages: list[str], rounds: int, warmup: bool, timeout: float) -> dict:
+    os.chdir(ROOT)
+    sys.path.insert(0, str(ROOT))
+    warnings.filterwarnings("ignore")
+
+    if warmup:
+        # fill the caches once, like a server that has been up for a while
+        run_session(0, pages, 0, timeout, [], [])
+    rss_before = peak_rss_mb()
+
+    samples: list[dict] = []
+    errors: list[dict] = []
+    threads = [
+        threading.Thread(
+            target=run_session, args=(i, pages, rounds, timeout, samples, errors)
+        )
+        for i in range(sessions)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+
+    seconds = [s["seconds"] for s in samples]
+    by_page = {
+        page: {"reruns": len(page_seconds)} | percentiles(page_seconds)
+        for page in pages
+        for page_seconds in [[s["seconds"] for s in samples if s["page"] == page]]
+    }
+    app_errors = [e for e in errors if e["kind"] == "app"]
+    harness_errors = [e for e in errors if e["kind"] == "harness"]
+    return {
+        "sessions": sessions,
+        "pages": pages,
+        "rounds": rounds,
+        "warmup": warmup,
+        "reruns": len(samples),
+        "app_errors": len(app_errors),
+        "harness_errors": len(harness_errors),
+        "wall_s": round(wall, 2),
+        "reruns_per_s": round(len(samples) / wall, 2) if wall else None,
+        **percentiles(seconds),
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_rss_after_warmup_mb": rss_before,
+        "by_page": by_page,
+        "app_error_samples": app_errors[:5],
+        "harness_error_samples": harness_errors[:5],
+    }
+
+
+#####################################################################
+# Driver: one subprocess per configuration, then a side-by-side table
+#####################################################################
+def parse_config(text: str) -> tuple[str, dict[str, str]]:
+    """``name:KEY=VALUE,KEY=VALUE`` -> (name, env overrides)."""
+    name, _, assignments = text.partition(":")
+    env = {}
+    for item in filter(None, assignments.split(",")):
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"expected KEY=VALUE, got {item!r}")
+        env[key.strip()] = value.strip()
+    return name, env
+
+
+def run_config(name: str, env: dict[str, str], args: argparse.Namespace) -> dict:
+    print(f"running {name} ({args.sessions} sessions)…", file=sys.stderr)
+    cmd = [
+        sys.executable, __file__, "--worker",
+        "--sessions", str(args.sessions),
+        "--pages", *args.pages,
+        "--rounds", str(args.rounds),
+        "--timeout", str(args.timeout),
+    ]
+    if args.no_warmup:
+        cmd.append("--no-warmup")
+    proc = subprocess.run(
+        cmd, env=os.environ | env, cwd=ROOT, capture_output=True, text=True, check=False
+    )
+    if proc.returncode:
+        sys.exit(f"{name} failed:\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.splitlines()[-1])
+    for kind in ("app", "harness"):
+        for e in result[f"{kind}_error_samples"]:
+            print(f"  {kind} error in {e['page']} / {e['step']} (session {e['session']}): "
+                  f"{e['error']}", file=sys.stderr)
+    return {"config": name, "env": env} | result
+
+
+def render_table(results: list[dict]) -> str:
+    rows = [
+        ("reruns", "reruns"),
+        ("app errors", "app_errors"),
+        ("harness errors", "harness_errors"),
+        ("p50 (ms)", "p50_ms"),
+        ("p95 (ms)", "p95_ms"),
+        ("p99 (ms)", "p99_ms"),
+        ("reruns / s", "reruns_per_s"),
+        ("peak RSS (MB)", "peak_rss_mb"),
+    ]
+    pages = results[0]["pages"]
+    rows += [(f"{page} p95 (ms)", ("by_page", page, "p95_ms")) for page in pages]
+
+    def value(result, key):
+        if isinstance(key, tuple):
+            for part in key:
+                result = result.get(part, {}) if isinstance(result, dict) else None
+            return result
+        return result.get(key)
+
+    width = max(12, *(len(r["config"]) for r in results))
+    lines = [f"{'':<20}" + "".join(f"{r['config']:>{width + 2}}" for r in results)]
+    for label, key in rows:
+        cells = "".join(f"{str(value(r, key)):>{width + 2}}" for r in results)
+        lines.append(f"{label:<20}{cells}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=4)
+    parser.add_argument("--pages", nargs="+", choices=list(PAGES), default=list(PAGES))
+    parser.add_argument("--rounds", type=int, default=2,
+                        help="times each session repeats a page's interactions")
+    parser.add_argument("--config", action="append", type=parse_config, default=[],
+                        metavar="NAME:KEY=VALUE,...",
+                        help="environment for one configuration; repeat to compare")
+    parser.add_argument("--no-warmup", action="store_true",
+                        help="measure from cold caches")
+    parser.add_argument("--timeout", type=float, default=300,
+                        help="seconds a single rerun may take")
+    parser.add_argument("--out", type=Path, help="also write the results as JSON")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = worker(args.sessions, args.pages, args.rounds, not args.no_warmup, args.timeout)
+        print(json.dumps(result))
+        return
+
+    configs = args.config or [("current", {})]
+    results = [run_config(name, env, args) for name, env in configs]
+    print(render_table(results))
+    if args.out:
+        args.out.write_text(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""Generate a synthetic, car_prices.csv-shaped dataset.
+
+The real Kaggle file isn't in the repo, so this writes a stand-in with the
+same 16 columns, similar cardinalities (~96 make spellings, ~1k models,
+~85 body spellings, ~14k sellers, US states plus a few Canadian
+provinces) and the same ``Tue Dec 16 2014 12:30:00 GMT-0800 (PST)``
+saledate strings. Output is deterministic for a given seed and row count.
+
+    python scripts/make_synthetic_data.py --rows 100k
+    python scripts/make_synthetic_data.py --rows 10m --out /tmp/cars_10m.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+SYNTHETIC_DIR = ROOT / "data" / "synthetic"
+
+SIZES = {"100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+
+CHUNK_ROWS = 500_000
+
+COLUMNS = [
+    "year", "make", "model", "trim", "body", "transmission", "vin", "state",
+    "condition", "odometer", "color", "interior", "seller", "mmr",
+    "sellingprice", "saledate",
+]
+
+# make: (share of sales, typical new price in $)
+MAKES = {
+    "Ford": (16.7, 30_000), "Chevrolet": (10.8, 29_000), "Nissan": (9.7, 26_000),
+    "Toyota": (7.1, 28_000), "Dodge": (5.5, 28_000), "Honda": (4.9, 27_000),
+    "Hyundai": (3.9, 23_000), "BMW": (3.7, 48_000), "Kia": (3.3, 22_000),
+    "Chrysler": (3.1, 29_000), "Mercedes-Benz": (3.1, 52_000), "Jeep": (2.8, 31_000),
+    "Infiniti": (2.8, 42_000), "Volkswagen": (2.3, 26_000), "Lexus": (2.1, 45_000),
+    "GMC": (1.9, 38_000), "Mazda": (1.5, 24_000), "Cadillac": (1.3, 50_000),
+    "Audi": (1.1, 45_000), "Acura": (1.0, 39_000), "Lincoln": (1.0, 44_000),
+    "Buick": (1.0, 33_000), "Subaru": (0.9, 27_000), "Ram": (0.8, 35_000),
+    "Pontiac": (0.8, 24_000), "Mitsubishi": (0.7, 22_000), "Volvo": (0.6, 40_000),
+    "MINI": (0.6, 27_000), "Saturn": (0.5, 22_000), "Mercury": (0.4, 26_000),
+    "Land Rover": (0.35, 65_000), "Scion": (0.3, 19_000), "Jaguar": (0.25, 60_000),
+    "Porsche": (0.25, 80_000), "Suzuki": (0.18, 18_000), "FIAT": (0.15, 19_000),
+    "HUMMER": (0.15, 45_000), "Saab": (0.1, 30_000), "smart": (0.07, 15_000),
+    "Oldsmobile": (0.06, 22_000), "Isuzu": (0.04, 24_000), "Maserati": (0.02, 90_000),
+    "Bentley": (0.02, 180_000), "Aston Martin": (0.005, 150_000),
+    "Tesla": (0.005, 80_000), "Rolls-Royce": (0.003, 300_000),
+    "Ferrari": (0.003, 250_000), "Lamborghini": (0.001, 300_000),
+    "Fisker": (0.001, 100_000), "Plymouth": (0.004, 18_000),
+    "Lotus": (0.001, 70_000), "Daewoo": (0.001, 12_000), "Geo": (0.001, 12_000),
+}
+
+# lower-case / abbreviated spellings that show up in the real data
+MAKE_ALIASES = {
+    "ford": "Ford", "chevrolet": "Chevrolet", "nissan": "Nissan", "toyota": "Toyota",
+    "dodge": "Dodge", "honda": "Honda", "hyundai": "Hyundai", "bmw": "BMW",
+    "kia": "Kia", "chrysler": "Chrysler", "mercedes": "Mercedes-Benz",
+    "mercedes-b": "Mercedes-Benz", "jeep": "Jeep", "infiniti": "Infiniti",
+    "volkswagen": "Volkswagen", "vw": "Volkswagen", "lexus": "Lexus", "gmc": "GMC",
+    "mazda": "Mazda", "cadillac": "Cadillac", "acura": "Acura", "lincoln": "Lincoln",
+    "buick": "Buick", "subaru": "Subaru", "ram": "Ram", "pontiac": "Pontiac",
+    "mitsubishi": "Mitsubishi", "volvo": "Volvo", "mini": "MINI", "landrover": "Land Rover",
+    "land rover": "Land Rover", "porsche": "Porsche", "suzuki": "Suzuki", "fiat": "FIAT",
+    "hummer": "HUMMER", "saab": "Saab", "ford truck": "Ford", "chev truck": "Chevrolet",
+    "dodge tk": "Dodge", "mazda tk": "Mazda", "gmc truck": "GMC", "plymouth": "Plymouth",
+    "oldsmobile": "Oldsmobile",
+}
+ALIAS_SHARE = 0.02
+
+BODIES = {
+    "Sedan": 44.0, "SUV": 26.0, "Hatchback": 4.7, "Minivan": 4.5, "Coupe": 3.1,
+    "Crew Cab": 3.0, "Wagon": 2.9, "Convertible": 1.8, "SuperCrew": 1.7,
+    "G Sedan": 1.3, "SuperCab": 1.0, "Extended Cab": 0.9, "Regular Cab": 0.9,
+    "Quad Cab": 0.8, "Van": 0.7, "E-Series Van": 0.6, "Double Cab": 0.6,
+    "CrewMax Cab": 0.4, "Access Cab": 0.4, "King Cab": 0.3, "G Coupe": 0.3,
+    "Koup": 0.1, "Club Cab": 0.1, "Mega Cab": 0.05, "Beetle Convertible": 0.04,
+    "G Convertible": 0.04, "Genesis Coupe": 0.04, "Elantra Coupe": 0.03,
+    "Cab Plus 4": 0.02, "Q60 Coupe": 0.02, "TSX Sport Wagon": 0.02,
+    "Promaster Cargo Van": 0.02, "Transit Van": 0.02, "Ram Van": 0.01,
+    "CTS Coupe": 0.02, "CTS Wagon": 0.01, "GranTurismo Convertible": 0.005,
+    "Xtracab": 0.005, "Cab Plus": 0.005, "Q60 Convertible": 0.005,
+    "G37 Convertible": 0.005, "CTS-V Coupe": 0.005, "CTS-V Wagon": 0.002,
+    "Regular-Cab": 0.002,
+}
+BODY_LOWER_SHARE = 0.03
+BODY_PRICE = {"SUV": 1.15, "Crew Cab": 1.3, "SuperCrew": 1.3, "Convertible": 1.2,
+              "Minivan": 0.95, "Hatchback": 0.8, "Coupe": 1.05}
+
+STATES = {
+    "fl": 15.0, "ca": 13.0, "pa": 9.5, "tx": 8.2, "ga": 6.2, "nj": 5.1, "il": 4.3,
+    "nc": 3.9, "oh": 3.8, "tn": 3.7, "mo": 2.9, "mi": 3.0, "nv": 3.4, "va": 2.3,
+    "md": 1.8, "wi": 1.7, "mn": 1.9, "az": 1.6, "co": 1.3, "wa": 1.3, "ma": 1.2,
+    "ny": 1.0, "in": 0.7, "sc": 0.7, "ne": 0.7, "on": 0.6, "pr": 0.5, "la": 0.4,
+    "ms": 0.3, "ut": 0.3, "qc": 0.2, "hi": 0.2, "or": 0.2, "ab": 0.1, "nm": 0.03,
+    "ok": 0.02, "ns": 0.01, "al": 0.005,
+}
+
+COLORS = ["black", "white", "silver", "gray", "blue", "red", "—", "green",
+          "gold", "beige", "burgundy", "brown", "orange", "purple", "yellow"]
+INTERIORS = ["black", "gray", "beige", "tan", "—", "brown", "red", "blue"]
+TRIMS = ["Base", "SE", "LX", "LT", "S", "SEL", "XLT", "Limited", "Sport",
+         "EX", "SV", "Touring", "Premium", "GT", "i", "SLE"]
+VIN_ALPHABET = np.frombuffer(b"0123456789ABCDEFGHJKLMNPRSTUVWXYZ", dtype="S1")
+
+N_MODELS = 970
+N_SELLERS = 14_000
+
+SALE_START = pd.Timestamp("2014-12-15")
+SALE_DAYS = 210
+SALE_HOURS = [1, 2, 3, 4, 5, 9, 10, 11, 12]
+MISSING_SHARE = 0.02
+
+
+def _weights(values) -> np.ndarray:
+    w = np.asarray(values, dtype=float)
+    return w / w.sum()
+
+
+def _build_catalog(rng: np.random.Generator) -> dict:
+    """Fixed lookup tables (models per make, sellers, date strings, ...)."""
+    make_names = list(MAKES)
+    make_share = _weights([share for share, _ in MAKES.values()])
+
+    # models per make roughly follow sqrt(popularity), at least one each
+    per_make = np.maximum(1, np.round(np.sqrt(make_share) / np.sqrt(make_share).sum() * N_MODELS))
+    models, model_make, model_price = [], [], []
+    for make, count in zip(make_names, per_make.astype(int)):
+        base = MAKES[make][1]
+        for i in range(count):
+            models.append(f"{make.split()[0][:4].title()}{chr(65 + i % 26)}{i // 26 or ''}")
+            model_make.append(make)
+            model_price.append(base * rng.uniform(0.75, 1.35))
+
+    model_make = np.array(model_make)
+    model_zipf = 1 / np.arange(1, len(models) + 1) ** 0.2
+    make_models = {
+        make: np.flatnonzero(model_make == make) for make in make_names
+    }
+
+    # sale date strings as the real file writes them; the offset follows DST
+    days = SALE_START + pd.to_timedelta(np.arange(SALE_DAYS), unit="D")
+    stamps = [d + pd.Timedelta(hours=h, minutes=30) for d in days for h in SALE_HOURS]
+    dst = [pd.Timestamp("2015-03-08") <= s < pd.Timestamp("2015-11-01") for s in stamps]
+    saledates = np.array([
+        s.strftime("%a %b %d %Y %H:%M:%S")
+        + (" GMT-0700 (PDT)" if d else " GMT-0800 (PST)")
+        for s, d in zip(stamps, dst)
+    ])
+
+    body_names = list(BODIES)
+    return {
+        "make_names": np.array(make_names),
+        "make_share": make_share,
+        "make_models": make_models,
+        "model_zipf": model_zipf,
+        "models": np.array(models),
+        "model_price": np.array(model_price),
+        "aliases": MAKE_ALIASES,
+        "body_names": np.array(body_names),
+        "body_share": _weights(list(BODIES.values())),
+        "body_price": np.array([BODY_PRICE.get(b, 1.0) for b in body_names]),
+        "states": np.array(list(STATES)),
+        "state_share": _weights(list(STATES.values())),
+        "sellers": np.array([f"dealer {i:05d} llc" for i in range(N_SELLERS)]),
+        "seller_share": _weights(1 / np.arange(1, N_SELLERS + 1) ** 0.9),
+        "saledates": saledates,
+        "sale_year": np.array([s.year for s in stamps]),
+    }
+
+
+def _chunk(rng: np.random.Generator, n: int, cat: dict) -> pd.DataFrame:
+    make_idx = rng.choice(len(cat["make_names"]), size=n, p=cat["make_share"])
+    makes = cat["make_names"][make_idx]
+
+    # model: popularity-weighted within the make
+    model_idx = np.empty(n, dtype=np.intp)
+    for make in np.unique(makes):
+        rows = np.flatnonzero(makes == make)
+        choices = cat["make_models"][make]
+        p = _weights(cat["model_zipf"][: len(choices)])
+        model_idx[rows] = choices[rng.choice(len(choices), size=len(rows), p=p)]
+
+    body_idx = rng.choice(len(cat["body_names"]), size=n, p=cat["body_share"])
+    date_idx = rng.integers(0, len(cat["saledates"]), size=n)
+    sale_year = cat["sale_year"][date_idx]
+
+    # mostly 1-3 year old cars, with a long tail of old ones
+    age = np.minimum(rng.gamma(1.6, 2.4, size=n).round().astype(int), 35)
+    year = sale_year - age + rng.choice([0, 1], size=n, p=[0.93, 0.07])
+
+    odometer = np.maximum(1, age * rng.lognormal(np.log(12_500), 0.45, size=n)
+                          + rng.exponential(4_000, size=n)).round()
+    condition = np.where(rng.random(n) < 0.6,
+                         rng.integers(10, 50, size=n),
+                         rng.integers(1, 6, size=n)).astype(float)
+
+    new_price = cat["model_price"][model_idx] * cat["body_price"][body_idx]
+    value = new_price * 0.8 ** age * np.exp(-odometer / 400_000)
+    mmr = np.maximum(25, (value * rng.normal(1, 0.05, size=n)) // 25 * 25)
+    sellingprice = np.maximum(1, (mmr * rng.normal(0.98, 0.12, size=n)) // 100 * 100)
+
+    makes = makes.astype(object)
+    alias_rows = np.flatnonzero(rng.random(n) < ALIAS_SHARE)
+    by_make = {}
+    for alias, make in cat["aliases"].items():
+        by_make.setdefault(make, []).append(alias)
+    for row in alias_rows:
+        options = by_make.get(makes[row])
+        if options:
+            makes[row] = options[row % len(options)]
+
+    bodies = cat["body_names"][body_idx].astype(object)
+    lower = rng.random(n) < BODY_LOWER_SHARE
+    bodies[lower] = np.char.lower(bodies[lower].astype(str))
+
+    vin = rng.integers(0, len(VIN_ALPHABET), size=(n, 17))
+    vins = VIN_ALPHABET[vin].view("S17").ravel().astype(str)
+    vins = np.char.lower(vins)
+
+    df = pd.DataFrame({
+        "year": year,
+        "make": makes,
+        "model": cat["models"][model_idx],
+        "trim": rng.choice(TRIMS, size=n),
+        "body": bodies,
+        "transmission": rng.choice(["automatic", "manual", ""], size=n, p=[0.86, 0.03, 0.11]),
+        "vin": vins,
+        "state": cat["states"][rng.choice(len(cat["states"]), size=n, p=cat["state_share"])],
+        "condition": condition,
+        "odometer": odometer,
+        "color": rng.choice(COLORS, size=n),
+        "interior": rng.choice(INTERIORS, size=n),
+        "seller": cat["sellers"][rng.choice(N_SELLERS, size=n, p=cat["seller_share"])],
+        "mmr": mmr,
+        "sellingprice": sellingprice,
+        "saledate": cat["saledates"][date_idx],
+    })
+
+    # the real file has holes in most descriptive columns
+    for col in ["make", "model", "trim", "body", "condition", "odometer", "color", "interior"]:
+        df.loc[rng.random(n) < MISSING_SHARE, col] = None
+    df.loc[df["transmission"] == "", "transmission"] = None
+    return df[COLUMNS]
+
+
+def generate(rows: int, out: Path, seed: int = 0) -> Path:
+    """Write ``rows`` synthetic sales to ``out`` in chunks."""
+    cat = _build_catalog(np.random.default_rng([seed, 0]))
+    out.parent.mkdir(parents=True, exist_ok=True)
+
+    for i, start in enumerate(range(0, rows, CHUNK_ROWS)):
+        n = min(CHUNK_ROWS, rows - start)
+        chunk = _chunk(np.random.default_rng([seed, i + 1]), n, cat)
+        chunk.to_csv(out, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    return out
+
+
+def default_path(size: str, seed: int = 0) -> Path:
+    return SYNTHETIC_DIR / f"car_prices_{size}_seed{seed}.csv"
+
+
+def parse_rows(value: str) -> int:
+    return SIZES.get(value.lower()) or int(value)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="100k",
+                        help="row count or one of: " + ", ".join(SIZES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, help="output CSV path")
+    args = parser.parse_args()
+
+    out = args.out or default_path(args.rows.lower(), args.seed)
+    generate(parse_rows(args.rows), out, args.seed)
+    print(out)
+
+
+if __name__ == "__main__":
+    main()
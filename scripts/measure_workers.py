@@ -0,0 +1,169 @@
+"""Measure per-process memory of the Dashboard data as server processes are added.
+
+Starts N worker processes side by side, like N Streamlit servers behind a
+load balancer. Each one loads the cleaned sales frame of the latest artifact
+build, either by reading the Parquet file into its own memory ("parquet", what
+every process did before) or by attaching the build's memory-mapped columns
+("shared"), then runs the Dashboard queries over it. With all workers still
+alive, each reports from ``/proc/self/smaps_rollup`` how much its memory grew
+over a process that only imported the libraries:
+
+* RSS counts every page the process touched, shared or not
+* PSS splits each shared page evenly between the processes mapping it
+* private is what the process alone holds, and what adding it costs the box
+
+once right after loading the frame ("data") and again after the queries.
+
+    python scripts/measure_workers.py --workers 1 2 4 8
+
+Linux only (it reads ``/proc``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import warnings
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODES = ("parquet", "shared")
+
+
+def memory_kb() -> dict[str, int]:
+    fields = {}
+    for line in Path("/proc/self/smaps_rollup").read_text().splitlines()[1:]:
+        key, value = line.split(":", 1)
+        fields[key] = int(value.split()[0])
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "private": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def touch(values) -> None:
+    """Read one byte per page of a column's buffers, so mapped ones are resident."""
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+
+    if values.dtype == "category":
+        values = values.cat.codes
+    if pd.api.types.is_string_dtype(values.dtype):
+        # through Arrow, without turning the strings into Python objects
+        arrow = pa.array(values.array)
+        chunks = arrow.chunks if isinstance(arrow, pa.ChunkedArray) else [arrow]
+        buffers = [np.frombuffer(b, np.uint8) for c in chunks for b in c.buffers() if b]
+    else:
+        raw = np.asarray(values.array)
+        # nullable ints come back as objects; they're small, skip them
+        buffers = [] if raw.dtype == object else [raw.view(np.uint8)]
+    for buffer in buffers:
+        buffer[::4096].sum()
+
+
+#####################################################################
+# Worker: one server process' worth of data
+#####################################################################
+def worker(mode: str) -> None:
+    sys.path.insert(0, str(ROOT))
+    warnings.filterwarnings("ignore")
+
+    import streamlit.logger
+
+    streamlit.logger.set_log_level("error")  # no "No runtime found" noise
+
+    import pandas as pd
+
+    from utils.artifacts import latest_build
+    from utils.backends import PandasBackend, SalesFilters
+    from utils.shared_columns import attach_columns
+
+    build = latest_build()
+    # start up the lazily loaded pandas/Arrow string machinery and Arrow's
+    # allocator first; that's a fixed cost per process, not the data's
+    strings = pd.Series([f"warm-up {i}" for i in range(10_000)] + [None], dtype="str")
+    strings.isin(["x"]), pd.Categorical(strings).codes
+    before = memory_kb()
+
+    if mode == "shared":
+        df = attach_columns(build.file("clean_columns"))
+    else:
+        df = pd.read_parquet(build.file("clean"))
+    for _, values in df.items():
+        touch(values)
+    loaded = memory_kb()
+
+    backend = PandasBackend(df)
+    options = backend.options()
+    filters = SalesFilters.of(options["top_makes"], options["bodies"],
+                              (options["price_min"], options["price_max"]))
+    for query in ("count", "kpis", "make_price_stats", "body_vs_mmr", "narrative_stats"):
+        getattr(backend, query)(filters)
+    backend.daily_rollup()
+
+    # wait until every worker has loaded, so shared pages are split N ways
+    print("ready", flush=True)
+    sys.stdin.readline()
+    queried = memory_kb()
+    print(json.dumps({
+        **{f"data_{k}": loaded[k] - before[k] for k in loaded},
+        **{k: queried[k] - before[k] for k in queried},
+    }), flush=True)
+
+
+#####################################################################
+# Driver
+#####################################################################
+def run(mode: str, workers: int) -> list[dict]:
+    procs = [
+        subprocess.Popen(
+            [sys.executable, __file__, "--worker", mode],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, cwd=ROOT,
+            env=os.environ | {"STREAMLIT_LOGGER_LEVEL": "error"},
+        )
+        for _ in range(workers)
+    ]
+    for proc in procs:
+        if proc.stdout.readline().strip() != "ready":
+            sys.exit(f"a {mode} worker failed to start")
+    for proc in procs:
+        proc.stdin.write("\n")
+        proc.stdin.flush()
+    results = [json.loads(proc.stdout.readline()) for proc in procs]
+    for proc in procs:
+        proc.wait()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--worker", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker)
+        return
+
+    print("MB each worker added (mean per worker; last column summed over workers)")
+    print(f"{'mode':<9}{'workers':>8}{'data PSS':>10}{'data private':>14}"
+          f"{'RSS':>8}{'PSS':>8}{'private':>9}{'total private':>15}")
+    for mode in args.modes:
+        for n in args.workers:
+            results = run(mode, n)
+            mean = {k: sum(r[k] for r in results) / len(results) / 1024 for k in results[0]}
+            total_private = sum(r["private"] for r in results) / 1024
+            print(f"{mode:<9}{n:>8}{mean['data_pss']:>10.1f}{mean['data_private']:>14.1f}"
+                  f"{mean['rss']:>8.1f}{mean['pss']:>8.1f}{mean['private']:>9.1f}"
+                  f"{total_private:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
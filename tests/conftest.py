@@ -0,0 +1,32 @@
+"""Shared fixtures: a small synthetic sales CSV and its cleaned frame."""
+
+from __future__ import annotations
+
+import sys
+import warnings
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+# enough rows that every make/body clears the charts' minimum sales
+SYNTHETIC_ROWS = 20_000
+
+
+@pytest.fixture(scope="session")
+def sales_csv(tmp_path_factory) -> Path:
+    from make_synthetic_data import generate
+
+    return generate(SYNTHETIC_ROWS, tmp_path_factory.mktemp("data") / "car_prices.csv")
+
+
+@pytest.fixture(scope="session")
+def dashboard_frame(sales_csv):
+    from utils.car_data import add_dashboard_columns, clean_car_prices, read_car_prices
+
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="Could not infer format")
+        return add_dashboard_columns(clean_car_prices(read_car_prices(str(sales_csv))))
@@ -0,0 +1,60 @@
+"""Artifact builds: each one gets its own directory, ``LATEST`` is switched
+only once it's complete, old builds are cleaned up after the switch and a
+build made from another CSV is never served.
+"""
+
+from __future__ import annotations
+
+import shutil
+
+import pytest
+
+from build_artifacts import build
+from utils.artifacts import LATEST_FILE, latest_build
+
+
+@pytest.fixture(scope="module")
+def builds(sales_csv, tmp_path_factory):
+    root = tmp_path_factory.mktemp("artifacts")
+    data = tmp_path_factory.mktemp("data") / "car_prices.csv"
+    shutil.copy(sales_csv, data)
+    first = build(data, root, price_clusters=8)
+    second = build(data, root, price_clusters=8)
+    return root, data, first, second
+
+
+def test_rebuild_gets_a_new_directory(builds):
+    root, data, first, second = builds
+    assert first != second
+    assert (root / LATEST_FILE).read_text().strip() == second.name
+    # the build before stays for servers that still have it open
+    assert first.exists() and second.exists()
+    assert not list(root.glob(".build-*"))
+
+
+def test_version_names_engine_and_k(builds):
+    root, data, first, second = builds
+    assert "-pandas-k8-" in second.name
+    assert latest_build(root, str(data)).manifest["price_clusters"] == 8
+
+
+def test_old_builds_are_removed_after_the_switch(builds, tmp_path):
+    root, data, first, second = builds
+    root = shutil.copytree(root, tmp_path / "artifacts")
+    third = build(data, root, price_clusters=8)
+    assert (root / LATEST_FILE).read_text().strip() == third.name
+    assert not (root / first.name).exists()
+    assert (root / second.name).exists()
+
+
+def test_stale_build_is_not_served(builds, tmp_path):
+    root, data, first, second = builds
+    assert latest_build(root, str(data)).version == second.name
+
+    edited = tmp_path / "car_prices.csv"
+    shutil.copy(data, edited)
+    with edited.open("a") as f:
+        f.write(edited.read_text().splitlines()[-1] + "\n")
+    assert latest_build(root, str(edited)) is None
+    # no CSV to compare against: the shipped build is used as is
+    assert latest_build(root, str(tmp_path / "missing.csv")).version == second.name
@@ -0,0 +1,176 @@
+"""The pandas and DuckDB dashboard backends give the same answers.
+
+``scripts/check_backends.py`` does the same over a real build or CSV; this
+runs every query on a small synthetic frame for a few filter combinations.
+"""
+
+from __future__ import annotations
+
+import math
+
+import pandas as pd
+import pytest
+
+from utils.backends import DuckDBBackend, PandasBackend, SalesFilters, connect_duckdb
+from utils.kpi_estimates import KPI_COLUMNS
+
+pytest.importorskip("duckdb")
+
+
+@pytest.fixture(scope="module")
+def backends(dashboard_frame):
+    return PandasBackend(dashboard_frame), DuckDBBackend(connect_duckdb(dashboard_frame))
+
+
+def scenarios(options: dict) -> dict[str, SalesFilters]:
+    low, high = options["price_min"], options["price_max"]
+    makes, bodies = options["top_makes"], options["bodies"]
+    return {
+        "default": SalesFilters.of(makes, bodies, (low, high)),
+        "no make/body filter": SalesFilters.of([], [], (low, high)),
+        "three makes, sedans": SalesFilters.of(makes[:3], ["Sedan"], (low, high)),
+        "mid price band": SalesFilters.of(makes, bodies, (5_000, 20_000)),
+        "nothing matches": SalesFilters.of(makes[:1], bodies, (high + 1, high + 2)),
+    }
+
+
+def comparable(df: pd.DataFrame) -> pd.DataFrame:
+    """Same values, same representation: plain index, nullable ints, str and UTC."""
+    df = df.reset_index(drop=True).copy()
+    for column, dtype in df.dtypes.items():
+        if isinstance(dtype, pd.DatetimeTZDtype):
+            df[column] = df[column].dt.tz_convert("UTC")
+        elif pd.api.types.is_integer_dtype(dtype):
+            df[column] = df[column].astype("Int64")
+        elif isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(dtype):
+            # DuckDB hands back empty text columns as object
+            df[column] = df[column].astype("str")
+    return df
+
+
+def assert_same(expected, got) -> None:
+    if isinstance(expected, pd.DataFrame):
+        pd.testing.assert_frame_equal(comparable(expected), comparable(got), rtol=1e-9)
+    elif isinstance(expected, dict):
+        assert expected.keys() == got.keys()
+        for key in expected:
+            assert_same(expected[key], got[key])
+    elif isinstance(expected, float) and math.isnan(expected):
+        assert math.isnan(got)
+    elif isinstance(expected, float):
+        assert got == pytest.approx(expected, rel=1e-9, abs=1e-9)
+    else:
+        assert expected == got
+
+
+@pytest.fixture(scope="module")
+def filters(backends):
+    return scenarios(backends[0].options())
+
+
+SCENARIOS = ["default", "no make/body filter", "three makes, sedans", "mid price band",
+             "nothing matches"]
+
+
+def test_options(backends):
+    pandas_backend, duckdb_backend = backends
+    assert_same(pandas_backend.options(), duckdb_backend.options())
+
+
+@pytest.mark.parametrize("scenario", SCENARIOS)
+@pytest.mark.parametrize(
+    "query", ["count", "makes", "kpis", "make_price_stats", "body_vs_mmr", "narrative_stats"]
+)
+def test_query(backends, filters, scenario, query):
+    pandas_backend, duckdb_backend = backends
+    assert_same(
+        getattr(pandas_backend, query)(filters[scenario]),
+        getattr(duckdb_backend, query)(filters[scenario]),
+    )
+
+
+@pytest.mark.parametrize("scenario", SCENARIOS)
+def test_top_makes(backends, filters, scenario):
+    pandas_backend, duckdb_backend = backends
+    assert_same(
+        pandas_backend.top_makes(filters[scenario], 5),
+        duckdb_backend.top_makes(filters[scenario], 5),
+    )
+
+
+@pytest.mark.parametrize("scenario", SCENARIOS)
+def test_model_price_stats(backends, filters, scenario):
+    pandas_backend, duckdb_backend = backends
+    makes = pandas_backend.makes(filters[scenario]) or ["Ford"]
+    for make in makes[:3]:
+        assert_same(
+            pandas_backend.model_price_stats(filters[scenario], make),
+            duckdb_backend.model_price_stats(filters[scenario], make),
+        )
+
+
+def test_daily_rollup(backends):
+    keys = ["day", "make", "body_clean", "price_bucket"]
+    pandas_rollup, duckdb_rollup = (
+        b.daily_rollup().sort_values(keys, na_position="last") for b in backends
+    )
+    assert_same(pandas_rollup, duckdb_rollup)
+
+
+@pytest.mark.parametrize("scenario", SCENARIOS)
+def test_filtered_daily_rollup(backends, filters, scenario):
+    keys = ["day", "make", "body_clean", "price_bucket"]
+    pandas_rollup, duckdb_rollup = (
+        b.daily_rollup(filters[scenario]).sort_values(keys, na_position="last")
+        for b in backends
+    )
+    assert_same(pandas_rollup, duckdb_rollup)
+
+
+@pytest.mark.parametrize("scenario", SCENARIOS)
+def test_export_chunks(backends, filters, scenario):
+    pandas_backend, duckdb_backend = backends
+    pandas_chunks = list(pandas_backend.export_chunks(filters[scenario], chunk_rows=1_000))
+    duckdb_chunks = list(duckdb_backend.export_chunks(filters[scenario], chunk_rows=1_000))
+    assert all(len(c) <= 1_000 for c in pandas_chunks + duckdb_chunks)
+
+    expected = pandas_backend.filtered(filters[scenario])
+    if expected.empty:
+        assert sum(len(c) for c in pandas_chunks + duckdb_chunks) == 0
+        return
+    # DuckDB may hand rows back in another order; compare them sorted
+    for chunks in (pandas_chunks, duckdb_chunks):
+        got = pd.concat(chunks)
+        assert_same(
+            expected.sort_values(["vin", "saledate"]),
+            got[expected.columns].sort_values(["vin", "saledate"]),
+        )
+
+
+def test_kpi_sample_columns(backends):
+    for backend in backends:
+        sample = backend.kpi_sample(2_000)
+        assert list(sample.columns) == KPI_COLUMNS
+        assert 1_500 < len(sample) < 2_500
+
+
+def test_for_thread_keeps_its_own_state(backends, filters):
+    pandas_backend, duckdb_backend = backends
+    assert duckdb_backend.for_thread() is not duckdb_backend
+
+    # the page's backend and a prefetch thread's copy filter independently
+    worker = pandas_backend.for_thread()
+    assert worker is not pandas_backend and worker.df is pandas_backend.df
+    expected = len(pandas_backend.filtered(filters["default"]))
+    worker.filtered(filters["nothing matches"])
+    assert len(pandas_backend.filtered(filters["default"])) == expected
+    assert pandas_backend._last[0] == filters["default"]
+
+
+def test_export_chunks_stopped_early(backends, filters):
+    duckdb_backend = backends[1]
+    chunks = duckdb_backend.export_chunks(filters["no make/body filter"], chunk_rows=1_000)
+    assert len(next(chunks)) == 1_000
+    chunks.close()
+    # the export's cursor is gone; the backend's own still answers
+    assert duckdb_backend.count(filters["default"]) == backends[0].count(filters["default"])
@@ -0,0 +1,136 @@
+"""The warm-up thread: which jobs and refreshes it runs, and that a refresh
+never leaves visitors without a value.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from functools import partial
+
+import pytest
+
+from utils import cache_manager
+from utils.cache_manager import background, managed_cache
+
+pytestmark = pytest.mark.filterwarnings("ignore:.*ScriptRunContext")
+
+unpickled = []
+
+
+class Value:
+    """Counts every copy ``st.cache_data`` hands out of the cache."""
+
+    def __init__(self, n: int):
+        self.n = n
+
+    def __setstate__(self, state):
+        unpickled.append(state["n"])
+        self.__dict__.update(state)
+
+
+def on_warm_thread(fn):
+    """Run ``fn`` the way the warm-up thread runs its jobs."""
+    result, errors = [], []
+
+    def target():
+        background()
+        cache_manager._warming.touched = set()
+        try:
+            result.append(fn())
+        except BaseException as e:  # noqa: BLE001 - re-raised below
+            errors.append(e)
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    thread.join()
+    if errors:
+        raise errors[0]
+    return result[0]
+
+
+def test_jobs_skipped_while_their_entries_are_cached():
+    runs = []
+
+    @managed_cache("test_warm_skip", ttl=600)
+    def load(n: int) -> Value:
+        return Value(n)
+
+    def job(n: int) -> None:
+        runs.append(n)
+        load(n)
+
+    def jobs():
+        yield "one", partial(job, 1)
+        yield "two", partial(job, 2)
+
+    filled = on_warm_thread(lambda: cache_manager._warm_pass(jobs, {}))
+    assert runs == [1, 2]
+    assert set().union(*filled.values()) == {
+        ("test_warm_skip", key) for key in load.stats.entries
+    }
+
+    # nothing expired: no job runs, so no value is copied out of the cache
+    unpickled.clear()
+    filled = on_warm_thread(lambda: cache_manager._warm_pass(jobs, filled))
+    assert runs == [1, 2] and unpickled == []
+    load(1)  # where a visitor's hit does
+    assert unpickled == [1]
+
+    # a page dropped one entry: only the job that filled it runs again
+    load.clear(2)
+    filled = on_warm_thread(lambda: cache_manager._warm_pass(jobs, filled))
+    assert runs == [1, 2, 2]
+    assert len(load.stats.entries) == 2
+
+
+def test_due_only_touched_entries_near_expiry():
+    @managed_cache("test_due", ttl=600)
+    def load(n: int) -> int:
+        return n
+
+    def fill():
+        for n in range(3):
+            load(n)
+        return cache_manager._warming.touched
+
+    touched = on_warm_thread(fill)
+    load(3)  # a visitor's entry has no refresh
+    keys = sorted(load.stats.entries)
+    for key in keys:
+        load.stats.entries[key].computed_at -= 590
+    fresh = keys[0]
+    load.stats.entries[fresh].computed_at += 590
+
+    touched = {t for t in touched if t[1] != keys[1]}  # the jobs stopped asking
+    due, next_refresh = cache_manager._due(time.time(), touched)
+    due = sorted(label for label, _ in due if label.startswith("test_due "))
+    assert due == [f"test_due {keys[2]}"]
+    # the fresh one is next, a margin before it expires
+    assert next_refresh == pytest.approx(
+        load.stats.entries[fresh].computed_at + 600 - cache_manager.REFRESH_MARGIN
+    )
+
+
+def test_refresh_serves_old_value_until_new_is_ready():
+    calls, seen = [], []
+
+    @managed_cache("test_refresh", ttl=600)
+    def load(n: int) -> int:
+        calls.append(n)
+        if len(calls) == 2:
+            # a visitor while the refresh computes gets the old value
+            visitor = threading.Thread(target=lambda: seen.append(load(n)))
+            visitor.start()
+            visitor.join()
+        return n * 10 + len(calls)
+
+    assert on_warm_thread(lambda: load(1)) == 11
+    (entry,) = load.stats.entries.values()
+    computed_at = entry.computed_at
+
+    assert entry.refresh() == 12
+    assert seen == [11] and calls == [1, 1]
+    assert load(1) == 12
+    (entry,) = load.stats.entries.values()
+    assert entry.computed_at > computed_at
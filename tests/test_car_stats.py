@@ -0,0 +1,57 @@
+"""Edge cases of the chart aggregations in ``utils.car_stats``."""
+
+from __future__ import annotations
+
+import pandas as pd
+
+from utils import car_stats
+
+
+def test_age_band_shares_keeps_empty_cells_as_zero():
+    # Kia never sold anything 7+ years old, Ford nothing under 3
+    df = pd.DataFrame({
+        "make": ["Kia", "Kia", "Kia", "Ford", "Ford"],
+        "car_age": [1, 4, 6, 8, 9],
+    })
+    agg, matrix = car_stats.age_band_shares(df)
+
+    assert len(agg) == 2 * len(car_stats.AGE_LABELS)
+    assert not agg["share"].isna().any()
+    assert matrix.loc["Kia", "7+ yrs"] == 0
+    assert matrix.loc["Ford", "<3 yrs"] == 0
+    assert matrix.loc["Ford", "7+ yrs"] == 1
+    assert matrix.sum(axis=1).tolist() == [1.0, 1.0]
+
+
+def test_sales_over_time_adds_up_to_the_filtered_rows(dashboard_frame):
+    df = dashboard_frame
+    dated = df[df["saledate"].notna()]
+    price_min, price_max = df["sellingprice"].min(), df["sellingprice"].max()
+    makes, bodies = ["Ford", "Toyota", "Nissan"], ["Sedan", "SUV"]
+    rollup = car_stats.daily_rollup(df)
+
+    # upper handle at the top: the full rollup is exact
+    over_time = car_stats.sales_over_time(
+        rollup, makes, bodies, (price_min, price_max), price_max, "Day"
+    )
+    expected = car_stats.filter_sales(dated, makes, bodies, (price_min, price_max))
+    assert over_time["n"].sum() == len(expected)
+
+    # below the top, on a bucket edge some sales are priced exactly at: the
+    # full rollup leaves those out, a rollup of the filtered rows doesn't
+    high = price_min + 30 * car_stats.PRICE_STEP
+    assert (df["sellingprice"] == high).any()
+    expected = car_stats.filter_sales(dated, makes, bodies, (price_min, high))
+    over_time = car_stats.sales_over_time(
+        rollup, makes, bodies, (price_min, high), price_max, "Week"
+    )
+    assert over_time["n"].sum() < len(expected)
+
+    filtered = car_stats.daily_rollup(
+        car_stats.filter_sales(df, makes, bodies, (price_min, high)), price_min
+    )
+    over_time = car_stats.sales_over_time(
+        filtered, None, None, (price_min, price_max), price_max, "Week"
+    )
+    assert over_time["n"].sum() == len(expected)
+    assert over_time["avg_diff"].notna().all()
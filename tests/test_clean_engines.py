@@ -0,0 +1,67 @@
+"""The Polars cleaning engine gives the same frame as the pandas one.
+
+Same check as ``scripts/check_clean_engines.py``, for every trim mode, on the
+synthetic CSV and on a copy with awkward sale dates mixed in.
+"""
+
+from __future__ import annotations
+
+import warnings
+
+import pandas as pd
+import pytest
+
+from utils.car_data import TRIM_GROUPS, load_clean_car_prices
+
+pytest.importorskip("polars")
+
+# dates the fast path parses itself, dates it leaves to pandas, and dates
+# neither can read; the ones around new year move to another sale_year if
+# the GMT offset is applied with the wrong sign
+EDGE_SALEDATES = [
+    "Wed Dec 31 2014 20:00:00 GMT-0800 (PST)",
+    "Thu Jan 01 2015 03:00:00 GMT+0530 (IST)",
+    "Thu Jan 01 2015 00:30:00 GMT+0100 (CET)",
+    "Wed Dec 31 2014 23:30:00 GMT-0000 (UTC)",
+    "Thu Jan 01 2015 00:00:00 GMT+0000 (GMT)",
+    "Tue Jan 6 2015 09:30:00 GMT-0800 (PST)",
+    "Sun Jun 14 2015 13:00:00 GMT-0230 (NDT)",
+    "2015-03-02 10:00:00",
+    "2015-03-02T10:00:00+0900",
+    "not a date",
+    "",
+    "NULL",
+]
+
+
+@pytest.fixture(scope="module")
+def edge_csv(sales_csv, tmp_path_factory):
+    df = pd.read_csv(sales_csv, nrows=4_000, dtype={"saledate": "str"})
+    # every other row, so each edge case lands in every make and body style
+    rows = df.index[::2]
+    df.loc[rows, "saledate"] = [EDGE_SALEDATES[i % len(EDGE_SALEDATES)] for i in range(len(rows))]
+    path = tmp_path_factory.mktemp("edge") / "car_prices.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+def assert_engines_agree(path, trim: str) -> pd.DataFrame:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="Could not infer format")
+        expected = load_clean_car_prices(str(path), "pandas", trim)
+        got = load_clean_car_prices(str(path), "polars", trim)
+    pd.testing.assert_frame_equal(expected[got.columns], got)
+    return got
+
+
+@pytest.mark.parametrize("trim", list(TRIM_GROUPS))
+def test_synthetic(sales_csv, trim):
+    assert len(assert_engines_agree(sales_csv, trim)) > 0
+
+
+@pytest.mark.parametrize("trim", list(TRIM_GROUPS))
+def test_edge_case_saledates(edge_csv, trim):
+    got = assert_engines_agree(edge_csv, trim)
+    # the edge cases themselves made it through, not just the plain rows
+    assert got["sale_year"].isin([2014, 2015]).all()
+    assert (got["saledate"].dt.month == 1).any()
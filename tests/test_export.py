@@ -0,0 +1,37 @@
+"""Chunked exports come out whole, and stop at the size cap."""
+
+from __future__ import annotations
+
+import io
+
+import pandas as pd
+import pytest
+
+from utils.export import ExportTooLarge, export_file
+
+
+def chunks(n: int, rows: int = 1_000):
+    for i in range(n):
+        yield pd.DataFrame({"id": range(i * rows, (i + 1) * rows), "price": 1_000.5})
+
+
+@pytest.mark.parametrize("fmt", ["CSV", "Parquet"])
+def test_round_trip(fmt):
+    data = export_file(chunks(5), fmt)
+    read = pd.read_csv if fmt == "CSV" else pd.read_parquet
+    pd.testing.assert_frame_equal(read(io.BytesIO(data)), pd.concat(chunks(5), ignore_index=True))
+
+
+@pytest.mark.parametrize("fmt", ["CSV", "Parquet"])
+def test_size_cap(fmt):
+    pulled = []
+
+    def counted():
+        for chunk in chunks(100):
+            pulled.append(chunk)
+            yield chunk
+
+    with pytest.raises(ExportTooLarge):
+        export_file(counted(), fmt, max_bytes=20_000)
+    # it gave up early instead of encoding everything first
+    assert len(pulled) < 100
@@ -0,0 +1,64 @@
+"""``IncrementalGraph`` keeps its components and degrees in step with
+networkx over random edits, isolated nodes included.
+"""
+
+from __future__ import annotations
+
+import random
+
+import networkx as nx
+import pytest
+
+from utils.incremental_graph import IncrementalGraph, full_metrics
+
+NODES = [f"p{i}" for i in range(15)]
+
+
+def assert_matches_networkx(graph: IncrementalGraph, expected: nx.Graph) -> None:
+    assert set(graph.graph.nodes) == set(expected.nodes)
+    assert {frozenset(e) for e in graph.graph.edges} == {frozenset(e) for e in expected.edges}
+    got = [frozenset(c) for c in graph.components()]
+    assert sorted(map(len, got), reverse=True) == [len(c) for c in got]
+    assert set(got) == {frozenset(c) for c in nx.connected_components(expected)}
+    assert graph.degree_centrality() == pytest.approx(nx.degree_centrality(expected))
+    assert set(graph.communities()) == set(expected.nodes)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_edits_match_networkx(seed):
+    rng = random.Random(seed)
+    edges = [tuple(rng.sample(NODES[:10], 2)) for _ in range(12)]
+    graph = IncrementalGraph(edges)
+    expected = nx.Graph(edges)
+
+    for _ in range(300):
+        if expected.number_of_edges() and rng.random() < 0.5:
+            u, v = rng.choice(list(expected.edges))
+            if rng.random() < 0.5:
+                u, v = v, u
+            assert graph.remove_edge(u, v)
+            expected.remove_edge(u, v)
+        else:
+            u, v = rng.sample(NODES, 2)
+            assert graph.add_edge(u, v) == (not expected.has_edge(u, v))
+            expected.add_edge(u, v)
+        assert_matches_networkx(graph, expected)
+    assert graph.version > 0
+
+
+def test_no_op_edits():
+    graph = IncrementalGraph([("a", "b")], precomputed=full_metrics(nx.Graph([("a", "b")])))
+    assert not graph.add_edge("a", "b") and not graph.add_edge("b", "a")
+    assert not graph.add_edge("a", "a")
+    assert not graph.remove_edge("a", "c")
+    assert graph.version == 0
+
+
+def test_last_edge_leaves_isolated_nodes():
+    graph = IncrementalGraph([("a", "b"), ("b", "c")])
+    graph.remove_edge("a", "b")
+    graph.remove_edge("b", "c")
+
+    assert set(graph.graph.nodes) == {"a", "b", "c"}
+    assert sorted(map(sorted, graph.components())) == [["a"], ["b"], ["c"]]
+    assert graph.degree_centrality() == {"a": 0.0, "b": 0.0, "c": 0.0}
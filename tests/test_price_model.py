@@ -0,0 +1,90 @@
+"""The price estimator's k-means index: training, lookups, and what a lookup
+falls back to when the car or the index gives it little to go on.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from utils.price_model import COLUMNS, TARGET, PriceModel, train, usable_rows
+
+
+@pytest.fixture(scope="module")
+def sales(dashboard_frame):
+    return usable_rows(dashboard_frame[COLUMNS]).reset_index(drop=True)
+
+
+def batches_of(df, size: int = 5_000):
+    return lambda: (df.iloc[i:i + size] for i in range(0, len(df), size))
+
+
+@pytest.fixture(scope="module")
+def model(sales):
+    return train(batches_of(sales), k=24, epochs=2, sample_size=5_000)
+
+
+def car_of(row) -> dict:
+    return {c: row[c] for c in COLUMNS if c != TARGET}
+
+
+def test_every_sale_lands_in_a_histogram(model, sales):
+    assert model.centroids.shape[0] == 24
+    assert model.cluster_sizes.sum() == len(sales)
+    assert model.price_sums.sum() == pytest.approx(sales[TARGET].sum())
+    assert model.years == (sales["year"].min(), sales["year"].max())
+
+
+def test_estimate_uses_the_nearest_cluster(model, sales):
+    row = sales.iloc[0]
+    estimate = model.estimate(car_of(row))
+
+    x = model.encode(sales.iloc[[0]])
+    distances = ((model.centroids - x) ** 2).sum(axis=1)
+    distances[model.cluster_sizes == 0] = np.inf
+    assert estimate.cluster == distances.argmin()
+    assert estimate.n == model.cluster_sizes[estimate.cluster]
+    assert estimate.low <= estimate.median <= estimate.high
+
+
+def test_unknowns_are_left_out_of_the_distance(model, sales):
+    car = car_of(sales.iloc[0])
+    for unknown in ({"year": None, "odometer": None}, {"body_clean": "Hovercraft"},
+                    {c: None for c in car if c != "make"}):
+        estimate = model.estimate({**car, **unknown})
+        known = [k for k, v in {**car, **unknown}.items() if v is not None]
+        mask = model.feature_mask(known)
+        # the same cluster as a distance over the known features only
+        x = model.encode_one({**car, **unknown})[:, mask]
+        distances = ((model.centroids[:, mask] - x) ** 2).sum(axis=1)
+        distances[model.cluster_sizes == 0] = np.inf
+        assert estimate.cluster == distances.argmin()
+
+
+def test_empty_clusters_are_skipped(model, sales):
+    car = car_of(sales.iloc[0])
+    nearest = model.estimate(car).cluster
+    emptied = PriceModel(**{**vars(model), "histograms": model.histograms.copy()})
+    emptied.histograms[nearest] = 0
+
+    estimate = emptied.estimate(car)
+    assert estimate.cluster != nearest and estimate.n > 0
+
+
+def test_fewer_rows_than_clusters(sales):
+    few = sales.iloc[:30]
+    model = train(batches_of(few), k=400, epochs=1)
+    assert model.centroids.shape[0] == 30
+    assert model.cluster_sizes.sum() == 30
+    assert model.estimate(car_of(few.iloc[0])).n > 0
+
+
+def test_save_and_load(model, sales, tmp_path):
+    path = tmp_path / "price_model.npz"
+    model.save(path)
+    loaded = PriceModel.load(path)
+
+    assert loaded.vocab == model.vocab and loaded.years == model.years
+    np.testing.assert_array_equal(loaded.centroids, model.centroids)
+    car = car_of(sales.iloc[1])
+    assert loaded.estimate(car) == model.estimate(car)
@@ -0,0 +1,108 @@
+"""Frames survive the trip through ``write_columns`` / ``attach_columns``."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import car_stats
+from utils.shared_columns import attach_columns, write_columns
+
+
+@pytest.fixture
+def frame() -> pd.DataFrame:
+    n = 200
+    rng = np.random.default_rng(0)
+    odometer = rng.uniform(0, 200_000, n)
+    odometer[::7] = np.nan
+    year = pd.array(rng.integers(1990, 2015, n), dtype="Int64")
+    year[::11] = pd.NA
+    make = pd.Series(rng.choice(["Ford", "Kia", "BMW"], n), dtype="str")
+    make[::13] = np.nan
+    vin = pd.Series([f"vin{i:05d}" for i in range(n)], dtype="str")
+    vin[5] = np.nan
+    saledate = pd.Series(
+        pd.date_range("2014-12-01", periods=n, freq="h", tz="UTC")
+    ).dt.tz_convert("America/Los_Angeles")
+    saledate[3] = pd.NaT
+    return pd.DataFrame(
+        {
+            "sellingprice": rng.integers(500, 50_000, n),
+            "odometer": odometer,
+            "year": year,
+            "make": make,
+            # already categorical, with a category no row uses
+            "body": pd.Categorical(
+                rng.choice(["Sedan", "SUV"], n), categories=["Coupe", "SUV", "Sedan"]
+            ),
+            "vin": vin,
+            "sold": rng.random(n) < 0.5,
+            "saledate": saledate,
+        },
+        index=pd.Index(np.arange(n) * 3),
+    )
+
+
+def test_round_trip(frame, tmp_path):
+    write_columns(frame, tmp_path)
+    got = attach_columns(tmp_path)
+
+    pd.testing.assert_index_equal(got.index, frame.index)
+    assert list(got.columns) == list(frame.columns)
+    # plain numpy columns are views of the memory maps
+    for column in ["sellingprice", "odometer", "sold"]:
+        assert not got[column].to_numpy().flags.writeable
+        assert got[column].dtype == frame[column].dtype
+        np.testing.assert_array_equal(np.asarray(got[column]), frame[column].to_numpy())
+    for column in ["year", "saledate"]:
+        pd.testing.assert_series_equal(got[column], frame[column])
+
+    # few distinct strings become categories, sorted, with NaN kept as NaN
+    assert isinstance(got["make"].dtype, pd.CategoricalDtype)
+    assert list(got["make"].cat.categories) == ["BMW", "Ford", "Kia"]
+    assert got["make"].isna().tolist() == frame["make"].isna().tolist()
+    assert got["make"].astype("str").tolist() == frame["make"].astype("str").tolist()
+    # only the categories some row has are kept
+    assert list(got["body"].cat.categories) == ["SUV", "Sedan"]
+    assert got["body"].astype("str").tolist() == frame["body"].astype("str").tolist()
+
+    # mostly-distinct strings stay strings, NaN included
+    assert pd.api.types.is_string_dtype(got["vin"].dtype)
+    assert got["vin"].isna().tolist() == frame["vin"].isna().tolist()
+    assert got["vin"].dropna().tolist() == frame["vin"].dropna().tolist()
+
+
+def test_read_only(frame, tmp_path):
+    write_columns(frame, tmp_path)
+    got = attach_columns(tmp_path)
+    with pytest.raises(ValueError):
+        got["odometer"].to_numpy()[0] = 1.0
+
+
+def test_car_stats_on_categorical_columns(dashboard_frame, tmp_path):
+    # the attached frame's string columns are categorical; the charts'
+    # groupbys must still only see the cells that have sales
+    write_columns(dashboard_frame, tmp_path)
+    attached = attach_columns(tmp_path)
+
+    def same(fn, *args):
+        expected, got = fn(dashboard_frame, *args), fn(attached, *args)
+        if isinstance(expected, tuple):
+            expected, got = expected[0], got[0]
+        expected, got = expected.reset_index(drop=True), got.reset_index(drop=True)
+        for df in (expected, got):
+            for column, dtype in df.dtypes.items():
+                if isinstance(dtype, pd.CategoricalDtype):
+                    df[column] = df[column].astype("str")
+        pd.testing.assert_frame_equal(expected, got, check_dtype=False)
+
+    same(car_stats.make_vs_mmr)
+    same(car_stats.odometer_medians)
+    same(car_stats.age_band_shares)
+    same(car_stats.make_price_stats)
+    same(car_stats.model_price_stats, "Ford")
+    same(car_stats.body_vs_mmr)
+    same(car_stats.make_body_price_cube)
+    same(car_stats.daily_rollup)
+    assert car_stats.narrative_stats(attached) == car_stats.narrative_stats(dashboard_frame)
@@ -0,0 +1,6 @@
+"""Shared helpers for the portfolio pages.
+
+Modules in here are imported by the pages directly (``from utils.x import y``);
+this file stays empty so importing one helper never drags in the heavy
+plotting or graph libraries another one needs.
+"""
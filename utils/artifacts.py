@@ -0,0 +1,114 @@
+"""Prebuilt page artifacts written by ``scripts/build_artifacts.py``.
+
+Every build lives in a directory of its own under ``artifacts/``, named
+after what went into it (schema number, a hash of the source CSV, cleaning
+engine, price clusters) plus a unique suffix, with a ``manifest.json``
+describing it; ``artifacts/LATEST`` names the build the pages should read.
+A build is only used while the CSV it was made from is still the one the
+pages read (``data/car_prices.csv``); once that changes, or when there's no
+usable build, the pages fall back to cleaning and aggregating the CSV
+themselves.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+from utils.cache_manager import managed_cache
+from utils.config import ARTIFACT_ROOT, CACHE_TTL
+
+# bump when the layout or meaning of any artifact changes; older builds are
+# then ignored instead of being read wrong
+SCHEMA_VERSION = 1
+
+LATEST_FILE = "LATEST"
+MANIFEST_FILE = "manifest.json"
+
+
+@dataclass(frozen=True)
+class ArtifactBuild:
+    path: Path
+    manifest: dict
+
+    @property
+    def version(self) -> str:
+        return self.path.name
+
+    def file(self, name: str) -> Path | None:
+        """Path of artifact ``name``, or None if this build doesn't have it."""
+        filename = self.manifest.get("files", {}).get(name)
+        if filename is None:
+            return None
+        path = self.path / filename
+        return path if path.exists() else None
+
+    def table(self, name: str):
+        """Artifact ``name`` as a DataFrame (cached), or None if missing."""
+        path = self.file(name)
+        return None if path is None else read_table(str(path))
+
+    def json(self, name: str) -> dict | None:
+        path = self.file(name)
+        return None if path is None else read_json(str(path))
+
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# keyed by size and mtime too, so an edited CSV is hashed again
+@managed_cache("source_hashes", max_entries=4)
+def _source_hash(path: str, size: int, mtime_ns: int) -> str:
+    return file_hash(Path(path))
+
+
+def source_hash(path: str) -> str | None:
+    """SHA-256 of the CSV at ``path``, hashed once per version of the file."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return _source_hash(str(path), stat.st_size, stat.st_mtime_ns)
+
+
+def latest_build(root: Path = ARTIFACT_ROOT, data: str | None = None) -> ArtifactBuild | None:
+    """The build named by ``LATEST``, if it's usable and still current.
+
+    Usable means it exists and matches our schema; current, that it was made
+    from the CSV at ``data`` (default: the one the pages read) as it is now.
+    Deployments that ship a build without its CSV get the build as is.
+    """
+    try:
+        version = (root / LATEST_FILE).read_text().strip()
+        manifest = json.loads((root / version / MANIFEST_FILE).read_text())
+    except (OSError, ValueError):
+        return None
+    if manifest.get("schema_version") != SCHEMA_VERSION:
+        return None
+    if data is None:
+        from utils.car_data import DATA_PATH as data
+    current = source_hash(data)
+    if current is not None and current != manifest.get("source_sha256"):
+        return None
+    return ArtifactBuild(root / version, manifest)
+
+
+# paths include the build version, so a new build never hits an old entry
+@managed_cache("artifact_tables", ttl=CACHE_TTL, max_entries=16)
+def read_table(path: str):
+    import pandas as pd
+
+    return pd.read_parquet(path)
+
+
+@managed_cache("artifact_json", ttl=CACHE_TTL, max_entries=4)
+def read_json(path: str) -> dict:
+    return json.loads(Path(path).read_text())
@@ -0,0 +1,387 @@
+"""Where the Dashboard's filter + aggregate queries run.
+
+``PandasBackend`` filters the cleaned frame in memory and hands the result to
+``utils.car_stats``. ``DuckDBBackend`` keeps the data inside an in-process
+DuckDB database (over the artifact Parquet file, or a registered frame) and
+runs the same queries as SQL, so the make/body/price predicates are pushed
+down and no filtered copy is ever materialised in pandas. Both return the
+same tables; ``scripts/check_backends.py`` compares them.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from utils import car_stats
+from utils.export import CHUNK_ROWS
+from utils.kpi_estimates import KPI_COLUMNS, STRATA, stratified_sample
+
+TOP_MAKES = 25
+
+
+@dataclass(frozen=True)
+class SalesFilters:
+    """The Dashboard's sidebar selection; empty makes/bodies mean "all"."""
+
+    makes: tuple[str, ...]
+    bodies: tuple[str, ...]
+    price_range: tuple[float, float]
+
+    @classmethod
+    def of(
+        cls,
+        makes: Sequence[str],
+        bodies: Sequence[str],
+        price_range: Sequence[float],
+    ) -> SalesFilters:
+        return cls(tuple(makes), tuple(bodies), tuple(price_range))
+
+
+#####################################################################
+# pandas
+#####################################################################
+class PandasBackend:
+    name = "pandas"
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self._last: tuple[SalesFilters, pd.DataFrame] | None = None
+
+    def filtered(self, filters: SalesFilters) -> pd.DataFrame:
+        # every widget on the page asks about the same filters, so keep the
+        # last result instead of filtering again per chart
+        if self._last is None or self._last[0] != filters:
+            df = car_stats.filter_sales(
+                self.df, filters.makes, filters.bodies, filters.price_range
+            )
+            self._last = (filters, df)
+        return self._last[1]
+
+    def rows(self, filters: SalesFilters) -> np.ndarray:
+        """Positions of the matching rows; an index, not a copy of them."""
+        return np.flatnonzero(
+            car_stats.filter_mask(self.df, filters.makes, filters.bodies, filters.price_range)
+        )
+
+    def export_chunks(
+        self, filters: SalesFilters, chunk_rows: int = CHUNK_ROWS
+    ) -> Iterator[pd.DataFrame]:
+        rows = self.rows(filters)
+        for start in range(0, len(rows), chunk_rows):
+            yield self.df.iloc[rows[start:start + chunk_rows]]
+
+    @staticmethod
+    def _top_makes(df: pd.DataFrame, n: int) -> list[str]:
+        # ties by name, as DuckDB orders them
+        counts = df["make"].value_counts().sort_index()
+        counts = counts[counts > 0]  # categoricals count unused makes as 0
+        return counts.sort_values(ascending=False, kind="stable").head(n).index.tolist()
+
+    def options(self) -> dict:
+        return {
+            "top_makes": self._top_makes(self.df, TOP_MAKES),
+            "bodies": sorted(self.df["body_clean"].dropna().unique().tolist()),
+            "price_min": int(self.df["sellingprice"].min()),
+            "price_max": int(self.df["sellingprice"].max()),
+        }
+
+    def count(self, filters: SalesFilters) -> int:
+        return len(self.filtered(filters))
+
+    def makes(self, filters: SalesFilters) -> list[str]:
+        return sorted(self.filtered(filters)["make"].dropna().unique())
+
+    def top_makes(self, filters: SalesFilters, n: int) -> list[str]:
+        """The ``n`` best-selling makes in the filtered view, ties by name."""
+        return self._top_makes(self.filtered(filters), n)
+
+    def kpis(self, filters: SalesFilters) -> dict:
+        return car_stats.sales_kpis(self.filtered(filters))
+
+    def kpi_sample(self, rows: int) -> pd.DataFrame:
+        return stratified_sample(self.df, rows)
+
+    def make_price_stats(self, filters: SalesFilters) -> pd.DataFrame:
+        return car_stats.make_price_stats(self.filtered(filters))
+
+    def model_price_stats(self, filters: SalesFilters, make: str) -> pd.DataFrame:
+        return car_stats.model_price_stats(self.filtered(filters), make)
+
+    def body_vs_mmr(self, filters: SalesFilters) -> pd.DataFrame:
+        return car_stats.body_vs_mmr(self.filtered(filters))
+
+    def narrative_stats(self, filters: SalesFilters) -> dict:
+        return car_stats.narrative_stats(self.filtered(filters))
+
+    def daily_rollup(self, filters: SalesFilters | None = None) -> pd.DataFrame:
+        if filters is None:
+            return car_stats.daily_rollup(self.df)
+        return car_stats.daily_rollup(self.filtered(filters), self.df["sellingprice"].min())
+
+    def for_thread(self) -> PandasBackend:
+        # the frame is shared read-only, but filtered() remembers its last
+        # result on the instance; give the thread one of its own
+        return PandasBackend(self.df)
+
+
+#####################################################################
+# DuckDB
+#####################################################################
+def connect_duckdb(source: str | pd.DataFrame):
+    """An in-memory DuckDB connection with a ``sales`` view over ``source``.
+
+    ``source`` is a Parquet path (read lazily, with predicate pushdown) or a
+    DataFrame, which is copied into a DuckDB table once. Registered frames
+    are only visible to the connection itself, not to its cursors.
+    """
+    import duckdb
+
+    con = duckdb.connect(":memory:")
+    if isinstance(source, pd.DataFrame):
+        con.register("sales_frame", source)
+        con.execute("CREATE TABLE sales AS SELECT * FROM sales_frame")
+        con.unregister("sales_frame")
+    else:
+        path = str(source).replace("'", "''")
+        con.execute(f"CREATE VIEW sales AS SELECT * FROM read_parquet('{path}')")
+    return con
+
+
+class DuckDBBackend:
+    name = "duckdb"
+
+    def __init__(self, con):
+        # a cursor of our own onto the shared database; it runs one query at
+        # a time, so each thread needs its own (see ``for_thread``)
+        self._con = con.cursor()
+
+    def _where(self, filters: SalesFilters) -> tuple[str, list]:
+        clauses = ["sellingprice BETWEEN ? AND ?"]
+        params: list = list(filters.price_range)
+        for column, values in (("make", filters.makes), ("body_clean", filters.bodies)):
+            if values:
+                clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        return " AND ".join(clauses), params
+
+    def _query(self, sql: str, params: Sequence = ()) -> pd.DataFrame:
+        return self._con.execute(sql, list(params)).df()
+
+    def _grouped(
+        self, filters: SalesFilters, key: str, aggs: str, extra: str = "", params=()
+    ) -> pd.DataFrame:
+        where, where_params = self._where(filters)
+        return self._query(
+            f"""
+            SELECT {key}, {aggs}
+            FROM sales
+            WHERE {where} AND {key} IS NOT NULL {extra}
+            GROUP BY {key}
+            ORDER BY {key}
+            """,
+            where_params + list(params),
+        )
+
+    def options(self) -> dict:
+        top = self._query(
+            f"""
+            SELECT make FROM sales WHERE make IS NOT NULL
+            GROUP BY make ORDER BY count(*) DESC, make LIMIT {TOP_MAKES}
+            """
+        )
+        bodies = self._query(
+            "SELECT DISTINCT body_clean FROM sales "
+            "WHERE body_clean IS NOT NULL ORDER BY body_clean"
+        )
+        low, high = self._con.execute(
+            "SELECT min(sellingprice), max(sellingprice) FROM sales"
+        ).fetchone()
+        return {
+            "top_makes": top["make"].tolist(),
+            "bodies": bodies["body_clean"].tolist(),
+            "price_min": int(low),
+            "price_max": int(high),
+        }
+
+    def count(self, filters: SalesFilters) -> int:
+        where, params = self._where(filters)
+        return self._con.execute(
+            f"SELECT count(*) FROM sales WHERE {where}", params
+        ).fetchone()[0]
+
+    def export_chunks(
+        self, filters: SalesFilters, chunk_rows: int = CHUNK_ROWS
+    ) -> Iterator[pd.DataFrame]:
+        # arrow batches straight off the query, so only one is ever in memory;
+        # on a cursor of its own, closed even if the caller stops early
+        where, params = self._where(filters)
+        cursor = self._con.cursor()
+        try:
+            reader = cursor.execute(
+                f"SELECT * FROM sales WHERE {where}", params
+            ).to_arrow_reader(chunk_rows)
+            for batch in reader:
+                yield batch.to_pandas()
+        finally:
+            cursor.close()
+
+    def makes(self, filters: SalesFilters) -> list[str]:
+        where, params = self._where(filters)
+        return self._query(
+            f"SELECT DISTINCT make FROM sales WHERE {where} AND make IS NOT NULL "
+            "ORDER BY make",
+            params,
+        )["make"].tolist()
+
+    def top_makes(self, filters: SalesFilters, n: int) -> list[str]:
+        where, params = self._where(filters)
+        return self._query(
+            f"""
+            SELECT make FROM sales WHERE {where} AND make IS NOT NULL
+            GROUP BY make ORDER BY count(*) DESC, make LIMIT {int(n)}
+            """,
+            params,
+        )["make"].tolist()
+
+    def kpis(self, filters: SalesFilters) -> dict:
+        where, params = self._where(filters)
+        row = self._query(
+            f"""
+            SELECT count(*) AS total_sales,
+                   avg(price_diff) AS avg_diff,
+                   median(price_diff) AS median_diff,
+                   median(odometer) AS median_odometer,
+                   median(car_age) AS median_age
+            FROM sales WHERE {where}
+            """,
+            params,
+        ).iloc[0]
+        return {
+            "total_sales": int(row["total_sales"]),
+            "avg_diff": row["avg_diff"],
+            "median_diff": row["median_diff"],
+            "median_odometer": row["median_odometer"],
+            "median_age": row["median_age"],
+        }
+
+    def kpi_sample(self, rows: int) -> pd.DataFrame:
+        """``kpi_estimates.stratified_sample``, drawn inside DuckDB."""
+        columns = ", ".join(KPI_COLUMNS)
+        strata = ", ".join(STRATA)
+        total = self._con.execute("SELECT count(*) FROM sales").fetchone()[0]
+        if total <= rows:
+            return self._query(f"SELECT {columns} FROM sales")
+        return self._query(
+            f"""
+            SELECT {columns}
+            FROM (
+                SELECT {columns},
+                       row_number() OVER (PARTITION BY {strata} ORDER BY random()) AS pick,
+                       count(*) OVER (PARTITION BY {strata}) AS stratum
+                FROM sales
+            )
+            WHERE pick <= round(stratum * ?)
+            """,
+            [rows / total],
+        )
+
+    def make_price_stats(
+        self, filters: SalesFilters, min_sales: int = 100, top_n: int = 15
+    ) -> pd.DataFrame:
+        stats = self._grouped(
+            filters,
+            "make",
+            "avg(sellingprice) AS avg_price, avg(price_diff) AS avg_diff, count(*) AS n",
+        )
+        stats = stats.sort_values("avg_price", ascending=False)
+        return stats[stats["n"] >= min_sales].head(top_n)
+
+    def model_price_stats(
+        self, filters: SalesFilters, make: str, min_sales: int = 30
+    ) -> pd.DataFrame:
+        stats = self._grouped(
+            filters,
+            "model",
+            "avg(sellingprice) AS avg_price, avg(price_diff) AS avg_diff, count(*) AS n",
+            extra="AND make = ?",
+            params=[make],
+        )
+        return stats[stats["n"] >= min_sales].sort_values("avg_price", ascending=False)
+
+    def body_vs_mmr(self, filters: SalesFilters, min_sales: int = 500) -> pd.DataFrame:
+        stats = self._grouped(
+            filters,
+            "body_clean",
+            "avg(price_diff) AS avg_diff, median(price_diff) AS median_diff, "
+            "count(*) AS n",
+        )
+        return stats[stats["n"] >= min_sales].sort_values("avg_diff")
+
+    def daily_rollup(self, filters: SalesFilters | None = None) -> pd.DataFrame:
+        """``car_stats.daily_rollup``, one GROUP BY over the (filtered) table."""
+        where, params = ("TRUE", []) if filters is None else self._where(filters)
+        rollup = self._query(
+            f"""
+            WITH bounds AS (SELECT min(sellingprice) AS price_min FROM sales)
+            SELECT CAST(timezone('UTC', saledate) AS DATE) AS day,
+                   make,
+                   body_clean,
+                   price_min + floor((sellingprice - price_min) / {car_stats.PRICE_STEP})
+                       * {car_stats.PRICE_STEP} AS price_bucket,
+                   count(*) AS n,
+                   sum(sellingprice) AS sum_price,
+                   sum(price_diff) AS sum_diff
+            FROM sales, bounds
+            WHERE saledate IS NOT NULL AND {where}
+            GROUP BY ALL
+            ORDER BY day, make, body_clean, price_bucket
+            """,
+            params,
+        )
+        rollup["day"] = pd.to_datetime(rollup["day"])
+        return rollup
+
+    def for_thread(self) -> DuckDBBackend:
+        return DuckDBBackend(self._con)
+
+    def narrative_stats(self, filters: SalesFilters) -> dict:
+        where, params = self._where(filters)
+        overall = self._query(
+            f"""
+            SELECT avg(price_diff) AS avg_diff, median(price_diff) AS median_diff
+            FROM sales WHERE {where}
+            """,
+            params,
+        ).iloc[0]
+        median_diff = overall["median_diff"]
+        aggs = "avg(price_diff) AS avg_diff, count(*) AS n"
+
+        make_diff = self._grouped(filters, "make", aggs)
+        make_diff = make_diff[make_diff["n"] >= 100]
+        if not make_diff.empty:
+            cheapest_row = make_diff.sort_values("avg_diff").iloc[0]
+            cheapest_make, cheapest_make_diff = cheapest_row["make"], cheapest_row["avg_diff"]
+        else:
+            cheapest_make, cheapest_make_diff = "some makes", median_diff
+
+        body_diff = self._grouped(filters, "body_clean", aggs)
+        body_diff = body_diff[body_diff["n"] >= 500]
+        if not body_diff.empty:
+            strongest_row = body_diff.sort_values("avg_diff").iloc[-1]
+            strongest_body, strongest_body_diff = (
+                strongest_row["body_clean"], strongest_row["avg_diff"]
+            )
+        else:
+            strongest_body, strongest_body_diff = "some body styles", median_diff
+
+        return {
+            "avg_diff": overall["avg_diff"],
+            "cheapest_make": cheapest_make,
+            "cheapest_make_diff": cheapest_make_diff,
+            "strongest_body": strongest_body,
+            "strongest_body_diff": strongest_body_diff,
+        }
@@ -0,0 +1,343 @@
+"""Named Streamlit caches with limits, stats and a background warm-up.
+
+``managed_cache`` wraps ``st.cache_data`` (or ``st.cache_resource``) with a
+per-cache ``ttl`` and ``max_entries`` and keeps a tally next to it: calls,
+misses, and for every entry when it was computed and roughly how many bytes
+it holds. ``cache_stats()`` reports that per cache and ``refreshed_at`` tells
+a page when the entry it is showing was computed.
+
+Streamlit doesn't expose what it holds, so entries are tracked as the
+manager sees them: an entry counts until its TTL runs out or ``max_entries``
+newer ones push it out, the same rules Streamlit evicts by.
+
+``start_warming(jobs)`` runs zero-argument callables on a daemon thread,
+once per process, and recomputes the entries they filled shortly before
+they expire, so the first visitor after a start (or a TTL) doesn't pay for
+the load. A refresh computes the new value first and only then replaces
+the old one, which visitors keep getting meanwhile. Only those entries are
+kept fresh: whatever visitors or prefetching filled expires as usual, and
+so does anything the jobs stopped asking for. A job runs again only once
+something it filled is gone (evicted, or cleared by a page), since calling
+a ``st.cache_data`` loader copies its value out even on a hit. Calls made
+from that thread, or any other marked with ``background()``, don't count
+towards hit rates.
+"""
+
+from __future__ import annotations
+
+import functools
+import importlib
+import inspect
+import logging
+import pickle
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+
+import streamlit as st
+
+log = logging.getLogger(__name__)
+
+# wake this long before an entry expires so it's recomputed ahead of visitors
+REFRESH_MARGIN = 60.0
+# how long the warmer sleeps when nothing it filled has a TTL
+IDLE_WAKE = 3600.0
+# and at least this long between passes, so a failing job doesn't spin
+MIN_WAKE = 5.0
+
+_lock = threading.Lock()
+_caches: dict[str, CacheStats] = {}
+_warming = threading.local()
+_NOT_READY = object()
+_warmer: threading.Thread | None = None
+
+
+@dataclass
+class Entry:
+    computed_at: float
+    bytes: int | None
+    # recomputes this entry, then swaps it in; only kept for what the
+    # warm-up jobs filled, so other entries don't pin their arguments in memory
+    refresh: Callable[[], object] | None = None
+
+
+@dataclass
+class CacheStats:
+    name: str
+    kind: str
+    ttl: float | None
+    max_entries: int | None
+    calls: int = 0
+    misses: int = 0
+    warmed: int = 0
+    entries: dict[str, Entry] = field(default_factory=dict)
+
+    def prune(self, now: float) -> None:
+        if self.ttl is not None:
+            self.entries = {
+                k: e for k, e in self.entries.items() if now - e.computed_at < self.ttl
+            }
+        if self.max_entries is not None and len(self.entries) > self.max_entries:
+            oldest_first = sorted(self.entries.items(), key=lambda ke: ke[1].computed_at)
+            self.entries = dict(oldest_first[-self.max_entries:])
+
+    def summary(self, now: float) -> dict:
+        self.prune(now)
+        sizes = [e.bytes for e in self.entries.values() if e.bytes is not None]
+        last = max((e.computed_at for e in self.entries.values()), default=None)
+        return {
+            "cache": self.name,
+            "kind": self.kind,
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "ttl_s": self.ttl,
+            "bytes": sum(sizes) if sizes else None,
+            "calls": self.calls,
+            "hit_rate": None if not self.calls else 1 - self.misses / self.calls,
+            "warmed": self.warmed,
+            "last_refresh": last,
+        }
+
+
+def size_of(value) -> int | None:
+    """Rough in-memory size of a cached value, in bytes."""
+    memory_usage = getattr(value, "memory_usage", None)
+    if callable(memory_usage):  # DataFrames
+        try:
+            return int(memory_usage(deep=True).sum())
+        except TypeError:
+            pass
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:  # noqa: BLE001 - unpicklable values just go unmeasured
+        return None
+
+
+def managed_cache(
+    name: str,
+    ttl: float | None = None,
+    max_entries: int | None = None,
+    kind: str = "data",
+):
+    """Decorate a loader like ``st.cache_data``, but registered as ``name``.
+
+    ``kind="resource"`` caches with ``st.cache_resource`` instead (one shared
+    object, not a copy per caller); resources aren't measured in bytes.
+    Arguments starting with ``_`` aren't hashed, as with Streamlit.
+    """
+    decorator = st.cache_data if kind == "data" else st.cache_resource
+
+    def decorate(fn):
+        stats = CacheStats(name, kind, ttl, max_entries)
+        with _lock:
+            _caches[name] = stats
+        signature = inspect.signature(fn)
+
+        def key_of(args, kwargs) -> str:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return repr([(k, v) for k, v in bound.arguments.items() if not k.startswith("_")])
+
+        def refresher(args, kwargs) -> Callable[[], object]:
+            def refresh():
+                # visitors keep getting the old value while this runs; the
+                # clear and the store right after it are all they can miss
+                _warming.ready = fn(*args, **kwargs)
+                try:
+                    cached.clear(*args, **kwargs)
+                    return cached(*args, **kwargs)
+                finally:
+                    _warming.ready = _NOT_READY
+
+            return refresh
+
+        # only runs on a miss; wraps() keeps Streamlit keying on fn's source
+        @functools.wraps(fn)
+        def compute(*args, **kwargs):
+            value = getattr(_warming, "ready", _NOT_READY)
+            _warming.ready = _NOT_READY
+            if value is _NOT_READY:
+                value = fn(*args, **kwargs)
+            size = size_of(value) if kind == "data" else None
+            now = time.time()
+            warm_job = getattr(_warming, "touched", None) is not None
+            with _lock:
+                if getattr(_warming, "active", False):
+                    stats.warmed += 1
+                else:
+                    stats.misses += 1
+                stats.entries[key_of(args, kwargs)] = Entry(
+                    now, size, refresher(args, kwargs) if warm_job else None
+                )
+                stats.prune(now)
+            return value
+
+        cached = decorator(ttl=ttl, max_entries=max_entries, show_spinner=False)(compute)
+
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            if not getattr(_warming, "active", False):
+                with _lock:
+                    stats.calls += 1
+            # Streamlit keys f() and f(x=default) apart; spell everything out
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            value = cached(*bound.args, **bound.kwargs)
+
+            touched = getattr(_warming, "touched", None)
+            if touched is not None:
+                key = key_of(bound.args, bound.kwargs)
+                touched.add((name, key))
+                with _lock:
+                    # a visitor may have filled it first
+                    entry = stats.entries.get(key)
+                    if entry is not None and entry.refresh is None:
+                        entry.refresh = refresher(bound.args, bound.kwargs)
+            return value
+
+        def refreshed_at(*args, **kwargs) -> float | None:
+            """When the entry for these arguments was computed, if cached."""
+            with _lock:
+                stats.prune(time.time())
+                entry = stats.entries.get(key_of(args, kwargs))
+            return None if entry is None else entry.computed_at
+
+        def clear(*args, **kwargs) -> None:
+            cached.clear(*args, **kwargs)
+            with _lock:
+                if args or kwargs:
+                    stats.entries.pop(key_of(args, kwargs), None)
+                else:
+                    stats.entries.clear()
+
+        call.refreshed_at = refreshed_at
+        call.clear = clear
+        call.stats = stats
+        return call
+
+    return decorate
+
+
+def cache_stats() -> list[dict]:
+    """One summary row per registered cache."""
+    now = time.time()
+    with _lock:
+        return [stats.summary(now) for stats in _caches.values()]
+
+
+#####################################################################
+# Warm-up
+#####################################################################
+def background() -> None:
+    """Mark the calling thread as filling caches ahead of visitors.
+
+    Its calls and misses are tallied as ``warmed`` instead, so prefetching
+    doesn't make the hit rate look better or worse than visitors see it.
+    """
+    _warming.active = True
+
+
+Jobs = Callable[[], Iterable[tuple[str, Callable[[], object]]]]
+
+
+def _run(label: str, job: Callable[[], object]) -> None:
+    started = time.perf_counter()
+    try:
+        job()
+    except Exception:  # noqa: BLE001 - a failed job leaves the page to load it
+        log.exception("warming %s failed", label)
+        return
+    log.info("warmed %s in %.1fs", label, time.perf_counter() - started)
+
+
+def _still_cached(keys: set[tuple[str, str]], now: float) -> bool:
+    """Whether every one of these entries is still cached."""
+    with _lock:
+        for name, key in keys:
+            stats = _caches[name]
+            stats.prune(now)
+            if key not in stats.entries:
+                return False
+    return True
+
+
+def _due(
+    now: float, touched: set[tuple[str, str]]
+) -> tuple[list[tuple[str, Callable[[], object]]], float | None]:
+    """Refreshes due by the next pass, and when the first of the rest is.
+
+    Only entries the last pass of the jobs asked for are kept fresh.
+    """
+    due, later = [], []
+    with _lock:
+        for stats in _caches.values():
+            if stats.ttl is None:
+                continue
+            stats.prune(now)
+            margin = min(REFRESH_MARGIN, stats.ttl / 4)
+            for key, entry in stats.entries.items():
+                if entry.refresh is None or (stats.name, key) not in touched:
+                    continue
+                refresh_at = entry.computed_at + stats.ttl - margin
+                if refresh_at <= now + MIN_WAKE:
+                    due.append((f"{stats.name} {key}", entry.refresh))
+                else:
+                    later.append(refresh_at)
+    return due, min(later, default=None)
+
+
+def _warm_pass(
+    jobs: Jobs, last_pass: dict[str, set[tuple[str, str]]]
+) -> dict[str, set[tuple[str, str]]]:
+    """Run the jobs, then the refreshes due; what each job filled, by name.
+
+    A job whose entries from ``last_pass`` are all still cached is skipped
+    and keeps them: the refreshes keep those fresh without reading them.
+    """
+    filled = {}
+    for label, job in jobs():
+        name = f"{label} {job!r}"  # label and arguments
+        keys = last_pass.get(name)
+        if not keys or not _still_cached(keys, time.time()):
+            keys = _warming.touched = set()
+            _run(label, job)
+        filled[name] = keys
+    # every entry the jobs ask for, cached or not, is kept fresh until a
+    # pass no longer asks for it
+    _warming.touched = set().union(*filled.values())
+    for label, refresh in _due(time.time(), _warming.touched)[0]:
+        _run(label, refresh)
+    return filled
+
+
+def _warm(jobs: Jobs | str) -> None:
+    background()
+    if isinstance(jobs, str):
+        module, _, name = jobs.partition(":")
+        jobs = getattr(importlib.import_module(module), name)
+    filled: dict[str, set[tuple[str, str]]] = {}
+    while True:
+        filled = _warm_pass(jobs, filled)
+
+        due, next_refresh = _due(time.time(), _warming.touched)
+        if due:
+            next_refresh = time.time()
+        wake = IDLE_WAKE if next_refresh is None else next_refresh - time.time()
+        time.sleep(min(max(wake, MIN_WAKE), IDLE_WAKE))
+
+
+def start_warming(jobs: Jobs | str) -> None:
+    """Start the warm-up thread, unless this process already has one.
+
+    ``jobs`` is called on every pass and yields ``(label, callable)`` pairs,
+    so it can look at the current artifact build each time. Given as
+    ``"module:function"`` it is imported on the warm-up thread, so a light
+    page can start warming without loading the heavy modules itself.
+    """
+    global _warmer
+    with _lock:
+        if _warmer is not None:
+            return
+        _warmer = threading.Thread(target=_warm, args=(jobs,), name="cache-warmer", daemon=True)
+    _warmer.start()
@@ -0,0 +1,116 @@
+"""Loading and cleaning of the used car sales dataset.
+
+These are plain functions so they can be timed and reused outside of
+Streamlit; the pages get them cached through ``utils.data_cache``.
+"""
+
+from __future__ import annotations
+
+import pandas as pd
+
+DATA_PATH = "./data/car_prices.csv"
+
+# columns that get trimmed to their 5th–95th percentiles
+OUTLIER_COLUMNS = ["odometer", "mmr", "sellingprice", "car_age"]
+
+# where those percentiles come from: the whole dataset, or each make (or
+# make x body style) on its own, so cheap and luxury makes keep their range
+TRIM_GROUPS = {
+    "global": (),
+    "make": ("make",),
+    "make_body": ("make", "body"),
+}
+TRIM_LABELS = {
+    "global": "Whole dataset",
+    "make": "Per make",
+    "make_body": "Per make × body style",
+}
+
+
+def read_car_prices(path: str = DATA_PATH) -> pd.DataFrame:
+    df = pd.read_csv(path)
+    df.columns = [c.strip() for c in df.columns]
+    return df
+
+
+def clean_body(body: pd.Series) -> pd.Series:
+    return body.astype(str).str.strip().str.title()
+
+
+def trim_outliers(df: pd.DataFrame, trim: str = "global") -> pd.DataFrame:
+    """Drop rows outside the 5th–95th percentiles of ``OUTLIER_COLUMNS``.
+
+    ``global`` trims one column after the other over the whole frame. The
+    grouped modes get every group's bounds for every column from a single
+    grouped quantile and filter once.
+    """
+    groups = TRIM_GROUPS[trim]
+    if not groups:
+        for col in OUTLIER_COLUMNS:
+            low, high = df[col].quantile([0.05, 0.95])
+            df = df[(df[col] >= low) & (df[col] <= high)]
+        return df
+
+    keys = [clean_body(df[g]) if g == "body" else df[g] for g in groups]
+    grouped = df[OUTLIER_COLUMNS].groupby(keys, dropna=False)
+    # rows come out group by group, low then high within each group
+    bounds = grouped.quantile([0.05, 0.95]).to_numpy().reshape(-1, 2, len(OUTLIER_COLUMNS))
+    codes = grouped.ngroup().to_numpy()
+
+    values = df[OUTLIER_COLUMNS].to_numpy(dtype=float)
+    keep = (values >= bounds[codes, 0]) & (values <= bounds[codes, 1])
+    return df[keep.all(axis=1)]
+
+
+def prepare_car_prices(df: pd.DataFrame) -> pd.DataFrame:
+    """Parse dates, add ``sale_year``/``car_age`` and drop impossible ages.
+
+    ``saledate`` is converted in place, so pass a fresh frame (or a copy).
+    """
+    # need UTC so that pandas datetime funcs work
+    df["saledate"] = pd.to_datetime(df["saledate"], errors="coerce", utc=True)
+
+    # engineered features
+    df["sale_year"] = df["saledate"].dt.year
+    df["car_age"] = df["sale_year"] - df["year"]
+
+    # get rid of ages that don't make sense
+    return df[(df["car_age"] >= 0) & (df["car_age"] <= 60)]
+
+
+def clean_car_prices(df: pd.DataFrame, trim: str = "global") -> pd.DataFrame:
+    """``prepare_car_prices`` and then drop outliers.
+
+    ``trim`` picks where the outlier percentiles come from (``TRIM_GROUPS``).
+    """
+    df = prepare_car_prices(df)
+
+    # take out outliers using 5th–95th percentiles
+    df = trim_outliers(df, trim)
+
+    df_clean = df.copy()
+    return df_clean
+
+
+def load_clean_car_prices(
+    path: str = DATA_PATH, engine: str = "pandas", trim: str = "global"
+) -> pd.DataFrame:
+    """Read and clean ``path`` with the ``pandas`` or the lazy ``polars`` engine.
+
+    Both give the same rows; the polars engine only keeps the columns the
+    pages use (see ``utils.car_data_polars``).
+    """
+    if engine == "polars":
+        from utils.car_data_polars import clean_car_prices_polars
+
+        return clean_car_prices_polars(path, trim=trim)
+    return clean_car_prices(read_car_prices(path), trim)
+
+
+def add_dashboard_columns(df_clean: pd.DataFrame) -> pd.DataFrame:
+    """Extra engineered columns the dashboard filters and groups on."""
+    df = df_clean.copy()
+    df["price_diff"] = df["sellingprice"] - df["mmr"]
+    df["body_clean"] = clean_body(df["body"])
+    df["sale_year"] = df["sale_year"].astype("Int64")
+    return df
@@ -0,0 +1,172 @@
+"""The cleaning pipeline of ``utils.car_data`` as a lazy Polars query.
+
+``scan_clean_car_prices`` builds one query plan: scan the CSV, keep only the
+columns the pages read, parse the sale dates, derive ``sale_year`` and
+``car_age`` and apply the age and percentile filters. Polars runs it
+multi-threaded and only materialises the rows that survive.
+``clean_car_prices_polars`` collects it into a pandas frame with the same
+rows, index, values and dtypes as ``clean_car_prices(read_car_prices(path))``
+has for those columns; ``scripts/check_clean_engines.py`` checks that.
+
+Polars is optional (``pip install polars``); the pages use this engine when
+``PORTFOLIO_CLEAN_ENGINE=polars``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import pandas as pd
+import polars as pl
+
+from utils.car_data import DATA_PATH, OUTLIER_COLUMNS, TRIM_GROUPS
+
+# everything the Explorer, the Dashboard and the artifact build read
+PAGE_COLUMNS = [
+    "year", "make", "model", "body", "state", "condition",
+    "odometer", "mmr", "sellingprice", "saledate",
+]
+
+# pandas.read_csv's default NA markers, so strings turn into nulls the same way
+PANDAS_NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None",
+    "n/a", "nan", "null",
+]
+
+# pin the numeric columns instead of trusting schema inference on a sample
+SCHEMA = {
+    "year": pl.Int64,
+    "condition": pl.Float64,
+    "odometer": pl.Float64,
+    "mmr": pl.Float64,
+    "sellingprice": pl.Float64,
+}
+
+# "Tue Dec 16 2014 12:30:00 GMT-0800 (PST)"
+SALEDATE_PATTERN = (
+    r"^\w{3} (?<local>\w{3} \d{1,2} \d{4} \d{2}:\d{2}:\d{2}) "
+    r"GMT(?<sign>[+-])(?<hours>\d{2})(?<minutes>\d{2})"
+)
+
+
+def _pandas_fallback(both: pl.Series) -> pl.Series:
+    # only the strings the fast path couldn't read go through pandas
+    raw, fast = both.struct.field("raw"), both.struct.field("fast")
+    leftover = fast.is_null() & raw.is_not_null()
+    if not leftover.any():
+        return fast
+    # pandas guesses one format from the column's first value. It can't for
+    # these strings, so it parses every value on its own; do the same here
+    # rather than let it guess from the first leftover
+    mixed = fast.filter(raw.is_not_null()).head(1).is_not_null().all()
+    parsed = pd.to_datetime(
+        raw.filter(leftover).to_pandas(),
+        errors="coerce",
+        utc=True,
+        format="mixed" if mixed else None,
+    )
+    return fast.scatter(leftover.arg_true(), pl.from_pandas(parsed.dt.as_unit("us")))
+
+
+def saledate_expr(column: str = "saledate") -> pl.Expr:
+    """``column`` parsed to UTC timestamps exactly the way pandas parses it.
+
+    pandas can't infer a format for these strings and hands them to
+    dateutil, which reads ``GMT-0800`` POSIX-style, i.e. as eight hours
+    *ahead* of UTC. The offset is applied with that same flipped sign so
+    ``sale_year`` and the age filter see the values the pandas path sees.
+    """
+    parts = pl.col(column).str.extract_groups(SALEDATE_PATTERN)
+    local = parts.struct.field("local").str.strptime(
+        pl.Datetime("us"), "%b %d %Y %H:%M:%S", strict=False
+    )
+    minutes = (
+        parts.struct.field("hours").cast(pl.Int64) * 60
+        + parts.struct.field("minutes").cast(pl.Int64)
+    )
+    minutes = pl.when(parts.struct.field("sign") == "-").then(-minutes).otherwise(minutes)
+    fast = (local + pl.duration(minutes=minutes)).dt.replace_time_zone("UTC")
+
+    return pl.struct(raw=pl.col(column), fast=fast).map_batches(
+        _pandas_fallback, return_dtype=pl.Datetime("us", "UTC")
+    ).alias(column)
+
+
+def scan_clean_car_prices(
+    path: str = DATA_PATH,
+    columns: Sequence[str] = PAGE_COLUMNS,
+    trim: str = "global",
+) -> pl.LazyFrame:
+    """The lazy plan; ``index`` carries the CSV row number pandas would use.
+
+    ``unparsed_dates`` is true on every row if any sale date was unreadable.
+    """
+    lf = pl.scan_csv(
+        path,
+        schema_overrides=SCHEMA,
+        null_values=PANDAS_NA_VALUES,
+        infer_schema_length=10_000,
+        row_index_name="index",
+    ).rename(str.strip)
+
+    lf = (
+        lf.select("index", *columns)
+        .with_columns(saledate_expr())
+        # pandas' sale_year turns float if any date failed to parse, even
+        # though those rows are dropped below; carry that along
+        .with_columns(unparsed_dates=pl.col("saledate").is_null().any())
+        .with_columns(sale_year=pl.col("saledate").dt.year())
+        .with_columns(car_age=pl.col("sale_year") - pl.col("year"))
+        .filter(pl.col("car_age").is_between(0, 60))
+    )
+
+    groups = TRIM_GROUPS[trim]
+    if not groups:
+        # each percentile is taken over the rows left by the previous filter
+        for col in OUTLIER_COLUMNS:
+            lf = lf.filter(
+                pl.col(col).is_between(
+                    pl.col(col).quantile(0.05, "linear"),
+                    pl.col(col).quantile(0.95, "linear"),
+                )
+            )
+        return lf
+
+    # per-group bounds for every column, applied in one filter
+    keys = [
+        pl.col(g).str.strip_chars().str.to_titlecase() if g == "body" else pl.col(g)
+        for g in groups
+    ]
+    return lf.filter(
+        pl.all_horizontal(
+            pl.col(col).is_between(
+                pl.col(col).quantile(0.05, "linear").over(keys),
+                pl.col(col).quantile(0.95, "linear").over(keys),
+            )
+            for col in OUTLIER_COLUMNS
+        )
+    )
+
+
+def count_rows(path: str = DATA_PATH) -> int:
+    """Data rows in the CSV, without parsing any of them."""
+    return pl.scan_csv(path, infer_schema=False).select(pl.len()).collect().item()
+
+
+def clean_car_prices_polars(
+    path: str = DATA_PATH,
+    columns: Sequence[str] = PAGE_COLUMNS,
+    trim: str = "global",
+) -> pd.DataFrame:
+    """Run the lazy plan and hand the result back as a pandas frame."""
+    df = scan_clean_car_prices(path, columns, trim).collect().to_pandas()
+    df = df.set_index(df.pop("index").astype("int64").rename(None))
+    if df.pop("unparsed_dates").any():
+        # pandas derived these from a column with NaT in it
+        df = df.astype({"sale_year": "float64", "car_age": "float64"})
+
+    for col, dtype in df.dtypes.items():
+        if dtype == object:
+            df[col] = df[col].astype("str")
+    return df
@@ -0,0 +1,433 @@
+"""Aggregations behind the Explorer and Dashboard charts.
+
+Each function takes the cleaned frame (or the dashboard's filtered one) and
+returns the small table a chart is drawn from, so the same numbers can be
+benchmarked, precomputed or served from another backend.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+import pandas as pd
+
+# the dashboard's price slider moves in steps of this many dollars
+PRICE_STEP = 500
+
+AGE_BINS = [0, 3, 5, 7, 100]
+AGE_LABELS = ["<3 yrs", "3–5 yrs", "5–7 yrs", "7+ yrs"]
+
+
+def top_values(series: pd.Series, n: int) -> pd.Index:
+    """The ``n`` most common values, ties by name.
+
+    Categories nobody has don't count, so a categorical column ranks the
+    same as the plain strings it was made from.
+    """
+    counts = series.value_counts().sort_index()
+    counts = counts[counts > 0]
+    return counts.sort_values(ascending=False, kind="stable").head(n).index
+
+
+#####################################################################
+# Explorer
+#####################################################################
+def make_vs_mmr(df_clean: pd.DataFrame, min_sales: int = 300) -> pd.DataFrame:
+    """Average/median selling price minus MMR per make."""
+    # keep rows with valid MMR
+    df_m = df_clean.loc[df_clean["mmr"] > 0, ["make", "sellingprice", "mmr"]]
+    price_diff = (df_m["sellingprice"] - df_m["mmr"]).rename("price_diff")
+
+    make_stats = (
+        price_diff.groupby(df_m["make"], observed=True)
+        .agg(avg_diff="mean", med_diff="median", n="size")
+        .reset_index()
+    )
+
+    # leave out the super unpopular ones
+    make_stats = make_stats[make_stats["n"] >= min_sales]
+
+    # sort from most underpriced to most overpriced
+    return make_stats.sort_values("avg_diff")
+
+
+def state_summary(df_clean: pd.DataFrame) -> pd.DataFrame:
+    """Average price, sales count and average age per (upper-cased) state."""
+    state_upper = df_clean["state"].astype(str).str.upper().str.strip()
+    return (
+        df_clean.groupby(state_upper.rename("state_upper"))
+        .agg(
+            avg_price=("sellingprice", "mean"),
+            n_sales=("sellingprice", "size"),
+            avg_age=("car_age", "mean"),
+        )
+        .reset_index()
+    )
+
+
+def odometer_medians(
+    df_clean: pd.DataFrame, top_n: int = 20, n_bins: int = 10
+) -> pd.DataFrame:
+    """Median selling price per odometer band for the ``top_n`` makes.
+
+    Returns ``make, odo_bin, sellingprice`` rows, makes in popularity order
+    and ``odo_bin`` holding the band midpoint.
+    """
+    top_makes = top_values(df_clean["make"], top_n)
+
+    # define odometer bins
+    odo_bins = np.linspace(
+        df_clean["odometer"].min(), df_clean["odometer"].max(), n_bins + 1
+    )
+    odo_midpoints = (odo_bins[:-1] + odo_bins[1:]) / 2
+
+    tmp = df_clean.loc[
+        df_clean["make"].isin(top_makes), ["make", "odometer", "sellingprice"]
+    ]
+    odo_bin = pd.cut(
+        tmp["odometer"],
+        bins=odo_bins,
+        labels=odo_midpoints,
+        include_lowest=True,
+    )
+
+    grouped = (
+        tmp.groupby([tmp["make"], odo_bin], observed=True)["sellingprice"]
+        .median()
+        .reset_index()
+        .dropna()
+    )
+    grouped["odo_bin"] = grouped["odometer"].astype(float)
+    grouped = grouped.drop(columns="odometer")
+
+    # keep the makes in popularity order, like the traces in the chart
+    rank = grouped["make"].map({make: i for i, make in enumerate(top_makes)})
+    return (
+        grouped.assign(rank=rank)
+        .sort_values(["rank", "odo_bin"])
+        .reset_index(drop=True)[["make", "odo_bin", "sellingprice"]]
+    )
+
+
+def age_band_shares(
+    df_clean: pd.DataFrame, top_n: int = 15
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Share of each make's sales per age band, for the ``top_n`` makes.
+
+    Returns the long ``make, age_band, count, total, share`` table and the
+    make x age band matrix of shares the heatmap draws.
+    """
+    top_makes = top_values(df_clean["make"], top_n)
+    df_hm = df_clean.loc[df_clean["make"].isin(top_makes), ["make", "car_age"]]
+
+    df_hm["age_band"] = pd.cut(
+        df_hm["car_age"],
+        bins=AGE_BINS,
+        labels=AGE_LABELS,
+        right=False,
+        include_lowest=True,
+    )
+
+    # Count cars by (make, age_band); bands a make never sold in count as 0
+    cells = pd.MultiIndex.from_product(
+        [sorted(top_makes), pd.CategoricalIndex(AGE_LABELS, categories=AGE_LABELS, ordered=True)],
+        names=["make", "age_band"],
+    )
+    agg = (
+        df_hm.groupby(["make", "age_band"], observed=True)
+        .size()
+        .reindex(cells, fill_value=0)
+        .reset_index(name="count")
+    )
+
+    # Compute within-make share
+    agg["total"] = agg.groupby("make", observed=True)["count"].transform("sum")
+    agg["share"] = agg["count"] / agg["total"]
+
+    return agg, age_band_matrix(agg)
+
+
+def age_band_matrix(agg: pd.DataFrame) -> pd.DataFrame:
+    """Pivot to matrix form: rows = makes, cols = age bands, values = share."""
+    return agg.pivot(index="make", columns="age_band", values="share")
+
+
+#####################################################################
+# Dashboard
+#####################################################################
+def filter_mask(
+    df: pd.DataFrame,
+    makes: Sequence[str] | None,
+    bodies: Sequence[str] | None,
+    price_range: tuple[float, float],
+) -> np.ndarray:
+    """Boolean mask of the rows matching the dashboard's sidebar filters.
+
+    Empty ``makes``/``bodies`` selections mean "don't filter on it".
+    """
+    mask = df["sellingprice"].between(price_range[0], price_range[1]).to_numpy()
+    if makes:
+        mask = mask & df["make"].isin(makes).to_numpy()
+    if bodies:
+        mask = mask & df["body_clean"].isin(bodies).to_numpy()
+    return mask
+
+
+def filter_sales(
+    df: pd.DataFrame,
+    makes: Sequence[str] | None,
+    bodies: Sequence[str] | None,
+    price_range: tuple[float, float],
+) -> pd.DataFrame:
+    return df[filter_mask(df, makes, bodies, price_range)]
+
+
+def sales_kpis(df_filtered: pd.DataFrame) -> dict[str, float]:
+    return {
+        "total_sales": int(df_filtered.shape[0]),
+        "avg_diff": df_filtered["price_diff"].mean(),
+        "median_diff": df_filtered["price_diff"].median(),
+        "median_odometer": df_filtered["odometer"].median(),
+        "median_age": df_filtered["car_age"].median(),
+    }
+
+
+def make_price_stats(
+    df_filtered: pd.DataFrame, min_sales: int = 100, top_n: int = 15
+) -> pd.DataFrame:
+    """Average price and price vs MMR for the priciest common makes."""
+    make_stats = (
+        df_filtered.groupby("make", as_index=False, observed=True)
+        .agg(
+            avg_price=("sellingprice", "mean"),
+            avg_diff=("price_diff", "mean"),
+            n=("sellingprice", "size"),
+        )
+        .sort_values("avg_price", ascending=False)
+    )
+
+    # keep reasonably common makes
+    return make_stats[make_stats["n"] >= min_sales].head(top_n)
+
+
+def model_price_stats(
+    df_filtered: pd.DataFrame, make: str, min_sales: int = 30
+) -> pd.DataFrame:
+    """Average price and price vs MMR per model of one make."""
+    df_make = df_filtered[df_filtered["make"] == make]
+
+    model_stats = (
+        df_make.groupby("model", as_index=False, observed=True)
+        .agg(
+            avg_price=("sellingprice", "mean"),
+            avg_diff=("price_diff", "mean"),
+            n=("sellingprice", "size"),
+        )
+    )
+
+    # keep reasonably common models
+    return (
+        model_stats[model_stats["n"] >= min_sales]
+        .sort_values("avg_price", ascending=False)
+    )
+
+
+def make_body_price_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """Sales count and price sums per make x body x price-slider step.
+
+    Buckets start at the lowest price and are ``PRICE_STEP`` wide, so every
+    position of the dashboard's lower price handle falls on a bucket edge.
+    """
+    price_min = df["sellingprice"].min()
+    bucket = price_min + (df["sellingprice"] - price_min) // PRICE_STEP * PRICE_STEP
+    return (
+        df.groupby(
+            ["make", "body_clean", bucket.rename("price_bucket")], dropna=False, observed=True
+        )
+        .agg(
+            n=("sellingprice", "size"),
+            sum_price=("sellingprice", "sum"),
+            sum_diff=("price_diff", "sum"),
+        )
+        .reset_index()
+    )
+
+
+def make_price_stats_from_cube(
+    cube: pd.DataFrame,
+    makes: Sequence[str] | None,
+    bodies: Sequence[str] | None,
+    price_low: float,
+    min_sales: int = 100,
+    top_n: int = 15,
+) -> pd.DataFrame:
+    """``make_price_stats`` answered from the cube instead of raw rows.
+
+    Only exact while the upper price handle sits at the maximum price, since
+    buckets can't be split at an arbitrary upper bound.
+    """
+    keep = cube["price_bucket"] >= price_low
+    if makes:
+        keep &= cube["make"].isin(makes)
+    if bodies:
+        keep &= cube["body_clean"].isin(bodies)
+
+    sums = (
+        cube[keep]
+        .groupby("make", as_index=False, observed=True)[["n", "sum_price", "sum_diff"]]
+        .sum()
+    )
+    make_stats = pd.DataFrame({
+        "make": sums["make"],
+        "avg_price": sums["sum_price"] / sums["n"],
+        "avg_diff": sums["sum_diff"] / sums["n"],
+        "n": sums["n"],
+    }).sort_values("avg_price", ascending=False)
+
+    # keep reasonably common makes
+    return make_stats[make_stats["n"] >= min_sales].head(top_n)
+
+
+#####################################################################
+# Sales over time
+#####################################################################
+# pandas period codes for the time chart's granularity picker
+TIME_GRAINS = {"Day": "D", "Week": "W", "Month": "M"}
+
+
+def daily_rollup(df: pd.DataFrame, price_min: float | None = None) -> pd.DataFrame:
+    """Sales per day x make x body x price-slider step.
+
+    The same buckets as ``make_body_price_cube`` plus the sale day. Counts
+    and sums add up across rows, so any coarser grain or filter is a
+    group-by over this table, and the per-bucket counts double as a price
+    histogram that medians can be read from. Buckets start at ``price_min``
+    (default: the lowest price in ``df``), so a rollup of filtered rows can
+    keep the buckets of the whole table.
+    """
+    dated = df[df["saledate"].notna()]
+    day = dated["saledate"].dt.tz_convert(None).dt.floor("D").rename("day")
+    if price_min is None:
+        price_min = df["sellingprice"].min()
+    bucket = price_min + (dated["sellingprice"] - price_min) // PRICE_STEP * PRICE_STEP
+    return (
+        dated.groupby(
+            [day, "make", "body_clean", bucket.rename("price_bucket")],
+            dropna=False,
+            observed=True,
+        )
+        .agg(
+            n=("sellingprice", "size"),
+            sum_price=("sellingprice", "sum"),
+            sum_diff=("price_diff", "sum"),
+        )
+        .reset_index()
+    )
+
+
+def sales_over_time(
+    rollup: pd.DataFrame,
+    makes: Sequence[str] | None,
+    bodies: Sequence[str] | None,
+    price_range: tuple[float, float],
+    price_max: float,
+    grain: str = "Week",
+) -> pd.DataFrame:
+    """Volume, median price and average vs MMR per period, from the rollup.
+
+    ``grain`` is a key of ``TIME_GRAINS``. Buckets are kept when they lie
+    inside the price range, so a sale priced exactly on the upper handle is
+    left out unless that handle is at ``price_max``: the volumes only match
+    the filtered rows while it is. Otherwise pass a rollup of the filtered
+    rows (``daily_rollup`` of them) and no filters. Medians are
+    interpolated within the ``PRICE_STEP``-wide buckets.
+    """
+    keep = rollup["price_bucket"] >= price_range[0]
+    if price_range[1] < price_max:
+        keep &= rollup["price_bucket"] + PRICE_STEP <= price_range[1]
+    if makes:
+        keep &= rollup["make"].isin(makes)
+    if bodies:
+        keep &= rollup["body_clean"].isin(bodies)
+    rows = rollup[keep]
+
+    period = rows["day"].dt.to_period(TIME_GRAINS[grain]).dt.start_time.rename("period")
+    totals = rows.groupby(period)[["n", "sum_price", "sum_diff"]].sum()
+
+    # median from the merged price histogram of each period
+    hist = rows.groupby([period, "price_bucket"])["n"].sum().reset_index()
+    upto = hist.groupby("period")["n"].cumsum()
+    half = hist.groupby("period")["n"].transform("sum") / 2
+    before = upto - hist["n"]
+    hit = hist[(before < half) & (upto >= half)]
+    median = (
+        hit["price_bucket"] + (half[hit.index] - before[hit.index]) / hit["n"] * PRICE_STEP
+    )
+    median = median.groupby(hit["period"]).first()
+
+    return pd.DataFrame({
+        "period": totals.index,
+        "n": totals["n"].to_numpy(),
+        "median_price": median.reindex(totals.index).to_numpy(),
+        "avg_diff": (totals["sum_diff"] / totals["n"]).to_numpy(),
+    })
+
+
+def body_vs_mmr(df_filtered: pd.DataFrame, min_sales: int = 500) -> pd.DataFrame:
+    """Average/median price minus MMR per body style, most underpriced first."""
+    body_stats = (
+        df_filtered.groupby("body_clean", as_index=False, observed=True)
+        .agg(
+            avg_diff=("price_diff", "mean"),
+            median_diff=("price_diff", "median"),
+            n=("price_diff", "size"),
+        )
+    )
+
+    # keep common body styles
+    return body_stats[body_stats["n"] >= min_sales].sort_values("avg_diff")
+
+
+def narrative_stats(df_filtered: pd.DataFrame) -> dict:
+    """Numbers quoted in the dashboard's buyers/sellers bullets."""
+    avg_diff = df_filtered["price_diff"].mean()
+    median_diff = df_filtered["price_diff"].median()
+
+    # by-make stats (used mainly for the buyer side)
+    make_diff = (
+        df_filtered.groupby("make", as_index=False, observed=True)
+        .agg(avg_diff=("price_diff", "mean"), n=("price_diff", "size"))
+    )
+    make_diff = make_diff[make_diff["n"] >= 100]
+
+    if not make_diff.empty:
+        cheapest_row = make_diff.sort_values("avg_diff").iloc[0]
+        cheapest_make = cheapest_row["make"]
+        cheapest_make_diff = cheapest_row["avg_diff"]
+    else:
+        cheapest_make = "some makes"
+        cheapest_make_diff = median_diff
+
+    # by-body stats (used mainly for the seller side and to tie to the body chart)
+    body_diff = (
+        df_filtered.groupby("body_clean", as_index=False, observed=True)
+        .agg(avg_diff=("price_diff", "mean"), n=("price_diff", "size"))
+    )
+    body_diff = body_diff[body_diff["n"] >= 500]
+
+    if not body_diff.empty:
+        strongest_body_row = body_diff.sort_values("avg_diff").iloc[-1]
+        strongest_body = strongest_body_row["body_clean"]
+        strongest_body_diff = strongest_body_row["avg_diff"]
+    else:
+        strongest_body = "some body styles"
+        strongest_body_diff = median_diff
+
+    return {
+        "avg_diff": avg_diff,
+        "cheapest_make": cheapest_make,
+        "cheapest_make_diff": cheapest_make_diff,
+        "strongest_body": strongest_body,
+        "strongest_body_diff": strongest_body_diff,
+    }
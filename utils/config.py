@@ -0,0 +1,54 @@
+"""Deployment switches, read from environment variables.
+
+``PORTFOLIO_DATA_BACKEND``
+    ``pandas`` (default) filters and aggregates the Dashboard in memory;
+    ``duckdb`` pushes the same queries down to an embedded DuckDB engine
+    over the artifact Parquet file (needs ``pip install duckdb``).
+``PORTFOLIO_CLEAN_ENGINE``
+    ``pandas`` (default) cleans the CSV eagerly; ``polars`` runs the same
+    pipeline as a lazy, multi-threaded Polars query that only reads the
+    columns the pages use (needs ``pip install polars``).
+``PORTFOLIO_ARTIFACTS``
+    Where ``scripts/build_artifacts.py`` writes and the pages look for
+    prebuilt artifacts (default ``./artifacts``).
+``PORTFOLIO_CACHE_TTL``
+    Seconds a cached dataset or aggregate is kept before it is recomputed
+    (default 21600, six hours; ``0`` keeps them until the process exits).
+``PORTFOLIO_CACHE_WARM``
+    ``1`` (default) loads the dataset and the expensive aggregates on a
+    background thread as soon as the server runs its first page; ``0``
+    leaves them to the first visitor that needs them.
+``PORTFOLIO_PREFETCH_CPU``
+    Share of one CPU core the Dashboard may spend precomputing the model
+    charts a visitor is likely to open next (default ``0.5``; ``0`` turns
+    prefetching off).
+``PORTFOLIO_KPI_BUDGET_MS``
+    How long the Dashboard's exact KPIs may take before a visitor first
+    sees them estimated from a sample, with 95% intervals, and then exact
+    once they're computed (default ``150``; ``0`` always estimates first).
+``PORTFOLIO_EXPORT_MAX_MB``
+    Largest file the Dashboard's download button will build (default
+    ``100``). Streamlit holds a download in memory until the visitor has it,
+    so bigger selections have to be narrowed first.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+DATA_BACKEND = os.environ.get("PORTFOLIO_DATA_BACKEND", "pandas").lower()
+
+CLEAN_ENGINE = os.environ.get("PORTFOLIO_CLEAN_ENGINE", "pandas").lower()
+
+ARTIFACT_ROOT = Path(os.environ.get("PORTFOLIO_ARTIFACTS", "./artifacts"))
+
+CACHE_TTL = float(os.environ.get("PORTFOLIO_CACHE_TTL", 6 * 60 * 60)) or None
+
+CACHE_WARM = os.environ.get("PORTFOLIO_CACHE_WARM", "1") not in ("0", "false", "no")
+
+PREFETCH_CPU = min(max(float(os.environ.get("PORTFOLIO_PREFETCH_CPU", 0.5)), 0.0), 1.0)
+
+KPI_BUDGET = float(os.environ.get("PORTFOLIO_KPI_BUDGET_MS", 150)) / 1000
+
+EXPORT_MAX_BYTES = int(float(os.environ.get("PORTFOLIO_EXPORT_MAX_MB", 100)) * 2**20)
@@ -0,0 +1,189 @@
+"""The cached loaders the pages share, and what gets warmed at start.
+
+Every loader here goes through ``utils.cache_manager``, so each one has a
+TTL (``PORTFOLIO_CACHE_TTL``) and an entry limit and shows up in the timing
+panel's cache table. ``start_warming()`` loads what the pages open with on
+a background thread the first time any page runs in a process: the
+artifact tables when there's a build, otherwise the cleaned CSV and the
+aggregates computed from it.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from functools import partial
+
+import pandas as pd
+
+from utils import car_stats
+from utils.artifacts import latest_build, read_json, read_table
+from utils.backends import DuckDBBackend, PandasBackend, SalesFilters, connect_duckdb
+from utils.cache_manager import managed_cache
+from utils.cache_manager import start_warming as _start_warming
+from utils.car_data import (
+    DATA_PATH,
+    TRIM_LABELS,
+    add_dashboard_columns,
+    load_clean_car_prices,
+)
+from utils.config import CACHE_TTL, CACHE_WARM, CLEAN_ENGINE, DATA_BACKEND
+from utils.export import estimate_size, first
+from utils.friends import FRIENDSHIPS
+from utils.kpi_estimates import SAMPLE_ROWS
+from utils.price_model import PriceModel
+from utils.shared_columns import attach_columns
+
+# what the Explorer computes from the clean rows when there's no build;
+# the same defaults scripts/build_artifacts.py uses
+CAR_TABLES = {
+    "make_vs_mmr": car_stats.make_vs_mmr,
+    "state_summary": car_stats.state_summary,
+    "odometer_medians": car_stats.odometer_medians,
+    "age_band_shares": lambda df: car_stats.age_band_shares(df)[0],
+}
+
+N_TRIMS = len(TRIM_LABELS)
+
+
+#####################################################################
+# Car data
+#####################################################################
+@managed_cache("clean_data", ttl=CACHE_TTL, max_entries=N_TRIMS)
+def load_clean_data(
+    path: str = DATA_PATH, engine: str = CLEAN_ENGINE, trim: str = "global"
+) -> pd.DataFrame:
+    return load_clean_car_prices(path, engine, trim)
+
+
+@managed_cache("dashboard_data", ttl=CACHE_TTL, max_entries=N_TRIMS)
+def load_dashboard_data(trim: str = "global") -> pd.DataFrame:
+    # the clean rows plus the dashboard's extra engineered columns
+    return add_dashboard_columns(load_clean_data(trim=trim))
+
+
+# one read-only frame per process over the build's memory-mapped columns;
+# the pages share it as is, so nothing may write into it
+@managed_cache("shared_frames", ttl=CACHE_TTL, max_entries=2, kind="resource")
+def attach_clean_frame(path: str) -> pd.DataFrame:
+    return attach_columns(path)
+
+
+@managed_cache("car_tables", ttl=CACHE_TTL, max_entries=len(CAR_TABLES) * N_TRIMS)
+def car_table(name: str, trim: str = "global") -> pd.DataFrame:
+    return CAR_TABLES[name](load_clean_data(trim=trim))
+
+
+# one connection per process; every session gets its own cursor on it
+@managed_cache("duckdb", ttl=CACHE_TTL, max_entries=N_TRIMS, kind="resource")
+def duckdb_connection(parquet_path: str | None, trim: str):
+    return connect_duckdb(parquet_path or load_dashboard_data(trim))
+
+
+# the Sales Over Time rollup when there's no build to read it from;
+# ``source`` names the data ``_backend`` reads, as the Dashboard builds it
+@managed_cache("daily_rollup", ttl=CACHE_TTL, max_entries=2 * N_TRIMS)
+def load_daily_rollup(source: tuple, _backend) -> pd.DataFrame:
+    return _backend.daily_rollup()
+
+
+# the same over the filtered rows, for when the upper price handle splits a
+# bucket of the full rollup
+@managed_cache("filtered_rollups", ttl=CACHE_TTL, max_entries=16)
+def load_filtered_rollup(source: tuple, filters: SalesFilters, _backend) -> pd.DataFrame:
+    return _backend.daily_rollup(filters)
+
+
+# the drill-down's per-model table, which the Dashboard also prefetches for
+# the likeliest makes; ``source`` names the data ``_backend`` reads
+@managed_cache("model_stats", ttl=CACHE_TTL, max_entries=256)
+def load_model_stats(
+    source: tuple, filters: SalesFilters, make: str, _backend
+) -> pd.DataFrame:
+    return _backend.model_price_stats(filters, make)
+
+
+# what the Dashboard estimates KPIs from when there's no build to read it from
+@managed_cache("kpi_sample", ttl=CACHE_TTL, max_entries=2 * N_TRIMS)
+def load_kpi_sample(source: tuple, _backend) -> pd.DataFrame:
+    return _backend.kpi_sample(SAMPLE_ROWS)
+
+
+# the Dashboard's "about this big" line under the download button, which
+# otherwise encodes a sample chunk on every rerun
+@managed_cache("export_estimates", ttl=CACHE_TTL, max_entries=64)
+def load_export_estimate(
+    source: tuple, filters: SalesFilters, fmt: str, rows: int, _backend
+) -> int | None:
+    return estimate_size(first(_backend.export_chunks(filters, chunk_rows=2_000)), rows, fmt)
+
+
+# one copy per process, it's read-only after loading
+@managed_cache("price_model", ttl=CACHE_TTL, max_entries=2, kind="resource")
+def load_price_model(path: str) -> PriceModel:
+    return PriceModel.load(path)
+
+
+#####################################################################
+# Warm-up
+#####################################################################
+def daily_rollup_source() -> tuple:
+    # the same source the Dashboard names its data by, with no build
+    if DATA_BACKEND == "duckdb":
+        return (DuckDBBackend.name, "global", None, duckdb_connection.refreshed_at(None, "global"))
+    return (PandasBackend.name, "global", None, load_dashboard_data.refreshed_at("global"))
+
+
+def warm_daily_rollup(source: tuple) -> None:
+    if DATA_BACKEND == "duckdb":
+        backend = DuckDBBackend(duckdb_connection(None, "global"))
+    else:
+        backend = PandasBackend(load_dashboard_data("global"))
+    load_daily_rollup(source, backend)
+
+
+def warm_network_layout() -> None:
+    # imported here so only the Network page and this thread load networkx
+    from utils.graph_render import spring_positions
+
+    spring_positions(tuple(FRIENDSHIPS))
+
+
+def warm_jobs() -> Iterator[tuple[str, object]]:
+    """What a fresh process should load before anyone asks for it."""
+    build = latest_build()
+
+    if build is None:
+        yield "clean data", load_clean_data
+        yield "dashboard data", load_dashboard_data
+        for name in CAR_TABLES:
+            yield name, partial(car_table, name)
+        if DATA_BACKEND == "duckdb":
+            yield "duckdb", partial(duckdb_connection, None, "global")
+        # named by its source, so it runs again once the data is reloaded
+        yield "daily rollup", partial(warm_daily_rollup, daily_rollup_source())
+        yield "network layout", warm_network_layout
+        return
+
+    for name, filename in build.manifest.get("files", {}).items():
+        path = build.file(name)
+        if path is None:
+            continue
+        if name == "clean_columns":
+            yield name, partial(attach_clean_frame, str(path))
+        elif name == "clean" and build.file("clean_columns") is not None:
+            continue  # the pages read the shared columns instead
+        elif filename.endswith(".parquet"):
+            yield name, partial(read_table, str(path))
+        elif filename.endswith(".json"):
+            yield name, partial(read_json, str(path))
+    model_path = build.file("price_model")
+    if model_path is not None:
+        yield "price model", partial(load_price_model, str(model_path))
+    if DATA_BACKEND == "duckdb" and build.file("clean") is not None:
+        yield "duckdb", partial(duckdb_connection, str(build.file("clean")), "global")
+
+
+def start_warming() -> None:
+    """Warm the caches in the background, once per process (unless disabled)."""
+    if CACHE_WARM:
+        _start_warming(warm_jobs)
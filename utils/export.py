@@ -0,0 +1,127 @@
+"""Chunked export of the Dashboard's filtered rows.
+
+A backend hands out the filtered rows as an iterator of modest DataFrame
+chunks (``export_chunks``); the writers here encode one chunk at a time
+into a binary file, so encoding never holds more than about one chunk.
+Parquet chunks become row groups of a single file.
+
+Streamlit keeps a download's bytes in memory until the browser fetches
+them, so ``export_file`` refuses to build anything over
+``PORTFOLIO_EXPORT_MAX_MB``; the page checks the estimated size first and
+asks for narrower filters instead of offering the button.
+"""
+
+from __future__ import annotations
+
+import tempfile
+from collections.abc import Iterable, Iterator
+from typing import BinaryIO
+
+import pandas as pd
+
+from utils.config import EXPORT_MAX_BYTES
+
+CHUNK_ROWS = 50_000
+
+# label -> (file extension, mime type)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+
+def write_csv(chunks: Iterable[pd.DataFrame], sink: BinaryIO) -> int:
+    rows = 0
+    for i, chunk in enumerate(chunks):
+        sink.write(chunk.to_csv(index=False, header=i == 0).encode())
+        rows += len(chunk)
+    return rows
+
+
+def write_parquet(chunks: Iterable[pd.DataFrame], sink: BinaryIO) -> int:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows = 0
+    writer = None
+    try:
+        for chunk in chunks:
+            if writer is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                writer = pq.ParquetWriter(sink, table.schema)
+            else:
+                table = pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False)
+            writer.write_table(table)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+WRITERS = {"CSV": write_csv, "Parquet": write_parquet}
+
+
+class ExportTooLarge(ValueError):
+    pass
+
+
+def _check_size(out: BinaryIO, max_bytes: int) -> None:
+    if out.tell() > max_bytes:
+        raise ExportTooLarge(f"the export is over {format_bytes(max_bytes)}; narrow the filters")
+
+
+def _capped(chunks: Iterable[pd.DataFrame], out: BinaryIO, max_bytes: int):
+    # checked before every chunk, so a file overshoots by one chunk at most
+    for chunk in chunks:
+        _check_size(out, max_bytes)
+        yield chunk
+
+
+def export_file(
+    chunks: Iterable[pd.DataFrame], fmt: str, max_bytes: int = EXPORT_MAX_BYTES
+) -> bytes:
+    """The encoded export, built chunk by chunk in a temp file on disk.
+
+    Raises ``ExportTooLarge`` as soon as it grows past ``max_bytes``; the
+    temp file is closed either way.
+    """
+    with tempfile.TemporaryFile() as out:
+        try:
+            WRITERS[fmt](_capped(chunks, out, max_bytes), out)
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+        _check_size(out, max_bytes)
+        out.seek(0)
+        return out.read()
+
+
+def estimate_size(sample: pd.DataFrame, total_rows: int, fmt: str) -> int | None:
+    """Bytes the full export will take, extrapolated from a sample chunk."""
+    if sample.empty:
+        return None
+    with tempfile.TemporaryFile() as out:
+        WRITERS[fmt]([sample], out)
+        return int(out.tell() / len(sample) * total_rows)
+
+
+def first(chunks: Iterator[pd.DataFrame]) -> pd.DataFrame:
+    """The first chunk, closing the rest of the iterator unread."""
+    try:
+        return next(chunks, pd.DataFrame())
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def format_bytes(n: float) -> str:
+    if n < 1024:
+        return f"{n:,.0f} B"
+    for unit in ("KB", "MB"):
+        n /= 1024
+        if n < 1024:
+            return f"{n:,.1f} {unit}"
+    return f"{n / 1024:,.1f} GB"
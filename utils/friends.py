@@ -0,0 +1,20 @@
+"""The friend group drawn on the Network page."""
+
+FRIENDSHIPS = [
+        ('Alice', 'Bob'),
+        ('Alice','Charlie'),
+        ('Bob','Charlie'),
+        ('Charlie','Diana'),
+        ('Diana','Eve'),
+        ('Bob','Diana'),
+        ('Frank','Eve'),
+        ('Eve','Ian'),
+        ('Diana','Ian'),
+        ('Ian','Grace'),
+        ('Grace','Hannah'),
+        ('Hannah','Jack'),
+        ('Grace','Jack'),
+        ('Charlie','Frank'),
+        ('Alice','Eve'),
+        ('Bob','Jack'),
+        ]
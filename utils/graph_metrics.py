@@ -0,0 +1,55 @@
+"""Centrality scores for the network page, in table and leaderboard form."""
+
+from __future__ import annotations
+
+import heapq
+from collections.abc import Hashable, Iterable, Mapping
+from operator import itemgetter
+
+import pandas as pd
+
+
+def top_k(
+    scores: Mapping[Hashable, float], k: int = 5
+) -> list[tuple[Hashable, float]]:
+    """The ``k`` highest ``(node, score)`` pairs, best first.
+
+    Uses a bounded heap, so it's O(n log k) instead of sorting every node.
+    """
+    return heapq.nlargest(k, scores.items(), key=itemgetter(1))
+
+
+def leaders(ranked: list[tuple[Hashable, float]]) -> list[Hashable]:
+    """Nodes tied for first place in a ``top_k`` result."""
+    if not ranked:
+        return []
+    best = ranked[0][1]
+    return [node for node, score in ranked if score == best]
+
+
+def community_index(communities: Iterable[Iterable[Hashable]]) -> dict:
+    """Map each node to the (1-based) number of its community."""
+    return {
+        node: i
+        for i, community in enumerate(communities, 1)
+        for node in community
+    }
+
+
+def centrality_table(
+    metrics: Mapping[str, Mapping[Hashable, float]],
+    communities: Mapping[Hashable, int] | None = None,
+    node_label: str = "Person",
+) -> pd.DataFrame:
+    """One row per node with a column per metric (plus community, if given)."""
+    table = pd.DataFrame(metrics)
+    if communities is not None:
+        table["Community"] = pd.Series(communities, dtype="Int64")
+    table.index.name = node_label
+    return table.reset_index()
+
+
+def page_of(df: pd.DataFrame, page: int, page_size: int) -> pd.DataFrame:
+    """Rows for the 1-based ``page`` of ``df``."""
+    start = (page - 1) * page_size
+    return df.iloc[start:start + page_size]
@@ -0,0 +1,169 @@
+"""Interactive (WebGL) rendering of networkx graphs with plotly.
+
+All nodes go into one ``Scattergl`` trace and all edges into one more, with
+the edge segments separated by NaN so the browser draws them in a single
+batched call. That keeps big graphs (tens of thousands of edges) smooth and
+avoids matplotlib's global figure state entirely.
+
+``spring_positions`` is the Network page's cached layout; it lives here so
+only that page pulls in networkx.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Hashable, Mapping, Sequence
+
+import networkx as nx
+import numpy as np
+import plotly.graph_objects as go
+
+from utils.cache_manager import managed_cache
+
+# above this many nodes the labels turn into noise, so only show them on hover
+MAX_LABELED_NODES = 200
+
+NODE_SIZE_RANGE = (10, 40)
+
+
+def layout_arrays(
+    g: nx.Graph, pos: Mapping[Hashable, Sequence[float]]
+) -> tuple[list[Hashable], np.ndarray]:
+    """Return the node order and an ``(n, 2)`` array of their positions."""
+    nodes = list(g.nodes())
+    xy = np.array([pos[n] for n in nodes], dtype=float).reshape(len(nodes), 2)
+    return nodes, xy
+
+
+def spring_layout(
+    edges: Sequence[tuple[Hashable, Hashable]], seed: int = 42
+) -> dict:
+    """Seeded force-directed layout of the graph made of ``edges``."""
+    g = nx.Graph()
+    g.add_edges_from(edges)
+    pos = nx.spring_layout(g, seed=seed)
+    return {n: [float(x), float(y)] for n, (x, y) in pos.items()}
+
+
+# edits on the Network page make new edge sets, so keep only a few
+@managed_cache("network_layout", max_entries=16)
+def spring_positions(edges: tuple, seed: int = 42) -> dict:
+    # Force-directed layout, seeded so the picture doesn't jump every rerun
+    return spring_layout(edges, seed=seed)
+
+
+def extend_layout(
+    g: nx.Graph,
+    pos: Mapping[Hashable, Sequence[float]],
+    seed: int = 42,
+    jitter: float = 0.08,
+) -> dict:
+    """Positions for every node of ``g``, keeping the ones already in ``pos``.
+
+    Nodes without a position are dropped next to their placed neighbours, so
+    adding an edge doesn't mean re-running the whole force layout.
+    """
+    rng = np.random.default_rng(seed)
+    placed = {n: np.asarray(pos[n], dtype=float) for n in g.nodes() if n in pos}
+
+    for node in g.nodes():
+        if node in placed:
+            continue
+        around = [placed[n] for n in g.neighbors(node) if n in placed]
+        center = np.mean(around, axis=0) if around else np.zeros(2)
+        placed[node] = center + rng.uniform(-jitter, jitter, size=2)
+    return placed
+
+
+def edge_segments(
+    g: nx.Graph, nodes: list[Hashable], xy: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """x/y arrays for every edge as ``start, end, NaN`` triples."""
+    index = {n: i for i, n in enumerate(nodes)}
+    n_edges = g.number_of_edges()
+
+    ends = np.fromiter(
+        (index[n] for edge in g.edges() for n in edge),
+        dtype=np.intp,
+        count=2 * n_edges,
+    ).reshape(n_edges, 2)
+
+    seg = np.full((n_edges, 3, 2), np.nan)
+    seg[:, 0] = xy[ends[:, 0]]
+    seg[:, 1] = xy[ends[:, 1]]
+    return seg[:, :, 0].ravel(), seg[:, :, 1].ravel()
+
+
+def scale_sizes(values: np.ndarray, size_range=NODE_SIZE_RANGE) -> np.ndarray:
+    """Min-max scale ``values`` into marker sizes."""
+    lo, hi = size_range
+    spread = np.ptp(values) if len(values) else 0
+    if not spread:
+        return np.full(len(values), (lo + hi) / 2)
+    return lo + (values - values.min()) / spread * (hi - lo)
+
+
+def network_figure(
+    g: nx.Graph,
+    pos: Mapping[Hashable, Sequence[float]],
+    values: Mapping[Hashable, float] | None = None,
+    metric_name: str = "",
+    colors: Mapping[Hashable, str] | None = None,
+    title: str = "",
+    height: int = 600,
+) -> go.Figure:
+    """Build a WebGL figure of ``g`` laid out at ``pos``.
+
+    ``values`` (e.g. a centrality dict) drives node size and colour. Passing
+    ``colors`` instead gives every node a fixed colour, which is what the
+    community view uses.
+    """
+    nodes, xy = layout_arrays(g, pos)
+    edge_x, edge_y = edge_segments(g, nodes, xy)
+
+    edge_trace = go.Scattergl(
+        x=edge_x,
+        y=edge_y,
+        mode="lines",
+        line=dict(width=1, color="gray"),
+        hoverinfo="skip",
+        showlegend=False,
+    )
+
+    labels = [str(n) for n in nodes]
+    marker = dict(size=18, color="lightgreen", line=dict(width=1, color="black"))
+    hover = "%{text}<extra></extra>"
+
+    if values is not None:
+        scores = np.array([values.get(n, 0.0) for n in nodes], dtype=float)
+        marker.update(
+            size=scale_sizes(scores),
+            color=scores,
+            colorscale="Viridis",
+            showscale=True,
+            colorbar=dict(title=metric_name),
+        )
+        hover = "%{text}<br>" + metric_name + ": %{marker.color:.3f}<extra></extra>"
+    elif colors is not None:
+        marker.update(color=[colors[n] for n in nodes])
+
+    node_trace = go.Scattergl(
+        x=xy[:, 0],
+        y=xy[:, 1],
+        mode="markers+text" if len(nodes) <= MAX_LABELED_NODES else "markers",
+        text=labels,
+        textposition="top center",
+        marker=marker,
+        hovertemplate=hover,
+        showlegend=False,
+    )
+
+    fig = go.Figure([edge_trace, node_trace])
+    fig.update_layout(
+        title=title,
+        height=height,
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False, scaleanchor="x"),
+        plot_bgcolor="white",
+        margin=dict(l=10, r=10, t=50, b=10),
+    )
+    return fig
@@ -0,0 +1,155 @@
+"""Right-sized, modern-format copies of the site's photos.
+
+``scripts/build_assets.py`` resizes every photo in ``assets/`` to a few
+widths and saves each one as AVIF, WebP and JPEG under ``static/``.
+Streamlit serves that folder as plain files at ``app/static/`` when static
+serving is on (``.streamlit/config.toml``). ``show_image`` then draws a
+``<picture>`` that lists them all. The browser downloads just one: the
+smallest that covers the width the photo is drawn at, in the most compact
+format it can decode.
+
+With no build for a photo (or static serving off, or a photo changed since
+the build) it falls back to ``st.image`` with a JPEG that is resized once
+per process and cached. That is never the full-size original.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import html
+import io
+import json
+from pathlib import Path
+
+import streamlit as st
+
+from utils.cache_manager import managed_cache
+from utils.config import CACHE_TTL
+
+ROOT = Path(__file__).resolve().parent.parent
+ASSET_DIR = ROOT / "assets"
+# Streamlit serves the static/ folder next to the main script, Home.py
+STATIC_DIR = ROOT / "static"
+MANIFEST_FILE = "images.json"
+# where Streamlit serves STATIC_DIR from, relative to the page
+STATIC_URL = "app/static"
+
+WIDTHS = (240, 360, 480, 720, 960)
+# most compact first; the browser takes the first type it supports, and
+# the last one is the <img> itself for browsers that know none of them
+FORMATS = {
+    "avif": ("image/avif", "AVIF", {"quality": 55}),
+    "webp": ("image/webp", "WEBP", {"quality": 75, "method": 6}),
+    "jpg": ("image/jpeg", "JPEG", {"quality": 80, "optimize": True, "progressive": True}),
+}
+
+# a one-third column on a wide screen at 2x pixel density
+FALLBACK_WIDTH = 480
+
+
+def file_hash(path: Path) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def build_variants(source: Path, out_dir: Path, widths=WIDTHS) -> dict:
+    """Write the resized copies of ``source`` to ``out_dir``; its manifest entry."""
+    from PIL import Image, ImageOps
+
+    source = Path(source)
+    with Image.open(source) as image:
+        # phones store rotation in EXIF; bake it in before it's stripped
+        image = ImageOps.exif_transpose(image).convert("RGB")
+    sizes = [w for w in widths if w < image.width] or [image.width]
+
+    variants: dict[str, list[dict]] = {fmt: [] for fmt in FORMATS}
+    for width in sizes:
+        height = round(image.height * width / image.width)
+        resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        for fmt, (_, pil_format, options) in FORMATS.items():
+            name = f"{source.stem}-{width}.{fmt}"
+            resized.save(out_dir / name, pil_format, **options)
+            variants[fmt].append({
+                "file": name,
+                "width": width,
+                "height": height,
+                "bytes": (out_dir / name).stat().st_size,
+            })
+
+    return {
+        "source": source.name,
+        "sha256": file_hash(source),
+        "width": image.width,
+        "height": image.height,
+        "variants": variants,
+    }
+
+
+#####################################################################
+# Page side
+#####################################################################
+@managed_cache("image_variants", ttl=CACHE_TTL, max_entries=16)
+def load_variants(name: str) -> dict | None:
+    """The build's entry for photo ``name`` in ``assets/``, if it's current."""
+    manifest_path = STATIC_DIR / MANIFEST_FILE
+    if not manifest_path.exists():
+        return None
+    entry = json.loads(manifest_path.read_text()).get(name)
+    if entry is None or entry["sha256"] != file_hash(ASSET_DIR / name):
+        return None
+    if not all((STATIC_DIR / v["file"]).exists() for vs in entry["variants"].values() for v in vs):
+        return None
+    return entry
+
+
+# decoded and resized once per process, then shared by every session
+@managed_cache("images", ttl=CACHE_TTL, max_entries=8, kind="resource")
+def resized_jpeg(name: str, width: int = FALLBACK_WIDTH) -> bytes:
+    from PIL import Image, ImageOps
+
+    with Image.open(ASSET_DIR / name) as image:
+        image = ImageOps.exif_transpose(image).convert("RGB")
+    if image.width > width:
+        image = image.resize(
+            (width, round(image.height * width / image.width)), Image.Resampling.LANCZOS
+        )
+    out = io.BytesIO()
+    image.save(out, "JPEG", **FORMATS["jpg"][2])
+    return out.getvalue()
+
+
+def picture_html(entry: dict, alt: str, sizes: str, caption: str | None = None) -> str:
+    def srcset(fmt: str) -> str:
+        return ", ".join(
+            f"{STATIC_URL}/{v['file']} {v['width']}w" for v in entry["variants"][fmt]
+        )
+
+    *modern, fallback = FORMATS
+    smallest = entry["variants"][fallback][0]
+    sources = "".join(
+        f'<source type="{FORMATS[fmt][0]}" srcset="{srcset(fmt)}" sizes="{sizes}">'
+        for fmt in modern
+    )
+    img = (
+        f'<img src="{STATIC_URL}/{smallest["file"]}" srcset="{srcset(fallback)}" '
+        f'sizes="{sizes}" width="{smallest["width"]}" height="{smallest["height"]}" '
+        f'alt="{html.escape(alt)}" decoding="async" '
+        'style="width: 100%; height: auto; display: block;">'
+    )
+    figcaption = "" if caption is None else (
+        '<figcaption style="text-align: center; font-size: 0.875rem; opacity: 0.6; '
+        f'margin-top: 0.375rem;">{html.escape(caption)}</figcaption>'
+    )
+    return f'<figure style="margin: 0;"><picture>{sources}{img}</picture>{figcaption}</figure>'
+
+
+def show_image(name: str, caption: str | None = None, sizes: str = "100vw") -> None:
+    """Draw photo ``name`` from ``assets/`` at the width of its column.
+
+    ``sizes`` tells the browser how wide the photo will be drawn, as in
+    HTML, so it can pick a file before the layout is done.
+    """
+    entry = load_variants(name)
+    if entry is not None and st.get_option("server.enableStaticServing"):
+        st.html(picture_html(entry, alt=caption or name, sizes=sizes, caption=caption))
+    else:
+        st.image(resized_jpeg(name), caption=caption, use_container_width=True)
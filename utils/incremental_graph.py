@@ -0,0 +1,270 @@
+"""A graph whose analytics keep up with edge-by-edge edits.
+
+Cheap metrics are kept current on every edit:
+
+* degree centrality is read straight off the node degrees,
+* connected components are merged/split locally around the touched edge,
+* community labels get one label-propagation step at the edge's endpoints.
+
+The expensive ones (betweenness, closeness, eigenvector and a full
+modularity community pass) are recomputed from a snapshot on a background
+thread. Every edit bumps ``version``; a metric is fresh when it was computed
+at the current version.
+
+Nodes are only ever added. As in networkx, removing a node's last edge
+leaves it in the graph, with degree 0 and a component of its own, so a
+friend who lost every link still shows up on the page.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from collections.abc import Hashable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+
+import networkx as nx
+
+from utils.graph_metrics import community_index
+
+FRESH = "fresh"
+LOCAL = "updated locally"
+STALE = "stale"
+RUNNING = "recomputing"
+
+EXPENSIVE_METRICS = ("Betweenness", "Closeness", "Eigenvector")
+
+# one worker for the whole process, so a burst of edits from many sessions
+# can't eat every core
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="graph-refresh")
+
+
+def full_metrics(g: nx.Graph) -> dict[str, dict]:
+    """Every expensive metric plus a modularity community split for ``g``."""
+    from networkx.algorithms.community import greedy_modularity_communities
+
+    if g.number_of_nodes() == 0:
+        return {name: {} for name in EXPENSIVE_METRICS} | {"Communities": {}}
+
+    try:
+        eigenvector = nx.eigenvector_centrality(g, max_iter=1000)
+    except nx.PowerIterationFailedConvergence:
+        eigenvector = {}
+
+    communities = greedy_modularity_communities(g)
+    return {
+        "Betweenness": nx.betweenness_centrality(g, weight="weight"),
+        "Closeness": nx.closeness_centrality(g),
+        "Eigenvector": eigenvector,
+        "Communities": community_index(communities),
+    }
+
+
+@dataclass
+class MetricStatus:
+    metric: str
+    status: str
+    as_of_version: int
+
+
+class IncrementalGraph:
+    """Undirected graph plus analytics that are updated as edges change."""
+
+    def __init__(
+        self,
+        edges: Iterable[tuple[Hashable, Hashable]] = (),
+        precomputed: dict[str, dict] | None = None,
+    ):
+        """``precomputed`` is a ``full_metrics`` result for exactly these
+        edges (e.g. from the artifact build), used instead of computing it."""
+        self.graph = nx.Graph()
+        self.graph.add_edges_from(edges)
+        self.version = 0
+
+        self._lock = threading.Lock()
+        self._future: Future | None = None
+
+        # component label per node, and the members of each label
+        self._component: dict[Hashable, int] = {}
+        self._members: dict[int, set] = {}
+        self._next_component = 0
+        for nodes in nx.connected_components(self.graph):
+            self._new_component(nodes)
+
+        # expensive results and the version they were computed at
+        self._results: dict[str, dict] = {}
+        self._results_version = -1
+        self._communities: dict[Hashable, int] = {}
+        self._communities_version = -1
+        if precomputed is None:
+            precomputed = full_metrics(self.graph)
+        self._store({k: dict(v) for k, v in precomputed.items()}, self.version)
+
+    # -- edits -----------------------------------------------------------
+
+    def add_edge(self, u: Hashable, v: Hashable) -> bool:
+        """Add ``u``-``v``; returns False if it was already there."""
+        if self.graph.has_edge(u, v) or u == v:
+            return False
+
+        for node in (u, v):
+            if node not in self.graph:
+                self.graph.add_node(node)
+                self._new_component({node})
+        self.graph.add_edge(u, v)
+        self.version += 1
+
+        self._merge_components(u, v)
+        self._relabel_community(u, v)
+        return True
+
+    def remove_edge(self, u: Hashable, v: Hashable) -> bool:
+        """Remove ``u``-``v``; returns False if there was no such edge.
+
+        Endpoints left without edges stay in the graph as isolated nodes.
+        """
+        if not self.graph.has_edge(u, v):
+            return False
+
+        self.graph.remove_edge(u, v)
+        self.version += 1
+
+        self._split_component(u, v)
+        self._relabel_community(u, v)
+        return True
+
+    # -- cheap metrics -----------------------------------------------------
+
+    def degree_centrality(self) -> dict[Hashable, float]:
+        n = self.graph.number_of_nodes()
+        scale = 1 / (n - 1) if n > 1 else 1.0
+        return {node: d * scale for node, d in self.graph.degree()}
+
+    def components(self) -> list[set]:
+        """Connected components, largest first."""
+        return sorted(self._members.values(), key=len, reverse=True)
+
+    def communities(self) -> dict[Hashable, int]:
+        """Community number per node (1-based)."""
+        return dict(self._communities)
+
+    # -- expensive metrics ---------------------------------------------------
+
+    def metric(self, name: str) -> dict[Hashable, float]:
+        """Last computed scores for an expensive metric (may be stale)."""
+        with self._lock:
+            return dict(self._results.get(name, {}))
+
+    @property
+    def refreshing(self) -> bool:
+        return self._future is not None and not self._future.done()
+
+    def schedule_refresh(self) -> bool:
+        """Recompute the expensive metrics in the background.
+
+        Returns False when they are already fresh or a refresh is running;
+        a refresh that finishes behind newer edits just leaves them stale
+        until the next call.
+        """
+        if self.refreshing or self._results_version == self.version:
+            return False
+
+        snapshot, version = self.graph.copy(), self.version
+        self._future = _executor.submit(
+            lambda: self._store(full_metrics(snapshot), version)
+        )
+        return True
+
+    def refresh_now(self) -> None:
+        """Recompute the expensive metrics on the calling thread."""
+        if self.refreshing:
+            self._future.result()
+        if self._results_version != self.version:
+            self._store(full_metrics(self.graph), self.version)
+
+    def status(self) -> list[MetricStatus]:
+        """Freshness of every metric the page shows."""
+        with self._lock:
+            results_version = self._results_version
+            communities_version = self._communities_version
+
+        if results_version == self.version:
+            expensive = FRESH
+        else:
+            expensive = RUNNING if self.refreshing else STALE
+
+        if communities_version == self.version:
+            communities = FRESH
+        else:
+            communities = LOCAL
+
+        return [
+            MetricStatus("Degree", FRESH, self.version),
+            MetricStatus("Components", FRESH, self.version),
+            MetricStatus("Communities", communities, communities_version),
+        ] + [
+            MetricStatus(name, expensive, results_version)
+            for name in EXPENSIVE_METRICS
+        ]
+
+    # -- internals ----------------------------------------------------------
+
+    def _store(self, results: dict[str, dict], version: int) -> None:
+        with self._lock:
+            if version <= self._results_version:
+                return
+            communities = results.pop("Communities")
+            self._results = results
+            self._results_version = version
+            # only take the full community split if nothing moved meanwhile
+            if version == self.version:
+                self._communities = communities
+                self._communities_version = version
+
+    def _new_component(self, nodes: Iterable[Hashable]) -> None:
+        label = self._next_component
+        self._next_component += 1
+        members = set(nodes)
+        self._members[label] = members
+        for node in members:
+            self._component[node] = label
+
+    def _merge_components(self, u: Hashable, v: Hashable) -> None:
+        cu, cv = self._component[u], self._component[v]
+        if cu == cv:
+            return
+        # relabel the smaller side only
+        if len(self._members[cu]) < len(self._members[cv]):
+            cu, cv = cv, cu
+        moved = self._members.pop(cv)
+        for node in moved:
+            self._component[node] = cu
+        self._members[cu] |= moved
+
+    def _split_component(self, u: Hashable, v: Hashable) -> None:
+        if nx.has_path(self.graph, u, v):
+            return
+        split_off = nx.node_connected_component(self.graph, v)
+        self._members[self._component[v]] -= split_off
+        self._new_component(split_off)
+
+    def _relabel_community(self, *nodes: Hashable) -> None:
+        """One label-propagation step for each touched node."""
+        with self._lock:
+            for node in nodes:
+                neighbour_labels = Counter(
+                    self._communities[n]
+                    for n in self.graph.neighbors(node)
+                    if n in self._communities
+                )
+                current = self._communities.get(node)
+                if not neighbour_labels:
+                    if current is None or self.graph.degree(node) == 0:
+                        self._communities[node] = max(
+                            self._communities.values(), default=0
+                        ) + 1
+                    continue
+                best, count = neighbour_labels.most_common(1)[0]
+                if current is None or count > neighbour_labels.get(current, 0):
+                    self._communities[node] = best
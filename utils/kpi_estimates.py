@@ -0,0 +1,128 @@
+"""Quick KPI estimates from a sample, for views too big to answer at once.
+
+The exact Dashboard KPIs take medians of ``price_diff``, ``odometer`` and
+``car_age`` over every filtered row, which grows with the data. The
+estimates here come from a fixed-size sample instead, so they cost the same
+few milliseconds however large the data is:
+
+* the sample is stratified by make × body style, each drawn in proportion
+  to its sales, so whatever the make/body filters keep is a proportional
+  slice of the sample too
+* a median's interval comes from the sample's order statistics around the
+  middle (distribution-free); a mean's from the normal approximation
+
+``ExactCost`` remembers how long the exact KPIs took per filtered row, per
+backend, so the page can tell in advance whether they fit its latency
+budget or whether to show the estimate first.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections.abc import Sequence
+
+import numpy as np
+import pandas as pd
+
+from utils import car_stats
+
+SAMPLE_ROWS = 100_000
+
+# what the KPIs and their filters read
+KPI_COLUMNS = ["make", "body_clean", "sellingprice", "price_diff", "odometer", "car_age"]
+STRATA = ["make", "body_clean"]
+
+# two-sided 95%
+Z = 1.96
+
+
+def stratified_sample(df: pd.DataFrame, rows: int = SAMPLE_ROWS, seed: int = 0) -> pd.DataFrame:
+    """About ``rows`` of ``df``'s KPI columns, drawn per make × body style."""
+    df = df[KPI_COLUMNS]
+    if len(df) <= rows:
+        return df
+    return (
+        df.groupby(STRATA, observed=True, dropna=False)
+        .sample(frac=rows / len(df), random_state=seed)
+        .sort_index()
+    )
+
+
+def median_interval(values: np.ndarray, z: float = Z) -> tuple[float, float, float]:
+    """A sample's median and the order statistics bracketing the true one."""
+    values = np.sort(values[~np.isnan(values)])
+    n = len(values)
+    if n == 0:
+        return math.nan, math.nan, math.nan
+    half_width = z * math.sqrt(n) / 2
+    low = max(math.floor(n / 2 - half_width), 0)
+    high = min(math.ceil(n / 2 + half_width), n - 1)
+    return float(np.median(values)), float(values[low]), float(values[high])
+
+
+def mean_interval(values: np.ndarray, z: float = Z) -> tuple[float, float, float]:
+    values = values[~np.isnan(values)]
+    n = len(values)
+    if n == 0:
+        return math.nan, math.nan, math.nan
+    mean = float(values.mean())
+    half_width = z * float(values.std(ddof=1)) / math.sqrt(n) if n > 1 else math.inf
+    return mean, mean - half_width, mean + half_width
+
+
+def estimate_kpis(
+    sample: pd.DataFrame,
+    makes: Sequence[str] | None,
+    bodies: Sequence[str] | None,
+    price_range: tuple[float, float],
+) -> dict:
+    """``car_stats.sales_kpis`` from a sample, as ``(estimate, low, high)``.
+
+    ``sample_rows`` is how many sampled sales matched the filters; the
+    total sales count isn't estimated, the page counts it exactly.
+    """
+    matched = car_stats.filter_sales(sample, makes, bodies, price_range)
+
+    def values(column: str) -> np.ndarray:
+        return matched[column].to_numpy(dtype=float, na_value=np.nan)
+
+    return {
+        "sample_rows": len(matched),
+        "avg_diff": mean_interval(values("price_diff")),
+        "median_diff": median_interval(values("price_diff")),
+        "median_odometer": median_interval(values("odometer")),
+        "median_age": median_interval(values("car_age")),
+    }
+
+
+class ExactCost:
+    """Seconds per filtered row the exact KPIs took lately, per backend."""
+
+    # until a backend has been timed, assume about what pandas does in memory
+    DEFAULT_SECONDS_PER_ROW = 1e-7
+    # weight of the newest timing in the running average
+    SMOOTHING = 0.3
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._per_row: dict[str, float] = {}
+
+    def predict(self, backend: str, rows: int) -> float:
+        with self._lock:
+            return rows * self._per_row.get(backend, self.DEFAULT_SECONDS_PER_ROW)
+
+    def record(self, backend: str, rows: int, seconds: float) -> None:
+        if rows <= 0:
+            return
+        per_row = seconds / rows
+        with self._lock:
+            previous = self._per_row.get(backend)
+            self._per_row[backend] = (
+                per_row if previous is None
+                else previous + self.SMOOTHING * (per_row - previous)
+            )
+
+
+# one per process; every session's timings go into it
+exact_cost = ExactCost()
@@ -0,0 +1,109 @@
+"""Background prefetch of what a visitor is likely to open next.
+
+``prefetch_view(slot, key, jobs)`` hands a session's likely next results to
+a small thread pool shared by every session in the process. The jobs are
+expected to fill a cache (a ``managed_cache`` loader), so when the visitor
+does ask, the page gets a hit, or waits for the job already computing that
+entry instead of starting a second one.
+
+Each session keeps one batch per ``slot``. When the view changes (``key``
+differs, e.g. new filters), the old batch is cancelled: jobs that haven't
+started are dropped. A job already inside pandas or DuckDB can't be
+stopped; it finishes and its result simply stays cached.
+
+``PORTFOLIO_PREFETCH_CPU`` bounds what prefetching costs. There is a single
+worker thread, and after each job it rests long enough that its busy time
+stays at that share of the wall clock, however many sessions queue work.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Hashable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import streamlit as st
+
+from utils.cache_manager import background
+from utils.config import PREFETCH_CPU
+
+log = logging.getLogger(__name__)
+
+WORKERS = 1
+
+Jobs = Callable[[], Iterable[tuple[str, Callable[[], object]]]]
+
+_lock = threading.Lock()
+_pool: ThreadPoolExecutor | None = None
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    with _lock:
+        if _pool is None:
+            # background() keeps prefetches out of the caches' hit rates
+            _pool = ThreadPoolExecutor(
+                WORKERS, thread_name_prefix="prefetch", initializer=background
+            )
+        return _pool
+
+
+class Prefetch:
+    """One session's batch of prefetch jobs for one view."""
+
+    def __init__(self, key: Hashable):
+        self.key = key
+        self.futures: list[Future] = []
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def done(self) -> bool:
+        return all(f.done() for f in self.futures)
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+        for future in self.futures:
+            future.cancel()
+
+
+def _run(batch: Prefetch, label: str, job: Callable[[], object]) -> None:
+    if batch.cancelled:
+        return
+    started = time.perf_counter()
+    try:
+        job()
+    except Exception:  # noqa: BLE001 - the page computes it itself if asked
+        log.exception("prefetching %s failed", label)
+    busy = time.perf_counter() - started
+    # rest so busy time stays at PREFETCH_CPU of the wall clock
+    time.sleep(busy * (1 / PREFETCH_CPU - 1))
+
+
+def prefetch(key: Hashable, jobs: Iterable[tuple[str, Callable[[], object]]]) -> Prefetch:
+    """Queue ``(label, callable)`` jobs on the prefetch thread."""
+    batch = Prefetch(key)
+    if PREFETCH_CPU > 0:
+        pool = _executor()
+        batch.futures = [pool.submit(_run, batch, label, job) for label, job in jobs]
+    return batch
+
+
+def prefetch_view(slot: str, key: Hashable, jobs: Jobs) -> Prefetch:
+    """Prefetch ``jobs()`` for this session's current view ``key``.
+
+    The session's batch in ``slot`` is kept while the view is the same, so
+    reruns don't queue the jobs again, and cancelled once it isn't.
+    """
+    previous = st.session_state.get(slot)
+    if previous is not None:
+        if previous.key == key:
+            return previous
+        previous.cancel()
+    batch = prefetch(key, jobs())
+    st.session_state[slot] = batch
+    return batch
@@ -0,0 +1,338 @@
+"""What's my car worth: a k-means index over cleaned sales.
+
+Cars are encoded as a small feature vector (standardised year, odometer,
+condition and MMR, plus one-hot make and body style) and clustered offline
+with mini-batch k-means that streams the data in batches, so training never
+needs the whole dataset in memory. Each cluster keeps a histogram of the
+selling prices that landed in it. A query encodes one car, finds the nearest
+centroid with one vectorised distance computation and reads the price
+quantiles off that cluster's histogram.
+
+Everything is stored as plain arrays in one ``.npz`` file (float32
+centroids, uint32 histograms), written by ``scripts/build_artifacts.py``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+NUMERIC_FEATURES = ["year", "odometer", "condition", "mmr"]
+CATEGORY_FEATURES = ["make", "body_clean"]
+TARGET = "sellingprice"
+COLUMNS = NUMERIC_FEATURES + CATEGORY_FEATURES + [TARGET]
+
+# how far apart two cars of a different make/body are, in standard
+# deviations of a numeric feature; makes should mostly get their own clusters
+CATEGORY_WEIGHTS = {"make": 3.0, "body_clean": 1.5}
+
+# categories with fewer sales than this share the all-zero "other" code
+MIN_CATEGORY_COUNT = 50
+
+PRICE_BIN = 250
+
+
+@dataclass(frozen=True)
+class PriceEstimate:
+    cluster: int
+    n: int
+    low: float
+    median: float
+    high: float
+    mean: float
+
+
+@dataclass
+class PriceModel:
+    means: np.ndarray
+    stds: np.ndarray
+    vocab: dict[str, list[str]]
+    centroids: np.ndarray
+    price_edges: np.ndarray
+    histograms: np.ndarray
+    price_sums: np.ndarray
+    # oldest and newest model year trained on; None in models saved before
+    # it was kept
+    years: tuple[int, int] | None = None
+
+    #################################################################
+    # encoding
+    #################################################################
+    def encode(self, df: pd.DataFrame) -> np.ndarray:
+        """Feature matrix for ``df``; missing numbers get the training mean."""
+        numeric = df[NUMERIC_FEATURES].to_numpy(dtype=np.float64, na_value=np.nan)
+        numeric = np.where(np.isnan(numeric), self.means, numeric)
+        parts = [(numeric - self.means) / self.stds]
+
+        for col in CATEGORY_FEATURES:
+            codes = pd.Index(self.vocab[col]).get_indexer(df[col])
+            onehot = np.zeros((len(df), len(self.vocab[col])))
+            known = codes >= 0
+            # one-hot scaled so two different categories are `weight` apart
+            onehot[np.flatnonzero(known), codes[known]] = CATEGORY_WEIGHTS[col] / np.sqrt(2)
+            parts.append(onehot)
+        return np.hstack(parts).astype(np.float32)
+
+    def encode_one(self, car: dict) -> np.ndarray:
+        """``encode`` for a single car given as a dict, without pandas."""
+        numeric = np.array(
+            [np.nan if car.get(c) is None else car[c] for c in NUMERIC_FEATURES],
+            dtype=np.float64,
+        )
+        numeric = np.where(np.isnan(numeric), self.means, numeric)
+        parts = [(numeric - self.means) / self.stds]
+        for col in CATEGORY_FEATURES:
+            onehot = np.zeros(len(self.vocab[col]))
+            if car.get(col) in self.vocab[col]:
+                onehot[self.vocab[col].index(car[col])] = CATEGORY_WEIGHTS[col] / np.sqrt(2)
+            parts.append(onehot)
+        return np.concatenate(parts).astype(np.float32)[None, :]
+
+    def feature_mask(self, known: Iterable[str]) -> np.ndarray:
+        """Columns of the encoding that belong to the features in ``known``."""
+        mask = [name in known for name in NUMERIC_FEATURES]
+        for col in CATEGORY_FEATURES:
+            mask += [col in known] * len(self.vocab[col])
+        return np.array(mask)
+
+    #################################################################
+    # queries
+    #################################################################
+    def nearest(
+        self,
+        x: np.ndarray,
+        mask: np.ndarray | None = None,
+        skip_empty: bool = True,
+    ) -> np.ndarray:
+        """Index of the nearest centroid for each row of ``x``.
+
+        ``mask`` limits the distance to some feature columns; clusters no
+        training sale ended up in are skipped unless ``skip_empty`` is off.
+        """
+        centroids = self.centroids
+        if mask is not None:
+            x, centroids = x[:, mask], centroids[:, mask]
+        # |x|^2 is the same for every centroid, so it's left out
+        dist = (centroids**2).sum(axis=1)[None, :] - 2 * x @ centroids.T
+        if skip_empty:
+            dist[:, self.cluster_sizes == 0] = np.inf
+        return dist.argmin(axis=1)
+
+    @property
+    def cluster_sizes(self) -> np.ndarray:
+        return self.histograms.sum(axis=1)
+
+    def quantiles(self, cluster: int, qs: Sequence[float]) -> np.ndarray:
+        """Price quantiles of one cluster, interpolated within histogram bins."""
+        counts = self.histograms[cluster].astype(np.float64)
+        cum = np.concatenate([[0.0], np.cumsum(counts)]) / counts.sum()
+        return np.interp(qs, cum, self.price_edges)
+
+    def estimate(self, car: dict) -> PriceEstimate:
+        """Price range for one car; leave out (or None) what the user doesn't know.
+
+        Unknown numbers and categories are left out of the distance instead
+        of being guessed, so e.g. a query without MMR matches on the rest.
+        """
+        known = [k for k, v in car.items() if v is not None]
+        cluster = int(self.nearest(self.encode_one(car), self.feature_mask(known))[0])
+        low, median, high = self.quantiles(cluster, [0.25, 0.5, 0.75])
+        n = int(self.cluster_sizes[cluster])
+        return PriceEstimate(
+            cluster=cluster,
+            n=n,
+            low=float(low),
+            median=float(median),
+            high=float(high),
+            mean=float(self.price_sums[cluster] / n),
+        )
+
+    #################################################################
+    # storage
+    #################################################################
+    def save(self, path: Path) -> None:
+        extra = {} if self.years is None else {"years": np.array(self.years, dtype=np.int64)}
+        np.savez_compressed(
+            path,
+            means=self.means,
+            stds=self.stds,
+            centroids=self.centroids,
+            price_edges=self.price_edges,
+            histograms=self.histograms,
+            price_sums=self.price_sums,
+            **{f"vocab_{col}": np.array(self.vocab[col], dtype=str) for col in CATEGORY_FEATURES},
+            **extra,
+        )
+
+    @classmethod
+    def load(cls, path: Path | str) -> PriceModel:
+        with np.load(path, allow_pickle=False) as f:
+            return cls(
+                means=f["means"],
+                stds=f["stds"],
+                vocab={col: f[f"vocab_{col}"].tolist() for col in CATEGORY_FEATURES},
+                centroids=f["centroids"],
+                price_edges=f["price_edges"],
+                histograms=f["histograms"],
+                price_sums=f["price_sums"],
+                years=tuple(int(y) for y in f["years"]) if "years" in f else None,
+            )
+
+
+#####################################################################
+# Training
+#####################################################################
+Batches = Callable[[], Iterator[pd.DataFrame]]
+
+
+def parquet_batches(path: Path | str, batch_size: int = 65_536) -> Batches:
+    """Re-iterable batches of the training columns of a Parquet file."""
+    import pyarrow.parquet as pq
+
+    def batches() -> Iterator[pd.DataFrame]:
+        reader = pq.ParquetFile(path)
+        for batch in reader.iter_batches(batch_size=batch_size, columns=COLUMNS):
+            yield usable_rows(batch.to_pandas())
+
+    return batches
+
+
+def usable_rows(df: pd.DataFrame) -> pd.DataFrame:
+    # a row needs a price to learn from and a make to be found by
+    return df[df[TARGET].notna() & (df[TARGET] > 0) & df["make"].notna()]
+
+
+def _fit_stats(
+    batches: Batches, sample_size: int, rng: np.random.Generator
+) -> tuple[PriceModel, pd.DataFrame]:
+    """First pass: scaling, vocabularies, price range and a reservoir sample."""
+    n = 0
+    sums = np.zeros(len(NUMERIC_FEATURES))
+    squares = np.zeros(len(NUMERIC_FEATURES))
+    counts = np.zeros(len(NUMERIC_FEATURES))
+    categories = {col: pd.Series(dtype="int64") for col in CATEGORY_FEATURES}
+    price_low, price_high = np.inf, -np.inf
+    year_low, year_high = np.inf, -np.inf
+    sample: list[pd.DataFrame] = []
+    sample_keys: list[np.ndarray] = []
+
+    for df in batches():
+        values = df[NUMERIC_FEATURES].to_numpy(dtype=np.float64, na_value=np.nan)
+        sums += np.nansum(values, axis=0)
+        squares += np.nansum(values**2, axis=0)
+        counts += (~np.isnan(values)).sum(axis=0)
+        for col in CATEGORY_FEATURES:
+            categories[col] = categories[col].add(df[col].value_counts(), fill_value=0)
+        price_low = min(price_low, df[TARGET].min())
+        price_high = max(price_high, df[TARGET].max())
+        year_low = min(year_low, df["year"].min())
+        year_high = max(year_high, df["year"].max())
+
+        # reservoir sampling by random keys: keep the rows with the smallest
+        keys = rng.random(len(df))
+        sample.append(df)
+        sample_keys.append(keys)
+        n += len(df)
+        if sum(len(s) for s in sample) > 2 * sample_size:
+            merged, merged_keys = pd.concat(sample), np.concatenate(sample_keys)
+            keep = np.argsort(merged_keys)[:sample_size]
+            sample, sample_keys = [merged.iloc[keep]], [merged_keys[keep]]
+
+    if not n:
+        raise ValueError("no usable rows to train the price model on")
+
+    merged, merged_keys = pd.concat(sample), np.concatenate(sample_keys)
+    sample_df = merged.iloc[np.argsort(merged_keys)[:sample_size]]
+
+    means = sums / np.maximum(counts, 1)
+    stds = np.sqrt(np.maximum(squares / np.maximum(counts, 1) - means**2, 0))
+    stds[stds == 0] = 1.0
+    vocab = {
+        col: sorted(str(c) for c, k in categories[col].items() if k >= MIN_CATEGORY_COUNT)
+        for col in CATEGORY_FEATURES
+    }
+    low = np.floor(price_low / PRICE_BIN) * PRICE_BIN
+    high = np.ceil(price_high / PRICE_BIN) * PRICE_BIN + PRICE_BIN
+
+    model = PriceModel(
+        means=means,
+        stds=stds,
+        vocab=vocab,
+        centroids=np.empty((0, 0), dtype=np.float32),
+        price_edges=np.arange(low, high + PRICE_BIN, PRICE_BIN, dtype=np.float64),
+        histograms=np.empty((0, 0), dtype=np.uint32),
+        price_sums=np.empty(0),
+        years=(int(year_low), int(year_high)),
+    )
+    return model, sample_df
+
+
+def _kmeans_plus_plus(x: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    centers = np.empty((k, x.shape[1]), dtype=np.float32)
+    centers[0] = x[rng.integers(len(x))]
+    closest = ((x - centers[0]) ** 2).sum(axis=1)
+    for i in range(1, k):
+        total = closest.sum()
+        pick = rng.choice(len(x), p=closest / total) if total > 0 else rng.integers(len(x))
+        centers[i] = x[pick]
+        closest = np.minimum(closest, ((x - centers[i]) ** 2).sum(axis=1))
+    return centers
+
+
+def train(
+    batches: Batches,
+    k: int = 400,
+    epochs: int = 3,
+    mini_batch: int = 4096,
+    sample_size: int = 50_000,
+    seed: int = 0,
+) -> PriceModel:
+    """Fit the index with mini-batch k-means, streaming ``batches`` each pass.
+
+    One pass gathers scaling stats and a sample to seed the centroids
+    (k-means++), ``epochs`` passes move the centroids in mini-batches (each
+    centroid is the running mean of every point ever assigned to it) and a
+    last pass fills the per-cluster price histograms.
+    """
+    rng = np.random.default_rng(seed)
+    model, sample = _fit_stats(batches, sample_size, rng)
+
+    x_sample = model.encode(sample)
+    k = min(k, len(x_sample))
+    model.centroids = _kmeans_plus_plus(x_sample, k, rng)
+    # every centroid counts as seen once, so its seed point isn't forgotten
+    seen = np.ones(k)
+
+    for _ in range(epochs):
+        for df in batches():
+            x = model.encode(df)
+            for start in range(0, len(x), mini_batch):
+                chunk = x[start:start + mini_batch]
+                nearest = model.nearest(chunk, skip_empty=False)
+                n_new = np.bincount(nearest, minlength=k)
+                sums = np.zeros_like(model.centroids, dtype=np.float64)
+                np.add.at(sums, nearest, chunk)
+                hit = n_new > 0
+                seen[hit] += n_new[hit]
+                model.centroids[hit] += (
+                    (sums[hit] - n_new[hit, None] * model.centroids[hit]) / seen[hit, None]
+                ).astype(np.float32)
+
+    # final pass: where do the prices of each cluster fall?
+    n_bins = len(model.price_edges) - 1
+    histograms = np.zeros((k, n_bins), dtype=np.uint32)
+    price_sums = np.zeros(k)
+    for df in batches():
+        nearest = model.nearest(model.encode(df), skip_empty=False)
+        prices = df[TARGET].to_numpy(dtype=np.float64)
+        bins = np.clip(np.searchsorted(model.price_edges, prices, side="right") - 1, 0, n_bins - 1)
+        np.add.at(histograms, (nearest, bins), 1)
+        price_sums += np.bincount(nearest, weights=prices, minlength=k)
+
+    model.histograms = histograms
+    model.price_sums = price_sums
+    return model
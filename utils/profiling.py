@@ -0,0 +1,185 @@
+"""Per-section timing for a page, shown in an opt-in sidebar panel.
+
+Usage on a page::
+
+    timer = PageTimer("Dashboard")
+    with timer.section("load_clean_data") as sec:
+        df = load_clean_data()
+        sec.output(df)
+    ...
+    timer.render()   # last thing on the page
+
+Timing is always recorded (it's a couple of ``perf_counter`` calls per
+section); the panel, the exports and the optional profiler only show up when
+the "Show timing panel" toggle in the sidebar is on.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+
+import streamlit as st
+
+PANEL_KEY = "debug_timing"
+PROFILE_NEXT_KEY = "debug_profile_next"
+HISTORY_KEY = "debug_timing_history"
+PROFILE_KEY = "debug_profile_report"
+
+# reruns kept per session for the export
+HISTORY_LENGTH = 50
+
+
+def _rows(data) -> int | None:
+    if data is None:
+        return None
+    if isinstance(data, int):
+        return data
+    return len(data)
+
+
+def _memory_mb(data) -> float | None:
+    # shallow on purpose: deep=True walks every string and costs more than
+    # most of the sections being timed
+    usage = getattr(data, "memory_usage", None)
+    if usage is None:
+        return None
+    return round(float(usage(deep=False).sum()) / 2**20, 2)
+
+
+@dataclass
+class SectionRecord:
+    name: str
+    seconds: float = 0.0
+    rows_in: int | None = None
+    rows_out: int | None = None
+    memory_mb: float | None = None
+
+    def output(self, data) -> None:
+        """Note the rows and (shallow) memory of what this section produced."""
+        self.rows_out = _rows(data)
+        self.memory_mb = _memory_mb(data)
+
+
+@dataclass
+class PageTimer:
+    page: str
+    sections: list[SectionRecord] = field(default_factory=list)
+
+    def __post_init__(self):
+        self._start = time.perf_counter()
+        self._profiler = None
+        if st.session_state.pop(PROFILE_NEXT_KEY, False):
+            self._profiler = _start_profiler()
+
+    @contextmanager
+    def section(self, name: str, rows_in=None):
+        record = SectionRecord(name, rows_in=_rows(rows_in))
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds = time.perf_counter() - start
+            self.sections.append(record)
+
+    def rerun_record(self) -> dict:
+        return {
+            "page": self.page,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "total_seconds": round(time.perf_counter() - self._start, 6),
+            "sections": [asdict(s) for s in self.sections],
+        }
+
+    def render(self) -> None:
+        """Store this rerun's timings and draw the sidebar panel if enabled."""
+        record = self.rerun_record()
+        history = st.session_state.setdefault(HISTORY_KEY, [])
+        history.append(record)
+        del history[:-HISTORY_LENGTH]
+
+        if self._profiler is not None:
+            st.session_state[PROFILE_KEY] = (self.page, _stop_profiler(self._profiler))
+
+        if not st.sidebar.toggle("⏱️ Show timing panel", key=PANEL_KEY):
+            return
+
+        import pandas as pd
+
+        with st.sidebar.expander("Timing – this rerun", expanded=True):
+            st.markdown(f"**Total:** {record['total_seconds'] * 1000:,.0f} ms")
+            table = pd.DataFrame(record["sections"])
+            if not table.empty:
+                table["ms"] = (table.pop("seconds") * 1000).round(1)
+                st.dataframe(table, hide_index=True, use_container_width=True)
+
+            rows = [
+                {"page": r["page"], "timestamp": r["timestamp"], **s}
+                for r in history
+                for s in r["sections"]
+            ]
+            csv = io.StringIO()
+            pd.DataFrame(rows).to_csv(csv, index=False)
+            json_col, csv_col = st.columns(2)
+            json_col.download_button(
+                "JSON", json.dumps(history, indent=2), "timings.json",
+                mime="application/json", use_container_width=True,
+            )
+            csv_col.download_button(
+                "CSV", csv.getvalue(), "timings.csv",
+                mime="text/csv", use_container_width=True,
+            )
+
+            if st.button("Profile the next rerun", use_container_width=True):
+                st.session_state[PROFILE_NEXT_KEY] = True
+                st.rerun()
+
+            report = st.session_state.get(PROFILE_KEY)
+            if report is not None:
+                page, text = report
+                st.caption(f"Last profile ({page})")
+                st.code(text[:4000], language=None)
+                st.download_button("Full profile", text, "profile.txt")
+
+        from utils.cache_manager import cache_stats
+
+        with st.sidebar.expander("Caches"):
+            caches = pd.DataFrame(cache_stats())
+            if caches.empty:
+                st.caption("Nothing cached yet.")
+                return
+            caches["MB"] = (pd.to_numeric(caches.pop("bytes")) / 2**20).round(1)
+            caches["hit_rate"] = pd.to_numeric(caches["hit_rate"]).round(2)
+            caches["last_refresh"] = pd.to_datetime(caches["last_refresh"], unit="s", utc=True)
+            st.dataframe(caches, hide_index=True, use_container_width=True)
+
+
+def _start_profiler():
+    # pyinstrument's output is much easier to read, but it's optional
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    profiler = Profiler()
+    profiler.start()
+    return profiler
+
+
+def _stop_profiler(profiler) -> str:
+    if hasattr(profiler, "output_text"):  # pyinstrument
+        profiler.stop()
+        return profiler.output_text(unicode=True)
+
+    import pstats
+
+    profiler.disable()
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(40)
+    return out.getvalue()
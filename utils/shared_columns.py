@@ -0,0 +1,152 @@
+"""A DataFrame stored as a directory of memory-mapped column files.
+
+``write_columns`` saves every column once as raw ``.npy`` arrays: numbers
+as they are, nullable integers as values plus a mask, and strings either as
+integer codes into a sorted dictionary (a short JSON list, for columns
+with few distinct values like ``make``) or, when nearly every value is
+different (``vin``), as Arrow string buffers. ``attach_columns`` maps those
+files read-only and wraps them in a DataFrame without copying them, so
+every server process on the box reads the same physical pages from the OS
+page cache instead of holding its own copy of the table. Keep the
+directory on a tmpfs like ``/dev/shm`` to pin it in shared memory.
+
+The dictionaries are the per-process part: pandas turns them into Python
+strings, which is why the many-valued columns skip them.
+
+Time-zone-aware timestamps are the one column copied on attach: pandas has
+no public way to put a time zone on an existing array. The attached frame
+is read-only; writing into it raises instead of touching the shared pages.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+SCHEMA_FILE = "columns.json"
+
+# strings become categories when there are at most this many distinct values
+# and they're at most this share of the rows; otherwise Arrow strings
+MAX_CATEGORIES = 2**15 - 1
+MAX_CATEGORY_SHARE = 0.25
+
+# pandas' masked arrays, by numpy kind of their values
+MASKED_ARRAYS = {
+    "i": pd.arrays.IntegerArray,
+    "u": pd.arrays.IntegerArray,
+    "f": pd.arrays.FloatingArray,
+    "b": pd.arrays.BooleanArray,
+}
+
+
+def _smallest_codes(codes: np.ndarray, n_categories: int) -> np.ndarray:
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return codes.astype(dtype)
+    return codes
+
+
+def write_columns(df: pd.DataFrame, path: Path) -> None:
+    """Save ``df`` under ``path`` in the layout ``attach_columns`` maps."""
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    def save(stem: str, values: np.ndarray) -> str:
+        np.save(path / f"{stem}.npy", np.ascontiguousarray(values), allow_pickle=False)
+        return f"{stem}.npy"
+
+    columns = []
+    for i, (name, series) in enumerate(df.items()):
+        stem = f"{i:03d}"
+        dtype = series.dtype
+        spec = {"name": name}
+
+        if isinstance(dtype, pd.DatetimeTZDtype):
+            naive = series.dt.tz_convert("UTC").dt.tz_localize(None)
+            spec |= {"kind": "datetime", "tz": str(dtype.tz), "values": save(stem, naive.to_numpy())}
+        elif isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(dtype):
+            codes, categories = pd.factorize(series, sort=True)
+            if len(categories) <= min(MAX_CATEGORIES, MAX_CATEGORY_SHARE * len(series)):
+                spec |= {
+                    "kind": "category",
+                    "categories": [str(c) for c in categories],
+                    "values": save(stem, _smallest_codes(codes, len(categories))),
+                }
+            else:
+                strings = pa.array(series.astype("str"), type=pa.string())
+                validity, offsets, data = strings.buffers()
+                n = len(strings)
+                offsets = np.frombuffer(offsets, np.int32)[:n + 1]
+                data = np.frombuffer(data or b"", np.uint8)[:offsets[-1]]
+                spec |= {
+                    "kind": "string",
+                    "offsets": save(f"{stem}.offsets", offsets),
+                    "values": save(stem, data),
+                    "validity": None if validity is None else save(
+                        f"{stem}.validity", np.frombuffer(validity, np.uint8)[:(n + 7) // 8]
+                    ),
+                }
+        elif isinstance(dtype, pd.api.extensions.ExtensionDtype) and dtype.kind in MASKED_ARRAYS:
+            mask = series.isna().to_numpy()
+            values = series.to_numpy(dtype=dtype.numpy_dtype, na_value=0)
+            spec |= {
+                "kind": "masked",
+                "values": save(stem, values),
+                "mask": save(f"{stem}.mask", mask),
+            }
+        elif isinstance(dtype, np.dtype) and dtype.kind in "iufbM":
+            spec |= {"kind": "numpy", "values": save(stem, series.to_numpy())}
+        else:
+            raise TypeError(f"can't store column {name!r} of dtype {dtype}")
+        columns.append(spec)
+
+    if isinstance(df.index, pd.RangeIndex):
+        index = {"start": df.index.start, "stop": df.index.stop, "step": df.index.step}
+    else:
+        index = {"values": save("index", df.index.to_numpy())}
+
+    schema = {"rows": len(df), "index": index, "columns": columns}
+    (path / SCHEMA_FILE).write_text(json.dumps(schema, indent=2))
+
+
+def attach_columns(path: Path) -> pd.DataFrame:
+    """The frame saved under ``path``, backed by read-only memory maps."""
+    path = Path(path)
+    schema = json.loads((path / SCHEMA_FILE).read_text())
+
+    def load(filename: str) -> np.ndarray:
+        return np.load(path / filename, mmap_mode="r", allow_pickle=False)
+
+    data = {}
+    for spec in schema["columns"]:
+        values = load(spec["values"])
+        kind = spec["kind"]
+        if kind == "category":
+            categories = pd.Index(spec["categories"], dtype="str")
+            data[spec["name"]] = pd.Categorical.from_codes(values, categories=categories)
+        elif kind == "string":
+            validity = spec["validity"] and pa.py_buffer(load(spec["validity"]))
+            strings = pa.StringArray.from_buffers(
+                schema["rows"], pa.py_buffer(load(spec["offsets"])), pa.py_buffer(values), validity
+            )
+            data[spec["name"]] = pd.arrays.ArrowStringArray(
+                pa.chunked_array([strings]), dtype=pd.StringDtype("pyarrow", na_value=np.nan)
+            )
+        elif kind == "datetime":
+            naive = pd.Series(values, copy=False)
+            data[spec["name"]] = naive.dt.tz_localize("UTC").dt.tz_convert(spec["tz"]).array
+        elif kind == "masked":
+            data[spec["name"]] = MASKED_ARRAYS[values.dtype.kind](values, load(spec["mask"]))
+        else:
+            data[spec["name"]] = values
+
+    index = schema["index"]
+    if "values" in index:
+        index = pd.Index(load(index["values"]), copy=False)
+    else:
+        index = pd.RangeIndex(index["start"], index["stop"], index["step"])
+    return pd.DataFrame(data, index=index, copy=False)